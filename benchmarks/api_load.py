@@ -0,0 +1,486 @@
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.dataset import build_dataset  # noqa: E402
+
+DEFAULT_MIX = {"browse": 50, "student": 20, "enterprise": 15, "feedback": 5, "admin": 10}
+SEARCH_TERMS = ["电商", "校园", "数据", "小程序", "项目1", "健康"]
+
+
+# ===== Transports =====
+
+
+def _encode_multipart(fields: Dict[str, str], file_field: str, filename: str, payload: bytes) -> Tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for key, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n'.encode("utf-8"))
+    parts.append(
+        (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode("utf-8")
+        + payload
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class FlaskTransport:
+    name = "flask"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes] = None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        resp = client.open(path, method=method, headers=headers, data=body)
+        return resp.status_code, resp.get_data()
+
+    def close(self) -> None:
+        # Views buffered in this process go to the database now, while it still exists (not at exit).
+        from server.popularity import flush_views
+
+        flush_views(final=True)
+
+
+class HttpTransport:
+    name = "gunicorn"
+
+    def __init__(self, host: str, port: int, process: Optional[subprocess.Popen] = None):
+        self.host = host
+        self.port = port
+        self.process = process
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: Dict[str, str], body: Optional[bytes] = None):
+        for attempt in (1, 2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                return resp.status, resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt == 2:
+                    raise
+        raise RuntimeError("unreachable")
+
+    def close(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(process: subprocess.Popen, transport: HttpTransport, name: str) -> HttpTransport:
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} 启动失败，退出码 {process.returncode}")
+        try:
+            status, _ = transport.request("GET", "/health", {})
+            if status == 200:
+                return transport
+        except OSError:
+            time.sleep(0.2)
+    transport.close()
+    raise RuntimeError(f"{name} 启动超时")
+
+
+def start_gunicorn(workers: int, threads: int, env: Dict[str, str]) -> HttpTransport:
+    if shutil.which("gunicorn") is None:
+        raise RuntimeError("gunicorn 未安装，无法运行 gunicorn 模式（pip install -r requirements.txt）")
+    port = _free_port()
+    cmd = [
+        "gunicorn",
+        "--chdir",
+        str(PROJECT_ROOT / "server"),
+        "-w",
+        str(workers),
+        "--threads",
+        str(threads),
+        "-b",
+        f"127.0.0.1:{port}",
+        "--log-level",
+        "warning",
+        "wsgi:app",
+    ]
+    process = subprocess.Popen(cmd, env=env)
+    return _wait_ready(process, HttpTransport("127.0.0.1", port, process), "gunicorn")
+
+
+def start_uvicorn(env: Dict[str, str]) -> HttpTransport:
+    if shutil.which("uvicorn") is None:
+        raise RuntimeError("uvicorn 未安装，无法运行 ASGI 模式（pip install -r requirements.txt）")
+    port = _free_port()
+    cmd = [
+        "uvicorn",
+        "--app-dir",
+        str(PROJECT_ROOT / "server"),
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+        "--no-access-log",
+        "asgi:app",
+    ]
+    process = subprocess.Popen(cmd, env=env)
+    return _wait_ready(process, HttpTransport("127.0.0.1", port, process), "uvicorn")
+
+
+# ===== Workload =====
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def merge(self, other: "Recorder") -> None:
+        for label, values in other.samples.items():
+            self.samples.setdefault(label, []).extend(values)
+        for label, counts in other.statuses.items():
+            target = self.statuses.setdefault(label, {})
+            for status, n in counts.items():
+                target[status] = target.get(status, 0) + n
+        for label, n in other.errors.items():
+            self.errors[label] = self.errors.get(label, 0) + n
+
+
+class Client:
+    def __init__(self, transport, fixture: dict, rnd: random.Random, recorder: Recorder):
+        self.transport = transport
+        self.fixture = fixture
+        self.rnd = rnd
+        self.recorder = recorder
+
+    def call(self, label: str, method: str, path: str, token: str = "", payload=None, multipart=None):
+        headers = {}
+        body = None
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        elif multipart is not None:
+            body, headers["Content-Type"] = multipart
+        started = time.perf_counter()
+        try:
+            status, raw = self.transport.request(method, path, headers, body)
+        except Exception:
+            self.recorder.errors[label] = self.recorder.errors.get(label, 0) + 1
+            return None
+        elapsed = time.perf_counter() - started
+        self.recorder.samples.setdefault(label, []).append(elapsed)
+        counts = self.recorder.statuses.setdefault(label, {})
+        counts[str(status)] = counts.get(str(status), 0) + 1
+        if status >= 500:
+            self.recorder.errors[label] = self.recorder.errors.get(label, 0) + 1
+        try:
+            return json.loads(raw) if raw else None
+        except ValueError:
+            return None
+
+    def token(self, user_type: str) -> str:
+        return self.rnd.choice(self.fixture["tokens"][user_type])
+
+    def browse(self) -> None:
+        self.call("GET /api/projects", "GET", "/api/projects")
+        if self.rnd.random() < 0.4:
+            q = self.rnd.choice(SEARCH_TERMS)
+            self.call("GET /api/projects?q=", "GET", f"/api/projects?q={quote(q)}")
+        pid = self.rnd.choice(self.fixture["project_ids"])
+        self.call("GET /api/projects/<id>", "GET", f"/api/projects/{pid}")
+
+    def student(self) -> None:
+        token = self.token("学生")
+        role_id = self.rnd.choice(self.fixture["role_ids"])
+        self.call("POST /api/roles/<id>/apply", "POST", f"/api/roles/{role_id}/apply", token, {"motivation": "压测申请"})
+        data = self.call("GET /api/student/applications", "GET", "/api/student/applications", token) or {}
+        pending = [a for a in data.get("applications") or [] if a.get("status") == "pending"]
+        if pending and self.rnd.random() < 0.5:
+            app_id = self.rnd.choice(pending)["application_id"]
+            self.call(
+                "POST /api/student/applications/<id>/cancel", "POST", f"/api/student/applications/{app_id}/cancel", token
+            )
+
+    def enterprise(self) -> None:
+        token = self.token("企业")
+        data = self.call("GET /api/enterprise/projects", "GET", "/api/enterprise/projects", token) or {}
+        projects = data.get("projects") or []
+        if not projects:
+            return
+        pid = self.rnd.choice(projects)["project_id"]
+        data = self.call("GET /api/enterprise/projects/<id>/roles", "GET", f"/api/enterprise/projects/{pid}/roles", token) or {}
+        roles = data.get("roles") or []
+        if not roles:
+            return
+        role_id = self.rnd.choice(roles)["role_id"]
+        data = (
+            self.call(
+                "GET /api/enterprise/roles/<id>/applications", "GET", f"/api/enterprise/roles/{role_id}/applications", token
+            )
+            or {}
+        )
+        pending = [a for a in data.get("applications") or [] if a.get("status") == "pending"]
+        if pending:
+            app_id = self.rnd.choice(pending)["application_id"]
+            decision = "accepted" if self.rnd.random() < 0.3 else "rejected"
+            self.call(
+                "POST /api/enterprise/applications/<id>/review",
+                "POST",
+                f"/api/enterprise/applications/{app_id}/review",
+                token,
+                {"decision": decision},
+            )
+
+    def feedback(self) -> None:
+        token = self.token("学生")
+        role_id = self.rnd.choice(self.fixture["role_ids"])
+        payload = self.rnd.randbytes(self.rnd.randint(2_000, 64_000))
+        multipart = _encode_multipart({"content": "阶段性成果提交"}, "evidence_file", "report.txt", payload)
+        self.call("POST /api/roles/<id>/feedbacks", "POST", f"/api/roles/{role_id}/feedbacks", token, multipart=multipart)
+
+    def admin(self) -> None:
+        self.call("GET /api/admin/dashboard", "GET", "/api/admin/dashboard", self.token("管理员"))
+
+
+def run_load(transport, fixture: dict, clients: int, duration: float, mix: Dict[str, int], seed: int) -> Tuple[Recorder, float]:
+    scenarios = [name for name, weight in mix.items() if weight > 0]
+    weights = [mix[name] for name in scenarios]
+    stop_at = time.perf_counter() + duration
+    recorders: List[Recorder] = []
+
+    def worker(index: int) -> None:
+        recorder = Recorder()
+        recorders.append(recorder)
+        client = Client(transport, fixture, random.Random(seed + index), recorder)
+        while time.perf_counter() < stop_at:
+            getattr(client, client.rnd.choices(scenarios, weights)[0])()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total = Recorder()
+    for recorder in recorders:
+        total.merge(recorder)
+    return total, elapsed
+
+
+# ===== Reporting =====
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest rank: the smallest value with at least pct% of the samples at or below it.
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    all_samples: List[float] = []
+    for label in sorted(recorder.samples):
+        values = sorted(recorder.samples[label])
+        all_samples.extend(values)
+        endpoints[label] = {
+            "count": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            "p50_ms": round(_percentile(values, 50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 99) * 1000, 3),
+            "errors": recorder.errors.get(label, 0),
+            "status": recorder.statuses.get(label, {}),
+        }
+    all_samples.sort()
+    return {
+        "endpoints": endpoints,
+        "total": {
+            "count": len(all_samples),
+            "rps": round(len(all_samples) / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(_percentile(all_samples, 50) * 1000, 3),
+            "p95_ms": round(_percentile(all_samples, 95) * 1000, 3),
+            "p99_ms": round(_percentile(all_samples, 99) * 1000, 3),
+            "errors": sum(recorder.errors.values()),
+        },
+    }
+
+
+def print_report(result: dict) -> None:
+    header = f"{'endpoint':48} {'count':>7} {'rps':>9} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'err':>5}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["total"])]
+    for label, row in rows:
+        print(
+            f"{label:48} {row['count']:>7} {row['rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+            f"{row['p99_ms']:>9} {row['errors']:>5}"
+        )
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> int:
+    regressions = 0
+    print(f"\n对比基线（{baseline.get('meta', {}).get('commit', '?')}，容忍度 {tolerance:.0%}）")
+    for label, row in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(label)
+        if not base:
+            continue
+        p95_delta = (row["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        rps_delta = (row["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+        flag = ""
+        if p95_delta > tolerance:
+            flag = "  <-- REGRESSION"
+            regressions += 1
+        print(f"{label:48} p95 {base['p95_ms']:>8} -> {row['p95_ms']:>8} ({p95_delta:+.0%})  rps {rps_delta:+.0%}{flag}")
+    return regressions
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _parse_mix(text: str) -> Dict[str, int]:
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (text or "").split(",")):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise SystemExit(f"未知场景：{name}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API 压测：在临时数据库上运行混合负载并输出各接口 RPS / 延迟分位")
+    parser.add_argument("--transport", choices=["flask", "gunicorn", "uvicorn"], default="flask")
+    parser.add_argument("--scale", type=float, default=1.0, help="数据规模倍数")
+    parser.add_argument("--clients", type=int, default=8, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=10.0, help="每轮压测秒数")
+    parser.add_argument("--warmup", type=float, default=1.0, help="预热秒数（不计入结果）")
+    parser.add_argument("--mix", default="", help="场景权重，如 browse=60,admin=0")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker 数")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn 每个 worker 的线程数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    parser.add_argument("--compare", default="", help="与基线 JSON 对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 允许退化比例")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-bench-")
+    env_overrides = {
+        "MULTI_ROLE_DB_PATH": os.path.join(workdir, "bench.db"),
+        "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "RATE_LIMIT_ENABLED": "0",
+        "DEEPSEEK_API_KEY": "",
+    }
+    os.environ.update(env_overrides)
+
+    transport = None
+    try:
+        setup_started = time.perf_counter()
+        fixture = build_dataset(env_overrides["MULTI_ROLE_DB_PATH"], scale=args.scale, seed=args.seed)
+        print(f"数据集构建完成：{len(fixture['project_ids'])} 个项目，{len(fixture['role_ids'])} 个岗位，"
+              f"{time.perf_counter() - setup_started:.2f}s")
+
+        if args.transport == "flask":
+            from server import create_app
+
+            transport = FlaskTransport(create_app())
+        elif args.transport == "uvicorn":
+            transport = start_uvicorn(dict(os.environ))
+        else:
+            transport = start_gunicorn(args.workers, args.threads, dict(os.environ))
+
+        mix = _parse_mix(args.mix)
+        if args.warmup > 0:
+            run_load(transport, fixture, args.clients, args.warmup, mix, args.seed + 1000)
+        recorder, elapsed = run_load(transport, fixture, args.clients, args.duration, mix, args.seed)
+        result = summarize(recorder, elapsed)
+        result["meta"] = {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "transport": transport.name,
+            "scale": args.scale,
+            "clients": args.clients,
+            "duration_s": round(elapsed, 2),
+            "mix": mix,
+            "python": sys.version.split()[0],
+        }
+        print_report(result)
+
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"\n结果已保存：{args.out}")
+        if args.compare:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            if compare(result, baseline, args.tolerance):
+                return 1
+        return 0
+    except RuntimeError as exc:
+        print(exc)
+        return 2
+    finally:
+        if transport is not None:
+            transport.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
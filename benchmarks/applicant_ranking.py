@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_data import generate  # noqa: E402
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return round(samples[len(samples) // 2] * 1000, 3)
+
+
+def run(repeat: int) -> Dict:
+    from server import db, ranking
+
+    role_id = 1
+    publisher_id = db.get_project(db.get_role(role_id)["data"]["project_id"])["data"]["publisher_id"]
+    rows = db.list_role_applications(role_id, publisher_id)["data"]
+
+    started = time.perf_counter()
+    ranking.rank_applications(role_id, [dict(row) for row in rows])
+    results: Dict[str, object] = {"applicants": len(rows), "cold_ms": round((time.perf_counter() - started) * 1000, 1)}
+    results["warm_ms"] = _median_ms(lambda: ranking.rank_applications(role_id, [dict(row) for row in rows]), repeat)
+
+    # The scoring step alone, on columns that are already built: what the two engines differ in.
+    tags = db.get_entity_tags("role", role_id)
+    tag_ids = [t["tag_id"] for t in tags]
+    idf = ranking.tag_weights("user", tag_ids)
+    weights = [idf[tag_id] for tag_id in tag_ids]
+    features = ranking._FEATURES.get([row["student_id"] for row in rows])
+    results["columns_ms"] = _median_ms(lambda: ranking._columns(rows, features, tag_ids, [t["name"] for t in tags]), repeat)
+    columns = ranking._columns(rows, features, tag_ids, [t["name"] for t in tags])
+    results["score_python_ms"] = _median_ms(lambda: ranking._score_python(columns, weights), repeat)
+    if ranking.load_numpy():
+        results["score_numpy_ms"] = _median_ms(lambda: ranking._score_numpy(columns, weights), repeat)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="申请人排序基准：为同一岗位的全部申请批量打分并排序")
+    parser.add_argument("--applicants", type=int, default=10000, help="申请人数（全部申请同一个岗位）")
+    parser.add_argument("--repeat", type=int, default=20, help="每项计时的重复次数（取中位数）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-ranking-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": db_path,
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+        }
+    )
+    try:
+        summary = generate(
+            db_path,
+            enterprises=1,
+            students=args.applicants,
+            projects_per_enterprise=1,
+            roles_per_project=1,
+            applications_per_student=1,
+            seed=args.seed,
+            reset=True,
+        )
+        print(f"数据：{summary['counts']['role_application']} 条申请，{summary['counts']['user_tag']} 条学生标签")
+
+        results = run(args.repeat)
+        for name, value in results.items():
+            print(f"{name:<18}{value}")
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"counts": summary["counts"], "results": results}, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+from scripts.generate_data import GENERATED_PASSWORD, generate
+
+
+BENCH_PASSWORD = GENERATED_PASSWORD
+
+
+def build_dataset(db_path: str, scale: float = 1.0, seed: int = 42) -> Dict[str, List]:
+    """Create a fresh database at db_path with scale-proportional users/projects/roles/applications.
+
+    Returns the ids and bearer tokens the load generator needs, keyed by user type.
+    """
+    summary = generate(
+        db_path,
+        enterprises=max(2, int(10 * scale)),
+        students=max(5, int(100 * scale)),
+        projects_per_enterprise=3,
+        roles_per_project=3,
+        applications_per_student=3,
+        token_rate=1.0,
+        seed=seed,
+        reset=True,
+    )
+    return {
+        "project_ids": summary["project_ids"],
+        "role_ids": summary["role_ids"],
+        "project_publisher": summary["project_publisher"],
+        "user_ids": summary["user_ids"],
+        "tokens": summary["tokens"],
+    }
@@ -0,0 +1,144 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_data import generate  # noqa: E402
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, event) -> None:
+        self.count += 1
+
+
+def _per_project_calls(client, headers: Dict[str, str]) -> int:
+    # What the enterprise pages did before: the project list, then roles per project and applications per role.
+    requests = 1
+    projects = client.get("/api/enterprise/projects", headers=headers).get_json()["projects"]
+    for project in projects:
+        roles = client.get(f"/api/enterprise/projects/{project['project_id']}/roles", headers=headers).get_json()["roles"]
+        requests += 1
+        for role in roles:
+            client.get(f"/api/enterprise/roles/{role['role_id']}/applications", headers=headers)
+            requests += 1
+    return requests
+
+
+def _summary_call(client, headers: Dict[str, str]) -> int:
+    resp = client.get("/api/enterprise/summary", headers=headers)
+    assert resp.status_code == 200, resp.get_data(as_text=True)
+    return 1
+
+
+def _measure(fn, client, headers: Dict[str, str], counter: _QueryCounter, repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        requests = fn(client, headers)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {"requests": requests, "queries": counter.count, "p50_ms": round(samples[len(samples) // 2] * 1000, 2)}
+
+
+def run(enterprise_ids: List[int], sizes: List[int], repeat: int) -> List[Dict]:
+    from server import create_app
+    from server.db import save_token
+    from server.instrumentation import QUERY_LISTENERS
+
+    # Registered before the app opens any connection, so every connection is instrumented.
+    counter = _QueryCounter()
+    QUERY_LISTENERS.append(counter)
+    client = create_app().test_client()
+
+    rows = []
+    for uid, size in zip(enterprise_ids, sizes):
+        token = f"bench-enterprise-{uid}"
+        save_token(token, uid)
+        headers = {"Authorization": f"Bearer {token}"}
+        before = _measure(_per_project_calls, client, headers, counter, repeat)
+        after = _measure(_summary_call, client, headers, counter, repeat)
+        rows.append({"projects": size, "per_project": before, "summary": after})
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="企业中心汇总接口基准：对比逐项目/逐角色请求与一次汇总请求的请求数、SQL 条数与耗时")
+    parser.add_argument("--sizes", default="1,5,10,30,100", help="各企业的项目数，逗号分隔")
+    parser.add_argument("--roles-per-project", type=int, default=4)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5, help="每项计时的重复次数（取中位数）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    workdir = tempfile.mkdtemp(prefix="cp-enterprise-summary-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": db_path,
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+        }
+    )
+    try:
+        summary = generate(
+            db_path,
+            enterprises=len(sizes),
+            students=args.students,
+            projects_per_enterprise=max(sizes),
+            roles_per_project=args.roles_per_project,
+            seed=args.seed,
+            reset=True,
+        )
+        # Every enterprise was generated with the largest portfolio; trim each one down to its size.
+        enterprise_ids = summary["user_ids"]["企业"]
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        for uid, size in zip(enterprise_ids, sizes):
+            conn.execute(
+                "DELETE FROM project WHERE publisher_id = ? AND project_id NOT IN "
+                "(SELECT project_id FROM project WHERE publisher_id = ? ORDER BY project_id LIMIT ?)",
+                (uid, uid, size),
+            )
+        conn.commit()
+        conn.close()
+
+        rows = run(enterprise_ids, sizes, args.repeat)
+        print(f"{'项目数':>6}{'逐项请求数':>10}{'SQL':>8}{'耗时ms':>10}{'汇总请求数':>10}{'SQL':>6}{'耗时ms':>10}")
+        for row in rows:
+            before, after = row["per_project"], row["summary"]
+            print(
+                f"{row['projects']:>8}{before['requests']:>14}{before['queries']:>9}{before['p50_ms']:>12}"
+                f"{after['requests']:>14}{after['queries']:>7}{after['p50_ms']:>12}"
+            )
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"counts": summary["counts"], "results": rows}, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
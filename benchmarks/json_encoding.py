@@ -0,0 +1,136 @@
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.dataset import build_dataset  # noqa: E402
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> Dict:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {"median_ms": round(samples[len(samples) // 2] * 1000, 3), "bytes": len(body)}
+
+
+def _payloads(db_path: str) -> Dict[str, dict]:
+    from server.db import get_admin_dashboard_data, list_all_users, list_public_projects
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        raw_rows = conn.execute("SELECT * FROM role_application ORDER BY application_id DESC").fetchall()
+    finally:
+        conn.close()
+    return {
+        "projects": {"success": True, "projects": list_public_projects(), "seq": 1, "full": True},
+        "admin_users": {"success": True, "message": "ok", "data": list_all_users(limit=5000)["data"]},
+        "dashboard": {"success": True, "data": get_admin_dashboard_data(limit=50)["data"]},
+        # Same rows handed over as sqlite3.Row, without the dict(row) copy the helpers make today.
+        "applications_rows": {"success": True, "applications": raw_rows},
+        "applications_dicts": {"success": True, "applications": [dict(r) for r in raw_rows]},
+    }
+
+
+def run(repeat: int, fields: str) -> List[Dict]:
+    from flask.json.provider import DefaultJSONProvider
+
+    from server import create_app
+    from server.responses import FastJSONProvider
+
+    app = create_app()
+    baseline = DefaultJSONProvider(app)
+    baseline.ensure_ascii = False
+    fast = FastJSONProvider(app)
+    fast.ensure_ascii = False
+
+    results = []
+    with app.app_context():
+        payloads = _payloads(os.environ["MULTI_ROLE_DB_PATH"])
+    for name, payload in payloads.items():
+        with app.test_request_context("/"):
+            variants = {
+                "fast": lambda: fast.response(payload).get_data(),
+                "fast+gzip": lambda: gzip.compress(fast.response(payload).get_data(), compresslevel=5, mtime=0),
+            }
+            if not name.endswith("_rows"):
+                # The stdlib encoder cannot take sqlite3.Row, which is exactly the copy being measured.
+                variants = {"baseline": lambda: baseline.response(payload).get_data(), **variants}
+            row = {"payload": name}
+            for variant, fn in variants.items():
+                row[variant] = _time(fn, repeat)
+        with app.test_request_context(f"/?fields={fields}"):
+            row["fast+fields"] = _time(lambda: fast.response(payload).get_data(), repeat)
+        results.append(row)
+    return results
+
+
+def print_results(results: List[Dict]) -> None:
+    variants = ["baseline", "fast", "fast+gzip", "fast+fields"]
+    print(f"{'payload':<20}" + "".join(f"{v:>24}" for v in variants))
+    for row in results:
+        cells = []
+        for variant in variants:
+            cell = row.get(variant)
+            cells.append(f"{cell['median_ms']:>10.3f} ms {cell['bytes']:>9} B" if cell else f"{'-':>24}")
+        print(f"{row['payload']:<20}" + "".join(cells))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JSON 响应序列化微基准：标准库 jsonify 与 orjson/压缩/字段裁剪对比")
+    parser.add_argument("--scale", type=float, default=2.0, help="数据规模（同 api_load.py）")
+    parser.add_argument("--repeat", type=int, default=200, help="每种组合的重复次数，取中位数")
+    parser.add_argument("--fields", default="project_id,project_name,application_id,status,user_id,username")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-json-bench-")
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": os.path.join(workdir, "bench.db"),
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+        }
+    )
+    try:
+        build_dataset(os.environ["MULTI_ROLE_DB_PATH"], scale=args.scale, seed=args.seed)
+        results = run(args.repeat, args.fields)
+        print_results(results)
+        from server.responses import JSON_ENCODER, orjson
+
+        if orjson is not None and JSON_ENCODER != "stdlib":
+            print("\nfast = orjson")
+        else:
+            print("\nfast = 标准库 json（未启用 orjson）")
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"scale": args.scale, "results": results}, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
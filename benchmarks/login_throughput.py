@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.api_load import FlaskTransport, Recorder, print_report, start_gunicorn, summarize  # noqa: E402
+from benchmarks.dataset import BENCH_PASSWORD, build_dataset  # noqa: E402
+
+
+def run_logins(
+    transport, usernames: List[str], clients: int, duration: float, bad_ratio: float, backoff: float, seed: int
+) -> Tuple[Recorder, float]:
+    stop_at = time.perf_counter() + duration
+    recorders: List[Recorder] = []
+
+    def worker(index: int) -> None:
+        recorder = Recorder()
+        recorders.append(recorder)
+        rnd = random.Random(seed + index)
+        while time.perf_counter() < stop_at:
+            bad = rnd.random() < bad_ratio
+            label = "POST /api/auth/login (bad)" if bad else "POST /api/auth/login"
+            body = json.dumps(
+                {"username": rnd.choice(usernames), "password": "wrong-password" if bad else BENCH_PASSWORD}
+            ).encode("utf-8")
+            started = time.perf_counter()
+            try:
+                status, _ = transport.request("POST", "/api/auth/login", {"Content-Type": "application/json"}, body)
+            except Exception:
+                recorder.errors[label] = recorder.errors.get(label, 0) + 1
+                continue
+            recorder.samples.setdefault(label, []).append(time.perf_counter() - started)
+            counts = recorder.statuses.setdefault(label, {})
+            counts[str(status)] = counts.get(str(status), 0) + 1
+            if status >= 500:
+                recorder.errors[label] = recorder.errors.get(label, 0) + 1
+            elif status == 429 and backoff > 0:
+                # Well-behaved clients back off instead of hammering a saturated pool.
+                time.sleep(rnd.uniform(0.5, 1.5) * backoff)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    total = Recorder()
+    for recorder in recorders:
+        total.merge(recorder)
+    return total, elapsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="登录吞吐压测：并发登录下的成功/429 比例与延迟分位")
+    parser.add_argument("--transport", choices=["flask", "gunicorn"], default="flask")
+    parser.add_argument("--clients", type=int, default=16, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测秒数")
+    parser.add_argument("--users", type=int, default=200, help="参与登录的学生账号数")
+    parser.add_argument("--bad-ratio", type=float, default=0.1, help="错误密码请求比例")
+    parser.add_argument("--backoff-ms", type=float, default=100, help="收到 429 后的平均退避毫秒数，0 表示不退避")
+    parser.add_argument("--method", default="", help="PASSWORD_HASH_METHOD，如 scrypt:16384:8:1")
+    parser.add_argument("--hash-workers", type=int, default=0, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--hash-queue", type=int, default=0, help="PASSWORD_HASH_QUEUE")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker 数")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn 每个 worker 的线程数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-login-bench-")
+    env_overrides = {
+        "MULTI_ROLE_DB_PATH": os.path.join(workdir, "bench.db"),
+        "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "RATE_LIMIT_ENABLED": "0",
+        "SLOW_QUERY_ENABLED": "0",
+    }
+    if args.method:
+        env_overrides["PASSWORD_HASH_METHOD"] = args.method
+    if args.hash_workers:
+        env_overrides["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+    if args.hash_queue:
+        env_overrides["PASSWORD_HASH_QUEUE"] = str(args.hash_queue)
+    os.environ.update(env_overrides)
+
+    transport = None
+    try:
+        build_dataset(env_overrides["MULTI_ROLE_DB_PATH"], scale=max(0.05, args.users / 100), seed=args.seed)
+        usernames = [f"student{i + 1}" for i in range(args.users)]
+
+        if args.transport == "flask":
+            from server import create_app
+
+            transport = FlaskTransport(create_app())
+        else:
+            transport = start_gunicorn(args.workers, args.threads, dict(os.environ))
+
+        recorder, elapsed = run_logins(
+            transport, usernames, args.clients, args.duration, args.bad_ratio, args.backoff_ms / 1000, args.seed
+        )
+        result = summarize(recorder, elapsed)
+        statuses = {}
+        for counts in recorder.statuses.values():
+            for status, n in counts.items():
+                statuses[status] = statuses.get(status, 0) + n
+        result["meta"] = {
+            "transport": args.transport,
+            "clients": args.clients,
+            "duration_s": round(elapsed, 2),
+            "backoff_ms": args.backoff_ms,
+            "method": os.environ.get("PASSWORD_HASH_METHOD", "scrypt"),
+            "statuses": statuses,
+            "logins_per_sec": round(statuses.get("200", 0) / elapsed, 2) if elapsed else 0,
+        }
+        print_report(result)
+        print(f"\n状态码分布：{statuses}，成功登录 {result['meta']['logins_per_sec']}/s")
+
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    except RuntimeError as exc:
+        print(exc)
+        return 2
+    finally:
+        if transport is not None:
+            transport.close()
+        if args.transport == "flask":
+            from server.passwords import shutdown_password_pool
+
+            shutdown_password_pool()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,122 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_data import generate  # noqa: E402
+
+
+def _drive(app, ids: List[int], threads: int, after_view=None) -> Dict:
+    # Each thread gets its own client and a share of the (skewed) project ids.
+    samples: List[float] = []
+    lock = threading.Lock()
+
+    def worker(chunk: List[int]) -> None:
+        client = app.test_client()
+        local = []
+        for project_id in chunk:
+            started = time.perf_counter()
+            resp = client.get(f"/api/projects/{project_id}")
+            assert resp.status_code == 200, resp.get_data(as_text=True)
+            if after_view is not None:
+                after_view(project_id)
+            local.append(time.perf_counter() - started)
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(ids[i::threads],)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    samples.sort()
+    return {
+        "views": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def run(project_ids: List[int], views: int, threads: int, seed: int) -> Dict:
+    from server import create_app, popularity
+    from server.db import add_project_views
+
+    app = create_app()
+    rnd = random.Random(seed)
+    # A few projects take most of the views, as on a real listing page.
+    ids = rnd.choices(project_ids, weights=[1 / (rank + 1) for rank in range(len(project_ids))], k=views)
+
+    # What counting would cost with an UPDATE in every request.
+    popularity.VIEW_COUNTING = False
+    per_view = _drive(
+        app, ids, threads, lambda project_id: add_project_views({project_id: (1, popularity.view_weight(time.time()))})
+    )
+    per_view["write_transactions"] = views
+
+    popularity.VIEW_COUNTING = True
+    buffered = _drive(app, ids, threads)
+    started = time.perf_counter()
+    flushed = popularity.flush_views()
+    buffered.update(
+        write_transactions=1, flush_ms=round((time.perf_counter() - started) * 1000, 2), flushed_views=flushed
+    )
+    return {"per_view_update": per_view, "buffered": buffered}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="项目浏览计数基准：对比每次浏览一条 UPDATE 与 worker 内缓冲、批量写回")
+    parser.add_argument("--enterprises", type=int, default=50)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--views", type=int, default=4000, help="浏览请求总数")
+    parser.add_argument("--threads", type=int, default=8, help="并发线程数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-project-views-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": db_path,
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+            # Only the explicit flush after the buffered run writes.
+            "VIEW_FLUSH_INTERVAL": "3600",
+        }
+    )
+    try:
+        summary = generate(db_path, enterprises=args.enterprises, students=args.students, seed=args.seed, reset=True)
+        results = run(summary["project_ids"], args.views, args.threads, args.seed)
+        for name, row in results.items():
+            print(f"{name:<18}" + "  ".join(f"{k}={v}" for k, v in row.items()))
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"counts": summary["counts"], "results": results}, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_data import generate  # noqa: E402
+
+
+def _percentiles(fn: Callable[[int], object], ids: List[int]) -> Dict:
+    samples = []
+    for entity_id in ids:
+        started = time.perf_counter()
+        fn(entity_id)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "calls": len(samples),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+def run(summary: Dict, calls: int, limit: int, seed: int) -> Dict:
+    from server import matching
+
+    rnd = random.Random(seed)
+    results: Dict[str, Dict] = {}
+    for kind in ("role", "user"):
+        index = matching._INDEXES[kind]
+        started = time.perf_counter()
+        with index.lock:
+            index.refresh()
+        results[f"{kind}_index_load"] = {
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "indexed": len(index.tags_of),
+            "tags": len(index.postings),
+        }
+
+    students = rnd.choices(summary["user_ids"]["学生"], k=calls)
+    results["recommended_roles"] = _percentiles(lambda sid: matching.recommend_roles(sid, limit), students)
+
+    roles = rnd.choices(summary["role_ids"], k=calls)
+    publisher = summary["project_publisher"]
+    role_project = summary["role_project"]
+    results["recommended_candidates"] = _percentiles(
+        lambda rid: matching.recommend_candidates(rid, publisher[role_project[rid]], limit), roles
+    )
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="技能标签推荐基准：按标签倒排索引为学生推荐岗位、为岗位推荐候选人")
+    parser.add_argument("--enterprises", type=int, default=2500, help="企业数（默认 2500 × 10 项目 × 4 岗位 = 10 万岗位）")
+    parser.add_argument("--projects-per-enterprise", type=int, default=10)
+    parser.add_argument("--roles-per-project", type=int, default=4)
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=200, help="每个接口的调用次数")
+    parser.add_argument("--limit", type=int, default=20, help="每次推荐返回条数")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-recommend-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": db_path,
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+        }
+    )
+    try:
+        summary = generate(
+            db_path,
+            enterprises=args.enterprises,
+            students=args.students,
+            projects_per_enterprise=args.projects_per_enterprise,
+            roles_per_project=args.roles_per_project,
+            applications_per_student=3,
+            seed=args.seed,
+            reset=True,
+        )
+        print(f"数据：{summary['counts']['role']} 个岗位，{summary['counts']['role_tag']} 条岗位标签")
+        conn = sqlite3.connect(db_path)
+        summary["role_project"] = dict(conn.execute("SELECT role_id, project_id FROM role").fetchall())
+        conn.close()
+
+        results = run(summary, args.calls, args.limit, args.seed)
+        for name, row in results.items():
+            print(f"{name:<24}" + "  ".join(f"{k}={v}" for k, v in row.items()))
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"counts": summary["counts"], "results": results}, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
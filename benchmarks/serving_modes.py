@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.api_load import _percentile, start_gunicorn, start_uvicorn  # noqa: E402
+from benchmarks.dataset import build_dataset  # noqa: E402
+
+STUB_ROLES = {
+    "roles": [
+        {"role_name": "后端开发", "task_desc": "接口与数据层", "skill_require": "Python", "limit_num": 2, "task_deadline": ""},
+        {"role_name": "前端开发", "task_desc": "页面与交互", "skill_require": "Vue", "limit_num": 1, "task_deadline": ""},
+    ],
+    "assumptions": [],
+    "questions_to_confirm": [],
+}
+
+
+# ===== Slow AI provider stub =====
+
+
+def start_provider_stub(delay: float) -> ThreadingHTTPServer:
+    body = json.dumps({"choices": [{"message": {"content": json.dumps(STUB_ROLES, ensure_ascii=False)}}]}).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ===== Client behaviours =====
+
+
+def _raw_request(host: str, port: int, head: bytes, body: bytes, trickle: float, timeout: float) -> int:
+    """Send a request whose body dribbles in over `trickle` seconds, then read the status line."""
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.sendall(head)
+        step = trickle / max(1, len(body))
+        for i in range(len(body)):
+            sock.sendall(body[i : i + 1])
+            if step:
+                time.sleep(step)
+        status_line = sock.makefile("rb").readline().decode("latin-1")
+    parts = status_line.split(" ", 2)
+    return int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+
+
+def slow_client(transport, fixture: dict, rnd: random.Random, stop_at: float, trickle: float, stats: Dict) -> None:
+    while time.perf_counter() < stop_at:
+        token = rnd.choice(fixture["tokens"]["学生"])
+        role_id = rnd.choice(fixture["role_ids"])
+        body = json.dumps({"motivation": "慢速上传 " * 8}, ensure_ascii=False).encode("utf-8")
+        head = (
+            f"POST /api/roles/{role_id}/apply HTTP/1.1\r\nHost: {transport.host}\r\n"
+            f"Authorization: Bearer {token}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        ).encode("latin-1")
+        try:
+            _raw_request(transport.host, transport.port, head, body, trickle, timeout=trickle + 60)
+            stats["slow_done"] += 1
+        except OSError:
+            stats["slow_errors"] += 1
+
+
+def long_poll_client(transport, fixture: dict, rnd: random.Random, stop_at: float, stats: Dict) -> None:
+    owners = fixture["project_publisher"]
+    token_by_user = dict(zip(fixture["user_ids"]["企业"], fixture["tokens"]["企业"]))
+    project_ids = [pid for pid in fixture["project_ids"] if owners.get(pid) in token_by_user]
+    while time.perf_counter() < stop_at:
+        pid = rnd.choice(project_ids)
+        body = json.dumps({"max_roles": 2}).encode("utf-8")
+        headers = {"Authorization": f"Bearer {token_by_user[owners[pid]]}", "Content-Type": "application/json"}
+        try:
+            transport.request("POST", f"/api/projects/{pid}/roles/ai-suggest", headers, body)
+            stats["long_done"] += 1
+        except OSError:
+            stats["long_errors"] += 1
+
+
+def fast_client(transport, fixture: dict, rnd: random.Random, stop_at: float, samples: List[float], stats: Dict) -> None:
+    while time.perf_counter() < stop_at:
+        pid = rnd.choice(fixture["project_ids"])
+        started = time.perf_counter()
+        try:
+            status, _ = transport.request("GET", f"/api/projects/{pid}", {})
+        except OSError:
+            stats["fast_errors"] += 1
+            continue
+        samples.append(time.perf_counter() - started)
+        if status >= 500:
+            stats["fast_errors"] += 1
+
+
+def run_mode(mode: str, args, fixture: dict) -> Dict:
+    env = dict(os.environ)
+    if mode == "asgi":
+        env["ASGI_THREADS"] = str(args.asgi_threads)
+        transport = start_uvicorn(env)
+    else:
+        transport = start_gunicorn(args.workers, args.threads, env)
+
+    stats = {k: 0 for k in ("slow_done", "slow_errors", "long_done", "long_errors", "fast_errors")}
+    samples: List[float] = []
+    stop_at = time.perf_counter() + args.duration
+    threads = []
+    for i in range(args.slow_clients):
+        threads.append(threading.Thread(target=slow_client, args=(transport, fixture, random.Random(i), stop_at, args.trickle, stats)))
+    for i in range(args.long_poll_clients):
+        threads.append(threading.Thread(target=long_poll_client, args=(transport, fixture, random.Random(1000 + i), stop_at, stats)))
+    # Let the slow traffic occupy the server before measuring the fast clients.
+    for t in threads:
+        t.daemon = True
+        t.start()
+    time.sleep(min(1.0, args.duration / 5))
+    fast_stop = stop_at
+    fast_started = time.perf_counter()
+    fast_threads = [
+        threading.Thread(target=fast_client, args=(transport, fixture, random.Random(2000 + i), fast_stop, samples, stats), daemon=True)
+        for i in range(args.fast_clients)
+    ]
+    for t in fast_threads:
+        t.start()
+    for t in fast_threads:
+        t.join()
+    fast_elapsed = time.perf_counter() - fast_started
+    for t in threads:
+        t.join(timeout=args.trickle + 10)
+    transport.close()
+
+    samples.sort()
+    return {
+        "mode": mode,
+        "fast_requests": len(samples),
+        "fast_rps": round(len(samples) / fast_elapsed, 2) if fast_elapsed else 0,
+        "fast_p50_ms": round(_percentile(samples, 50) * 1000, 3),
+        "fast_p95_ms": round(_percentile(samples, 95) * 1000, 3),
+        "fast_p99_ms": round(_percentile(samples, 99) * 1000, 3),
+        **stats,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="WSGI（gunicorn sync）与 ASGI（uvicorn）在慢客户端/长等待负载下的对比")
+    parser.add_argument("--modes", default="wsgi,asgi", help="逗号分隔：wsgi,asgi")
+    parser.add_argument("--duration", type=float, default=15.0, help="每种模式压测秒数")
+    parser.add_argument("--slow-clients", type=int, default=16, help="慢速上传请求体的客户端数")
+    parser.add_argument("--trickle", type=float, default=3.0, help="慢客户端发送完请求体所需秒数")
+    parser.add_argument("--long-poll-clients", type=int, default=8, help="等待慢速 AI 接口的客户端数")
+    parser.add_argument("--provider-delay", type=float, default=3.0, help="AI 接口桩的响应延迟秒数")
+    parser.add_argument("--fast-clients", type=int, default=8, help="测量延迟的普通读客户端数")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker 数")
+    parser.add_argument("--threads", type=int, default=1, help="gunicorn 每个 worker 的线程数（1 即 sync worker）")
+    parser.add_argument("--asgi-threads", type=int, default=32, help="ASGI 模式下执行视图的线程数")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="cp-serving-bench-")
+    stub = start_provider_stub(args.provider_delay)
+    os.environ.update(
+        {
+            "MULTI_ROLE_DB_PATH": os.path.join(workdir, "bench.db"),
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "DEEPSEEK_API_KEY": "bench",
+            "DEEPSEEK_API_URL": f"http://127.0.0.1:{stub.server_address[1]}/chat/completions",
+            "DEEPSEEK_TIMEOUT": str(args.provider_delay + 30),
+        }
+    )
+    results = []
+    try:
+        fixture = build_dataset(os.environ["MULTI_ROLE_DB_PATH"], scale=args.scale, seed=args.seed)
+        for mode in filter(None, (m.strip() for m in args.modes.split(","))):
+            print(f"运行 {mode} 模式 ...", flush=True)
+            results.append(run_mode(mode, args, fixture))
+    except RuntimeError as exc:
+        print(exc)
+        return 2
+    finally:
+        stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    header = f"{'mode':6} {'fast rps':>9} {'p50ms':>9} {'p95ms':>9} {'p99ms':>9} {'fast err':>9} {'slow ok':>8} {'long ok':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['mode']:6} {r['fast_rps']:>9} {r['fast_p50_ms']:>9} {r['fast_p95_ms']:>9} {r['fast_p99_ms']:>9} "
+            f"{r['fast_errors']:>9} {r['slow_done']:>8} {r['long_done']:>8}"
+        )
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存：{args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
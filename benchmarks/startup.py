@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SERVER_DIR = PROJECT_ROOT / "server"
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.generate_data import generate  # noqa: E402
+
+# "import time:  self [us] | cumulative | name", indented by nesting depth.
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+FIRST_PARTY = {path.stem for path in SERVER_DIR.glob("*.py")}
+
+
+def _median(values: List[float]) -> float:
+    values = sorted(values)
+    return round(values[len(values) // 2], 2)
+
+
+def _memory_mb() -> Dict[str, float]:
+    # USS (pages only this process holds) and PSS (shared pages split between their users), Linux only.
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r", encoding="utf-8") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0])
+    except OSError:
+        return {}
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return {"uss_mb": round(uss / 1024, 2), "pss_mb": round(fields.get("Pss", 0) / 1024, 2)}
+
+
+def _child(args: List[str], env: Dict[str, str]) -> Dict:
+    started = time.time()
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", *args], env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if "ready_at" in result:
+        result["ready_ms"] = round((result.pop("ready_at") - started) * 1000, 2)
+    return result
+
+
+# ===== Measurements (each in a fresh interpreter) =====
+
+
+def measure_imports(env: Dict[str, str], top: int) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app_factory"],
+        cwd=SERVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    by_package: Dict[str, int] = defaultdict(int)
+    first_party = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        root = name.split(".")[0]
+        by_package[root] += self_us
+        if root in FIRST_PARTY:
+            first_party.append({"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)})
+        if name == "app_factory" and not indent:
+            total = cumulative_us
+    packages = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "total_ms": round(total / 1000, 2),
+        "packages_ms": {name: round(us / 1000, 2) for name, us in packages},
+        "first_party": sorted(first_party, key=lambda row: row["cumulative_ms"], reverse=True)[:top],
+    }
+
+
+def run_child(mode: str, path: str, forks: int) -> Dict:
+    sys.path.insert(0, str(SERVER_DIR))
+    started = time.perf_counter()
+    if mode == "fork":
+        from lifecycle import begin_master
+
+        begin_master()
+    from app_factory import create_app, prepare_for_fork
+
+    imported = time.perf_counter()
+    app = create_app()
+    result: Dict[str, object] = {
+        "import_ms": round((imported - started) * 1000, 2),
+        "phases_ms": app.extensions["startup_phases"],
+    }
+    if mode == "cold":
+        # A worker without preload: interpreter, imports, create_app, then its first request.
+        status = app.test_client().get(path).status_code
+        result.update(status=status, ready_at=time.time(), memory=_memory_mb())
+    elif mode == "fork":
+        # What gunicorn --preload does: the master builds the app once, workers are forked from it.
+        from lifecycle import run_after_fork
+
+        prepare_for_fork(app)
+        result["prefork_ms"] = app.extensions["prefork_phases"]
+        samples, memory = [], []
+        for _ in range(forks):
+            read_fd, write_fd = os.pipe()
+            forked_at = time.time()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_fd)
+                run_after_fork()
+                status = app.test_client().get(path).status_code
+                sample = {"ms": (time.time() - forked_at) * 1000, "status": status, "memory": _memory_mb()}
+                os.write(write_fd, json.dumps(sample).encode())
+                os._exit(0)
+            os.close(write_fd)
+            with os.fdopen(read_fd) as pipe:
+                sample = json.loads(pipe.read())
+            os.waitpid(pid, 0)
+            assert sample["status"] == 200, sample
+            samples.append(sample["ms"])
+            memory.append(sample["memory"])
+        result.update(fork_ready_ms=_median(samples), fork_ready_max_ms=round(max(samples), 2))
+        result["memory"] = {key: _median([m[key] for m in memory]) for key in memory[0]} if memory[0] else {}
+    print(json.dumps(result))
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="启动耗时剖析：import 耗时分解、create_app 各阶段耗时、冷启动与 preload+fork 的 worker 就绪时间")
+    parser.add_argument("--runs", type=int, default=5, help="冷启动重复次数（取中位数）")
+    parser.add_argument("--forks", type=int, default=20, help="preload 后 fork 的 worker 数（取中位数）")
+    parser.add_argument("--path", default="/api/projects", help="worker 就绪后的第一个请求")
+    parser.add_argument("--top", type=int, default=12, help="import 分解中列出的包/模块数")
+    parser.add_argument("--out", default="", help="结果 JSON 路径")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "PATH", "FORKS"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.child:
+        mode, path, forks = args.child
+        run_child(mode, path, int(forks))
+        return 0
+
+    workdir = tempfile.mkdtemp(prefix="cp-startup-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    env = dict(os.environ)
+    env.update(
+        {
+            "MULTI_ROLE_DB_PATH": db_path,
+            "FEEDBACK_UPLOAD_DIR": os.path.join(workdir, "uploads"),
+            "RATE_LIMIT_ENABLED": "0",
+            "SLOW_QUERY_ENABLED": "0",
+        }
+    )
+    try:
+        generate(db_path, enterprises=5, students=200, seed=42, reset=True)
+        # The first boot migrates and creates the admin; what is measured below is a restart.
+        _child(["phases", args.path, "0"], env)
+
+        results: Dict[str, object] = {"imports": measure_imports(env, args.top)}
+        cold = [_child(["cold", args.path, "0"], env) for _ in range(args.runs)]
+        results["cold"] = {
+            "import_ms": _median([run["import_ms"] for run in cold]),
+            "phases_ms": {name: _median([run["phases_ms"][name] for run in cold]) for name in cold[0]["phases_ms"]},
+            "ready_ms": _median([run["ready_ms"] for run in cold]),
+            "memory": {key: _median([run["memory"][key] for run in cold]) for key in cold[0]["memory"]},
+        }
+        fork = _child(["fork", args.path, str(args.forks)], env)
+        results["fork"] = {key: fork[key] for key in ("prefork_ms", "fork_ready_ms", "fork_ready_max_ms", "memory")}
+
+        imports = results["imports"]
+        print(f"import app_factory：{imports['total_ms']} ms")
+        for name, ms in imports["packages_ms"].items():
+            print(f"  {name:<24}{ms:>8}")
+        print("本项目模块（累计）：")
+        for row in imports["first_party"]:
+            print(f"  {row['module']:<24}{row['cumulative_ms']:>8}")
+        print("create_app 各阶段（中位数 ms）：")
+        for name, ms in results["cold"]["phases_ms"].items():
+            print(f"  {name:<24}{ms:>8}")
+        print(f"冷启动 worker 就绪：{results['cold']['ready_ms']} ms（含解释器启动、import、create_app 与首个请求）")
+        print("fork 前准备（master，ms）：")
+        for name, ms in results["fork"]["prefork_ms"].items():
+            print(f"  {name:<24}{ms:>8}")
+        print(f"preload 后 fork 的 worker 就绪：{results['fork']['fork_ready_ms']} ms（最大 {results['fork']['fork_ready_max_ms']} ms）")
+        for label, memory in (("冷启动", results["cold"]["memory"]), ("fork", results["fork"]["memory"])):
+            if memory:
+                print(f"{label} worker 内存：USS {memory['uss_mb']} MB，PSS {memory['pss_mb']} MB")
+        if args.out:
+            Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"结果已保存：{args.out}")
+        return 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
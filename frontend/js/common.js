@@ -35,6 +35,77 @@
             .replace(/'/g, "&#39;");
     }
 
+    // 统一的接口请求：带上 Bearer token，按 {success, message} 响应格式判断成败，失败时抛出 Error(message)。
+    function apiFetch(path, options) {
+        options = options || {};
+        var headers = Object.assign({}, options.headers || {});
+        var token = getToken();
+        if (token) headers.Authorization = "Bearer " + token;
+        if (typeof options.body === "string" && !headers["Content-Type"]) headers["Content-Type"] = "application/json";
+        var url = getApiBase() + path;
+        return fetch(url, Object.assign({}, options, { headers: headers })).then(function (response) {
+            return response.text().then(function (text) {
+                var data = {};
+                try {
+                    data = text ? JSON.parse(text) : {};
+                } catch (err) {
+                    var hint = (response.status + " " + response.statusText).trim();
+                    throw new Error("服务返回了非 JSON 响应（" + hint + "），请检查接口地址：" + url);
+                }
+                if (!response.ok || data.success === false) {
+                    throw new Error(data.message || data.msg || "请求失败");
+                }
+                return data;
+            });
+        });
+    }
+
+    // 订阅服务端推送（SSE）。EventSource 不能带请求头，先换取一次性 ticket 放进 URL，避免 token 出现在访问日志中。
+    // 票据只能用一次，所以连接被关闭（票据已用、服务繁忙返回 503 等）后重新换票，并带上 last_event_id 补发断线期间的事件。
+    function subscribeEvents(eventTypes, onEvent) {
+        if (!getToken() || typeof window.EventSource !== "function") return null;
+        var handle = { source: null, closed: false, lastEventId: "" };
+        handle.close = function () {
+            handle.closed = true;
+            if (handle.source) handle.source.close();
+        };
+
+        function open() {
+            if (handle.closed) return;
+            apiFetch("/api/events/ticket", { method: "POST" })
+                .then(function (res) {
+                    if (handle.closed) return;
+                    var url = getApiBase() + "/api/events/stream?ticket=" + encodeURIComponent(res.ticket);
+                    if (handle.lastEventId) url += "&last_event_id=" + encodeURIComponent(handle.lastEventId);
+                    var source = new EventSource(url);
+                    handle.source = source;
+                    eventTypes.forEach(function (type) {
+                        source.addEventListener(type, function (e) {
+                            if (e.lastEventId) handle.lastEventId = e.lastEventId;
+                            var payload = {};
+                            try {
+                                payload = JSON.parse(e.data || "{}");
+                            } catch (err) {
+                                return;
+                            }
+                            onEvent(type, payload.data || {}, payload);
+                        });
+                    });
+                    source.onerror = function () {
+                        // 浏览器自动重连会复用已失效的票据，直接关闭后换新票据重连
+                        source.close();
+                        setTimeout(open, 5000);
+                    };
+                })
+                .catch(function () {
+                    setTimeout(open, 15000);
+                });
+        }
+
+        open();
+        return handle;
+    }
+
     window.CP = {
         getApiBase: getApiBase,
         getToken: getToken,
@@ -42,5 +113,7 @@
         qsa: qsa,
         formatDate: formatDate,
         escapeHtml: escapeHtml,
+        apiFetch: apiFetch,
+        subscribeEvents: subscribeEvents,
     };
 })(window);
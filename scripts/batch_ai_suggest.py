@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from server.app_factory import load_local_env  # noqa: E402
+from server.db import init_database  # noqa: E402
+from server.projects import _call_deepseek_role_suggest, _generate_role_suggestions, _normalize_role_name  # noqa: E402
+from server.role_batch import DEFAULT_BATCH_WORKERS, DEFAULT_PROVIDER_RATE, run_role_suggest_batch  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="批量为项目生成 AI 岗位建议，并保存为草稿岗位")
+    parser.add_argument("project_ids", nargs="+", type=int, help="项目 ID 列表")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS, help="并发数")
+    parser.add_argument("--rate", type=float, default=DEFAULT_PROVIDER_RATE, help="每秒最多调用模型次数")
+    parser.add_argument("--max-roles", type=int, default=4, help="每个项目最多生成的岗位数")
+    parser.add_argument("--publisher-id", type=int, default=None, help="仅处理该企业发布的项目")
+    parser.add_argument("--dry-run", action="store_true", help="只生成建议，不写入数据库")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    load_local_env()
+    init_database()
+
+    report = run_role_suggest_batch(
+        args.project_ids,
+        suggest=_generate_role_suggestions,
+        call_provider=_call_deepseek_role_suggest,
+        normalize_name=_normalize_role_name,
+        publisher_id=args.publisher_id,
+        persist=not args.dry_run,
+        payload={"max_roles": args.max_roles},
+        max_workers=args.workers,
+        rate_per_sec=args.rate,
+    )
+
+    for item in report["results"]:
+        print(
+            f"[ok] project={item['project_id']} provider={item['provider']} "
+            f"roles={item['role_count']} {item['suggest_ms']}ms"
+        )
+    for item in report["failures"]:
+        print(f"[失败] project={item['project_id']} {item['message']}")
+    summary = {k: v for k, v in report.items() if k not in ("results", "failures")}
+    print(json.dumps(summary, ensure_ascii=False))
+    return 0 if not report["failures"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
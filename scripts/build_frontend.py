@@ -0,0 +1,180 @@
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FRONTEND_DIR = PROJECT_ROOT / "frontend"
+DIST_DIR = FRONTEND_DIR / "dist"
+# Not part of the build: user uploads are served from the source tree, and dist/ is the output.
+SKIP_DIRS = {"dist", "uploads"}
+COMPRESSIBLE = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+HASH_LEN = 10
+
+
+def _fingerprint(rel: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LEN]}{ext}"
+
+
+def _rewrite(text: str, manifest: Dict[str, str]) -> str:
+    # Matches ./styles/theme.css, /styles/theme.css and styles/theme.css inside quotes or url(...).
+    for rel, hashed in manifest.items():
+        pattern = re.compile(r"""(?<=["'(])(\./|/)?""" + re.escape(rel) + r"""(?=["')?#])""")
+        text = pattern.sub(lambda m: (m.group(1) or "") + hashed, text)
+    return text
+
+
+def _compress(path: Path, data: bytes) -> Dict[str, int]:
+    sizes = {"raw": len(data)}
+    if path.suffix not in COMPRESSIBLE:
+        return sizes
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        path.with_name(path.name + ".gz").write_bytes(gz)
+        sizes["gzip"] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            path.with_name(path.name + ".br").write_bytes(br)
+            sizes["br"] = len(br)
+    return sizes
+
+
+def _sources(src: Path) -> List[str]:
+    files = []
+    for root, dirs, names in os.walk(src):
+        dirs[:] = sorted(d for d in dirs if not (Path(root) == src and d in SKIP_DIRS))
+        for name in sorted(names):
+            files.append((Path(root) / name).relative_to(src).as_posix())
+    return files
+
+
+def build(src: Path = FRONTEND_DIR, out: Path = DIST_DIR) -> Dict:
+    """Copy frontend/ into out/ with content-hashed asset names, rewritten page references and .gz/.br siblings.
+
+    Pages keep their names (their URLs are linked and bookmarked); everything they reference is fingerprinted.
+    """
+    if out.exists():
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+    files = _sources(src)
+    pages = [f for f in files if f.endswith(".html")]
+    # Stylesheets go last among the assets so the images they reference are already fingerprinted.
+    assets = sorted((f for f in files if not f.endswith(".html")), key=lambda f: f.endswith(".css"))
+
+    manifest: Dict[str, str] = {}
+    sizes: Dict[str, Dict[str, int]] = {}
+    for rel in assets:
+        data = (src / rel).read_bytes()
+        if rel.endswith(".css"):
+            # url() in a stylesheet is relative to the stylesheet; root-relative ones are rewritten too.
+            base = posixpath.dirname(rel) or "."
+            relative = {posixpath.relpath(a, base): posixpath.relpath(h, base) for a, h in manifest.items()}
+            data = _rewrite(_rewrite(data.decode("utf-8"), relative), manifest).encode("utf-8")
+        hashed = _fingerprint(rel, data)
+        target = out / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        manifest[rel] = hashed
+        sizes[hashed] = _compress(target, data)
+
+    page_assets: Dict[str, List[str]] = {}
+    for rel in pages:
+        text = (src / rel).read_text(encoding="utf-8")
+        page_assets[rel] = [hashed for asset, hashed in manifest.items() if _rewrite(text, {asset: hashed}) != text]
+        data = _rewrite(text, manifest).encode("utf-8")
+        target = out / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        sizes[rel] = _compress(target, data)
+
+    (out / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    return {"manifest": manifest, "sizes": sizes, "pages": page_assets}
+
+
+def transfer_report(result: Dict, src: Path = FRONTEND_DIR, encoding: Optional[str] = None) -> List[Dict]:
+    """Bytes per page load, before (served as-is, revalidated every visit) and after (precompressed, immutable).
+
+    A first visit downloads the page and everything it references. On a repeat visit the old setup
+    revalidates every file (one request each, 304 bodies); afterwards only the no-cache page is revalidated.
+    """
+    inverse = {hashed: rel for rel, hashed in result["manifest"].items()}
+    sizes = result["sizes"]
+
+    def encoded(name: str) -> int:
+        s = sizes[name]
+        if encoding:
+            return s.get(encoding, s["raw"])
+        return min(s.values())
+
+    rows = []
+    for page, assets in sorted(result["pages"].items()):
+        before = (src / page).stat().st_size + sum((src / inverse[a]).stat().st_size for a in assets)
+        after = encoded(page) + sum(encoded(a) for a in assets)
+        rows.append(
+            {
+                "page": page,
+                "assets": len(assets),
+                "first_visit_before": before,
+                "first_visit_after": after,
+                "repeat_requests_before": 1 + len(assets),
+                "repeat_requests_after": 1,
+            }
+        )
+    return rows
+
+
+def print_report(rows: List[Dict]) -> None:
+    print(f"{'page':<34}{'assets':>7}{'首次访问(前)':>14}{'首次访问(后)':>14}{'节省':>8}{'重复访问请求数':>16}")
+    total_before = total_after = 0
+    for row in rows:
+        total_before += row["first_visit_before"]
+        total_after += row["first_visit_after"]
+        saved = 1 - row["first_visit_after"] / row["first_visit_before"]
+        print(
+            f"{row['page']:<34}{row['assets']:>7}{row['first_visit_before']:>14}{row['first_visit_after']:>14}"
+            f"{saved:>8.0%}{row['repeat_requests_before']:>10} -> {row['repeat_requests_after']}"
+        )
+    if total_before:
+        print(f"{'合计':<34}{'':>7}{total_before:>14}{total_after:>14}{1 - total_after / total_before:>8.0%}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="构建前端静态资源：内容哈希文件名、预压缩（gzip/br）、manifest，并输出每页传输字节报告")
+    parser.add_argument("--out", default=str(DIST_DIR), help="输出目录")
+    parser.add_argument("--report", default="", help="把每页传输字节报告另存为 JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    out = Path(args.out)
+    result = build(FRONTEND_DIR, out)
+    print(f"已构建 {len(result['pages'])} 个页面、{len(result['manifest'])} 个资源 -> {out}")
+    if brotli is None:
+        print("未安装 brotli，仅生成 .gz（pip install brotli 后重新构建可生成 .br）")
+    rows = transfer_report(result)
+    print_report(rows)
+    if args.report:
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"报告已保存：{args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
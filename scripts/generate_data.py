@@ -0,0 +1,370 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    from .reset_demo_data import ADMIN_PASSWORD_HASH, ADMIN_USERNAME, DEMO_USERS
+except ImportError:
+    from reset_demo_data import ADMIN_PASSWORD_HASH, ADMIN_USERNAME, DEMO_USERS
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Every generated account shares the demo password "123456"; reuse its precomputed scrypt hash
+# instead of hashing once per user.
+GENERATED_PASSWORD = "123456"
+GENERATED_PASSWORD_HASH = DEMO_USERS[0][1]
+BASE_TIME = datetime(2026, 1, 1, 9, 0, 0)
+CHUNK_SIZE = 50_000
+
+SKILLS = [
+    "Python", "Flask", "Django", "SQL", "MySQL", "Vue", "React", "HTML/CSS", "JavaScript", "TypeScript",
+    "Java", "Spring", "Go", "C++", "Android", "iOS", "小程序", "UI设计", "Figma", "产品设计",
+    "数据分析", "Pandas", "机器学习", "运营", "新媒体", "测试", "Linux", "Docker", "项目管理", "文案",
+]
+ROLE_NAMES = ["后端开发", "前端开发", "产品经理", "UI设计", "数据分析师", "测试工程师", "运营支持", "算法工程师", "移动端开发"]
+PROJECT_WORDS = ["电商", "校园", "社区", "健康", "教育", "物流", "金融", "文旅", "可视化", "小程序", "农业", "公益"]
+MARKETS = ["校园市场", "企业市场", "政务市场", "消费市场"]
+WORK_MODES = ["远程协作", "线下驻场", "混合协作"]
+PROJECT_STATUS_MIX = [("招募中", 55), ("进行中", 25), ("已完成", 10), ("草稿", 7), ("已终止", 3)]
+APPLICATION_STATUS_MIX = [("pending", 45), ("accepted", 20), ("rejected", 25), ("cancelled", 10)]
+FEEDBACK_STATUS_MIX = [("submitted", 60), ("processed", 40)]
+
+
+def _weighted(rnd: random.Random, mix) -> str:
+    return rnd.choices([v for v, _ in mix], [w for _, w in mix])[0]
+
+
+def _ts(offset_minutes: float) -> str:
+    return (BASE_TIME + timedelta(minutes=offset_minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _chunks(rows: Iterable[tuple], size: int = CHUNK_SIZE) -> Iterator[List[tuple]]:
+    batch: List[tuple] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bulk_insert(cur: sqlite3.Cursor, sql: str, rows: Iterable[tuple]) -> int:
+    total = 0
+    for batch in _chunks(rows):
+        cur.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+
+def _tune_for_bulk_load(conn: sqlite3.Connection) -> None:
+    # Safe only because the target is a fresh file that is thrown away if the run fails.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -262144")
+
+
+def _previous_change_seq(db_path: str) -> int:
+    # change_log position of the database being replaced; 0 if there is none or it cannot be read.
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'change_log'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return 0
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def _restore_pragmas(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute("PRAGMA synchronous = FULL")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+def generate(
+    db_path: str,
+    enterprises: int = 50,
+    students: int = 1000,
+    projects_per_enterprise: int = 4,
+    roles_per_project: int = 4,
+    applications_per_student: int = 5,
+    feedback_rate: float = 0.5,
+    token_rate: float = 0.3,
+    seed: int = 42,
+    reset: bool = False,
+) -> Dict:
+    previous_seq = 0
+    if os.path.exists(db_path):
+        if not reset:
+            raise FileExistsError(f"目标数据库已存在：{db_path}（使用 --reset 覆盖）")
+        previous_seq = _previous_change_seq(db_path)
+        os.remove(db_path)
+
+    # Create the schema through the application itself so generated data always matches it.
+    os.environ["MULTI_ROLE_DB_PATH"] = db_path
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    import server.db as server_db
+
+    server_db.DB_PATH = db_path
+    server_db.init_database()
+
+    rnd = random.Random(seed)
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    _tune_for_bulk_load(conn)
+    cur = conn.cursor()
+    counts: Dict[str, int] = {}
+
+    # ===== Users: ids are assigned explicitly so later tables never need to read them back =====
+    admin_id = 1
+    enterprise_ids = list(range(2, 2 + enterprises))
+    first_student_id = 2 + enterprises
+    student_ids = list(range(first_student_id, first_student_id + students))
+
+    def user_rows():
+        yield (admin_id, ADMIN_USERNAME, ADMIN_PASSWORD_HASH, "管理员", ADMIN_USERNAME, "系统管理", "", "", 1, _ts(0))
+        for i, uid in enumerate(enterprise_ids):
+            yield (uid, f"company{i + 1}", GENERATED_PASSWORD_HASH, "企业", f"企业{i + 1}", f"企业{i + 1}有限公司",
+                   "", f"hr{i + 1}@example.com", 1, _ts(i / 10))
+        for i, uid in enumerate(student_ids):
+            yield (uid, f"student{i + 1}", GENERATED_PASSWORD_HASH, "学生", f"学生{i + 1}", f"第{i % 40 + 1}大学",
+                   ",".join(rnd.sample(SKILLS, rnd.randint(2, 5))), f"138{i:08d}", 1 if rnd.random() > 0.01 else 0,
+                   _ts(i / 100))
+
+    counts["user"] = _bulk_insert(
+        cur,
+        """
+        INSERT INTO user (user_id, username, password_hash, user_type, real_name, school_company,
+                          skill_tags, contact, status, create_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        user_rows(),
+    )
+
+    # ===== Projects =====
+    projects = []
+    project_id = 0
+    for e_index, uid in enumerate(enterprise_ids):
+        for _ in range(projects_per_enterprise):
+            project_id += 1
+            word = rnd.choice(PROJECT_WORDS)
+            published = rnd.uniform(0, 60 * 24 * 120)
+            projects.append(
+                (
+                    project_id,
+                    f"{word}协作项目{project_id}",
+                    f"面向{word}场景的前端、后端与运营协作项目，编号 {project_id}",
+                    uid,
+                    _weighted(rnd, PROJECT_STATUS_MIX),
+                    _ts(published),
+                    _ts(published + 60 * 24 * rnd.randint(30, 180)),
+                    "",
+                    rnd.choice(MARKETS),
+                    rnd.choice(WORK_MODES),
+                    f"{rnd.randint(2, 5)}-{rnd.randint(6, 10)}人",
+                    f"企业{e_index + 1}有限公司",
+                )
+            )
+    counts["project"] = _bulk_insert(
+        cur,
+        """
+        INSERT INTO project (project_id, project_name, description, publisher_id, project_status, publish_time,
+                             deadline, result_url, expected_market, work_mode, participant_count, company)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        projects,
+    )
+    project_status = {p[0]: p[4] for p in projects}
+    project_publisher = {p[0]: p[3] for p in projects}
+
+    # ===== Roles =====
+    role_project: List[int] = [0]
+    role_limit: List[int] = [0]
+    role_rows = []
+    per_project = min(roles_per_project, len(ROLE_NAMES))
+    for pid in range(1, project_id + 1):
+        for name in rnd.sample(ROLE_NAMES, per_project):
+            role_id = len(role_project)
+            limit_num = rnd.randint(1, 5)
+            role_project.append(pid)
+            role_limit.append(limit_num)
+            role_rows.append(
+                [role_id, pid, name, f"负责{name}模块的设计、实现与联调测试", ",".join(rnd.sample(SKILLS, rnd.randint(2, 4))),
+                 limit_num, 0, "草稿" if project_status[pid] == "草稿" else "招募中", None]
+            )
+    role_count = len(role_rows)
+
+    # ===== Applications: respect UNIQUE(role_id, student_id), one acceptance per project and role limits =====
+    joined = [0] * (role_count + 1)
+    accepted_pairs = set()
+    accepted_apps = []
+    applicable_roles = [r[0] for r in role_rows if project_status[r[1]] not in ("草稿",)]
+
+    def application_rows():
+        app_id = 0
+        if not applicable_roles:
+            return
+        for sid in student_ids:
+            picks = rnd.sample(applicable_roles, min(applications_per_student, len(applicable_roles)))
+            for role_id in picks:
+                app_id += 1
+                pid = role_project[role_id]
+                status = _weighted(rnd, APPLICATION_STATUS_MIX)
+                if status == "accepted":
+                    if joined[role_id] >= role_limit[role_id] or (pid, sid) in accepted_pairs:
+                        status = "rejected"
+                    else:
+                        joined[role_id] += 1
+                        accepted_pairs.add((pid, sid))
+                        accepted_apps.append((role_id, pid, sid))
+                applied = rnd.uniform(0, 60 * 24 * 120)
+                updated = applied if status == "pending" else applied + rnd.uniform(10, 60 * 24 * 7)
+                yield (app_id, role_id, pid, sid, f"我具备相关技能，希望参与该岗位（{role_id}）", status, _ts(applied), _ts(updated))
+
+    counts["role_application"] = _bulk_insert(
+        cur,
+        """
+        INSERT INTO role_application (application_id, role_id, project_id, student_id, motivation, status, apply_time, update_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        application_rows(),
+    )
+
+    for row in role_rows:
+        row[6] = joined[row[0]]
+        if row[6] >= row[5] and row[7] == "招募中":
+            row[7] = "已完成"
+    counts["role"] = _bulk_insert(
+        cur,
+        """
+        INSERT INTO role (role_id, project_id, role_name, task_desc, skill_require, limit_num, join_num, role_status, task_deadline)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (tuple(r) for r in role_rows),
+    )
+
+    # ===== Feedbacks from accepted members =====
+    def feedback_rows():
+        fid = 0
+        for role_id, pid, sid in accepted_apps:
+            if rnd.random() >= feedback_rate:
+                continue
+            for _ in range(rnd.randint(1, 3)):
+                fid += 1
+                has_file = rnd.random() < 0.4
+                yield (fid, pid, role_id, sid, f"第{fid}次阶段成果提交：完成了约定模块并附上说明",
+                       f"/uploads/feedbacks/generated_{fid}.pdf" if has_file else "",
+                       _weighted(rnd, FEEDBACK_STATUS_MIX), _ts(rnd.uniform(0, 60 * 24 * 120)))
+
+    counts["role_feedback"] = _bulk_insert(
+        cur,
+        """
+        INSERT INTO role_feedback (feedback_id, project_id, role_id, user_id, content, evidence_url, status, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        feedback_rows(),
+    )
+
+    # ===== Tokens (deterministic, so benchmark runs can be replayed) =====
+    tokens: Dict[str, List[str]] = {"管理员": [], "企业": [], "学生": []}
+
+    def token_rows():
+        for user_type, ids in (("管理员", [admin_id]), ("企业", enterprise_ids), ("学生", student_ids)):
+            for uid in ids:
+                if user_type != "管理员" and rnd.random() >= token_rate:
+                    continue
+                token = f"gen{seed}_{uid}_{rnd.getrandbits(96):024x}"
+                tokens[user_type].append(token)
+                yield (token, uid, _ts(60 * 24 * 120))
+
+    counts["auth_tokens"] = _bulk_insert(
+        cur, "INSERT INTO auth_tokens (token, user_id, created_at) VALUES (?, ?, ?)", token_rows()
+    )
+
+    # Skill-tag postings (role_tag/user_tag) derived from the rows above, as the helpers would have written them.
+    counts.update(server_db.rebuild_tag_index(cur))
+    # Per-project role counters on the project rows, likewise.
+    server_db.rebuild_project_summaries(cur)
+    # The rows above bypassed change_log, so record a reset: processes already following the log
+    # (tag index, caches, delta clients) reload in full. Its seq continues from the replaced
+    # database, so no cursor taken there can look current here.
+    cur.execute("DELETE FROM sqlite_sequence WHERE name = 'change_log'")
+    cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('change_log', ?)", (previous_seq,))
+    server_db._log_change(cur, server_db.CHANGE_RESET, 0, "reset")
+
+    conn.commit()
+    cur.execute("ANALYZE")
+    _restore_pragmas(conn)
+    conn.commit()
+    cur.close()
+    conn.close()
+
+    return {
+        "db_path": db_path,
+        "seed": seed,
+        "counts": counts,
+        "total_rows": sum(counts.values()),
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "password": GENERATED_PASSWORD,
+        "project_ids": list(range(1, project_id + 1)),
+        "role_ids": [r[0] for r in role_rows],
+        "project_publisher": project_publisher,
+        "user_ids": {"管理员": [admin_id], "企业": enterprise_ids, "学生": student_ids},
+        "tokens": tokens,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="生成大规模、可复现的合成数据（企业/学生/项目/岗位/申请/反馈/token）")
+    parser.add_argument("--db", default=str(PROJECT_ROOT / "generated_platform.db"), help="目标数据库路径")
+    parser.add_argument("--enterprises", type=int, default=50)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--projects-per-enterprise", type=int, default=4)
+    parser.add_argument("--roles-per-project", type=int, default=4)
+    parser.add_argument("--applications-per-student", type=int, default=5)
+    parser.add_argument("--feedback-rate", type=float, default=0.5, help="已录取成员提交反馈的比例")
+    parser.add_argument("--token-rate", type=float, default=0.3, help="拥有登录 token 的用户比例")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="目标数据库存在时覆盖")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        summary = generate(
+            args.db,
+            enterprises=args.enterprises,
+            students=args.students,
+            projects_per_enterprise=args.projects_per_enterprise,
+            roles_per_project=args.roles_per_project,
+            applications_per_student=args.applications_per_student,
+            feedback_rate=args.feedback_rate,
+            token_rate=args.token_rate,
+            seed=args.seed,
+            reset=args.reset,
+        )
+    except FileExistsError as exc:
+        print(exc)
+        return 1
+
+    for table, n in summary["counts"].items():
+        print(f"{table:18} {n:>10}")
+    print(f"共 {summary['total_rows']} 行，用时 {summary['elapsed_s']}s -> {summary['db_path']}")
+    print(f"所有生成账号的密码均为 {summary['password']}（管理员账号 {ADMIN_USERNAME} 保持原密码）")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
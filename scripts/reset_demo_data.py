@@ -1,11 +1,14 @@
 import shutil
 import sqlite3
+import sys
 from datetime import datetime
 from pathlib import Path
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DB_PATH = PROJECT_ROOT / "multi_role_platform.db"
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 ADMIN_USERNAME = "Tea0104"
 ADMIN_PASSWORD_HASH = "scrypt:32768:8:1$MmySDxLHDJKmhnna$3513e700d6d1733841012378f2fb7738d4f567b1658a74dd0650e8e597aef53480a9f17f88e4349d93140c3918f618032062de432e91dc7279285fad6294e001"
 DEMO_USERS = [
@@ -138,6 +141,25 @@ def main() -> int:
             ],
         )
 
+        # Users and roles were rewritten behind the helpers' back; rebuild their skill-tag postings.
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'skill_tag'")
+        if cur.fetchone():
+            from server.db import rebuild_tag_index
+
+            rebuild_tag_index(cur)
+
+        # Same for the per-project role counters, on databases that have them.
+        cur.execute("SELECT 1 FROM pragma_table_info('project') WHERE name = 'open_role_count'")
+        if cur.fetchone():
+            from server.db import rebuild_project_summaries
+
+            rebuild_project_summaries(cur)
+
+        # Clients syncing lists with ?since= must reload everything after a reset.
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'")
+        if cur.fetchone():
+            cur.execute("INSERT INTO change_log (entity, entity_id, op, changed_at) VALUES ('*', 0, 'reset', ?)", (now,))
+
         conn.commit()
         print("已清洗历史数据，仅保留管理员账号，并重新写入测试账号和测试项目。")
         return 0
@@ -1,11 +1,12 @@
 try:
-    from .app_factory import create_app
+    from .app_factory import create_app, warm_app_caches
 except ImportError:
-    from app_factory import create_app
+    from app_factory import create_app, warm_app_caches
 
 
 def main() -> None:
     app = create_app()
+    warm_app_caches(app)
     app.run(debug=True, host="0.0.0.0", port=5000)
 
 
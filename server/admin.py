@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 
 try:
     from .auth import login_required, role_required
@@ -11,6 +11,8 @@ try:
         list_all_users,
         project_del,
     )
+    from .responses import fail, ok
+    from .slow_queries import SLOW_QUERY_ENABLED, SLOW_QUERY_MS, clear_slow_queries, list_slow_queries
 except ImportError:
     from auth import login_required, role_required
     from db import (
@@ -22,6 +24,8 @@ except ImportError:
         list_all_users,
         project_del,
     )
+    from responses import fail, ok
+    from slow_queries import SLOW_QUERY_ENABLED, SLOW_QUERY_MS, clear_slow_queries, list_slow_queries
 
 
 admin_bp = Blueprint("admin", __name__)
@@ -41,8 +45,8 @@ def _parse_limit(default: int = 8) -> int:
 def admin_dashboard():
     res = get_admin_dashboard_data(limit=_parse_limit(8))
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 500
-    return jsonify({"success": True, **res["data"]})
+        return fail(res["msg"], 500)
+    return ok(**res["data"])
 
 
 @admin_bp.route("/api/admin/users", methods=["GET"])
@@ -51,8 +55,8 @@ def admin_dashboard():
 def admin_list_users():
     res = list_all_users(limit=_parse_limit(100))
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 500
-    return jsonify({"success": True, "users": res["data"]})
+        return fail(res["msg"], 500)
+    return ok(users=res["data"])
 
 
 @admin_bp.route("/api/admin/users/<int:user_id>/status", methods=["PUT"])
@@ -61,17 +65,18 @@ def admin_list_users():
 def admin_update_user_status(user_id: int):
     data = request.json or {}
     if "status" not in data:
-        return jsonify({"success": False, "message": "status 不能为空"}), 400
+        return fail("status 不能为空", 400)
 
     try:
         status = int(data.get("status"))
     except (TypeError, ValueError):
-        return jsonify({"success": False, "message": "status 必须是数字 0 或 1"}), 400
+        return fail("status 必须是数字 0 或 1", 400)
 
     operator_user_id = request.current_user["user_id"]
     res = admin_set_user_status(user_id, status, operator_user_id)
-    code = 200 if res["code"] == 200 else res["code"]
-    return jsonify({"success": res["code"] == 200, "message": res["msg"], "data": res.get("data")}), code
+    if res["code"] != 200:
+        return fail(res["msg"], res["code"])
+    return ok(res["msg"], data=res["data"])
 
 
 @admin_bp.route("/api/admin/projects", methods=["GET"])
@@ -80,8 +85,8 @@ def admin_update_user_status(user_id: int):
 def admin_list_projects():
     res = list_all_projects(limit=_parse_limit(100))
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 500
-    return jsonify({"success": True, "projects": res["data"]})
+        return fail(res["msg"], 500)
+    return ok(projects=res["data"])
 
 
 @admin_bp.route("/api/admin/projects/<int:project_id>", methods=["DELETE"])
@@ -89,8 +94,9 @@ def admin_list_projects():
 @role_required("管理员")
 def admin_delete_project(project_id: int):
     res = project_del(project_id)
-    code = 200 if res["code"] == 200 else res["code"]
-    return jsonify({"success": res["code"] == 200, "message": res["msg"], "data": res.get("data")}), code
+    if res["code"] != 200:
+        return fail(res["msg"], res["code"])
+    return ok(res["msg"], data=res["data"])
 
 
 @admin_bp.route("/api/admin/applications", methods=["GET"])
@@ -99,8 +105,8 @@ def admin_delete_project(project_id: int):
 def admin_list_applications():
     res = list_all_applications(limit=_parse_limit(100))
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 500
-    return jsonify({"success": True, "applications": res["data"]})
+        return fail(res["msg"], 500)
+    return ok(applications=res["data"])
 
 
 @admin_bp.route("/api/admin/feedbacks", methods=["GET"])
@@ -109,5 +115,23 @@ def admin_list_applications():
 def admin_list_feedbacks():
     res = list_all_feedbacks(limit=_parse_limit(100))
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 500
-    return jsonify({"success": True, "feedbacks": res["data"]})
+        return fail(res["msg"], 500)
+    return ok(feedbacks=res["data"])
+
+
+@admin_bp.route("/api/admin/slow-queries", methods=["GET"])
+@login_required
+@role_required("管理员")
+def admin_list_slow_queries():
+    return ok(
+        enabled=SLOW_QUERY_ENABLED,
+        threshold_ms=SLOW_QUERY_MS,
+        slow_queries=list_slow_queries(limit=_parse_limit(50)),
+    )
+
+
+@admin_bp.route("/api/admin/slow-queries", methods=["DELETE"])
+@login_required
+@role_required("管理员")
+def admin_clear_slow_queries():
+    return ok(cleared=clear_slow_queries())
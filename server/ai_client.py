@@ -0,0 +1,91 @@
+import json
+import os
+import re
+from urllib import error as urllib_error
+from urllib import request as urllib_request
+
+
+DEEPSEEK_API_URL = os.environ.get("DEEPSEEK_API_URL", "https://api.deepseek.com/chat/completions").strip()
+DEEPSEEK_MODEL = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat").strip() or "deepseek-chat"
+DEEPSEEK_TIMEOUT = float(os.environ.get("DEEPSEEK_TIMEOUT", "15").strip() or "15")
+
+_FENCED_JSON = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.S)
+
+
+def _extract_json_object(text: str) -> dict:
+    raw = str(text or "").strip()
+    if not raw:
+        raise ValueError("empty model content")
+
+    fenced_match = _FENCED_JSON.search(raw)
+    if fenced_match:
+        raw = fenced_match.group(1).strip()
+    else:
+        start = raw.find("{")
+        end = raw.rfind("}")
+        if start >= 0 and end > start:
+            raw = raw[start : end + 1]
+
+    parsed = json.loads(raw)
+    if not isinstance(parsed, dict):
+        raise ValueError("model output is not a JSON object")
+    return parsed
+
+
+def call_role_suggest(contract_payload: dict) -> dict:
+    api_key = os.environ.get("DEEPSEEK_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("DEEPSEEK_API_KEY is not configured")
+
+    system_prompt = (
+        "You are a project staffing assistant. "
+        "Return only valid JSON. "
+        "Generate practical roles for an enterprise-student collaboration project."
+    )
+    user_prompt = (
+        "Return a JSON object with keys roles, assumptions, questions_to_confirm.\n"
+        "roles must be a non-empty array.\n"
+        "Each role must contain role_name, task_desc, skill_require, limit_num, task_deadline.\n"
+        "role_name must be unique.\n"
+        "limit_num must be an integer between 1 and 3.\n"
+        "task_deadline must not be later than the project deadline when a deadline exists.\n"
+        "Keep the content concise and practical.\n"
+        f"Input JSON:\n{json.dumps(contract_payload, ensure_ascii=False)}"
+    )
+    body = {
+        "model": DEEPSEEK_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.5,
+        "stream": False,
+    }
+
+    req = urllib_request.Request(
+        DEEPSEEK_API_URL,
+        data=json.dumps(body).encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        },
+        method="POST",
+    )
+
+    try:
+        with urllib_request.urlopen(req, timeout=DEEPSEEK_TIMEOUT) as resp:
+            raw = resp.read().decode("utf-8")
+    except urllib_error.HTTPError as exc:
+        detail = exc.read().decode("utf-8", errors="ignore")
+        raise RuntimeError(f"DeepSeek HTTP {exc.code}: {detail[:300]}") from exc
+    except urllib_error.URLError as exc:
+        raise RuntimeError(f"DeepSeek request failed: {exc.reason}") from exc
+
+    parsed = json.loads(raw)
+    choices = parsed.get("choices") or []
+    message = choices[0].get("message") if choices else {}
+    result = _extract_json_object((message or {}).get("content") or "")
+    if not isinstance(result.get("roles"), list) or not result.get("roles"):
+        raise ValueError("DeepSeek returned empty roles")
+    return result
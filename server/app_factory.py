@@ -1,21 +1,76 @@
+import json
+import logging
+import mimetypes
 import os
+import time
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, g, request
 from flask_cors import CORS
 
 try:
     from .admin import admin_bp
     from .applications import applications_bp
-    from .auth import auth_bp
-    from .db import ensure_admin_user, init_database, seed_demo_data_if_empty
+    from .auth import _get_bearer_token, auth_bp
+    from .db import (
+        DB_READ_MODE,
+        begin_read_route,
+        end_read_route,
+        ensure_admin_user,
+        init_database,
+        record_session_write,
+        seed_demo_data_if_empty,
+    )
+    from .events import events_bp
+    from .instrumentation import init_request_timing
+    from .lifecycle import freeze
+    from .metrics import flush_snapshot, init_metrics
     from .projects import projects_bp
+    from .responses import init_responses, ok
+    from .slow_queries import init_slow_query_log
+    from .static_files import send_frontend_file
+    from .team import team_bp
 except ImportError:
     # Fallback for environments that execute files directly instead of package mode.
     from admin import admin_bp
     from applications import applications_bp
-    from auth import auth_bp
-    from db import ensure_admin_user, init_database, seed_demo_data_if_empty
+    from auth import _get_bearer_token, auth_bp
+    from db import (
+        DB_READ_MODE,
+        begin_read_route,
+        end_read_route,
+        ensure_admin_user,
+        init_database,
+        record_session_write,
+        seed_demo_data_if_empty,
+    )
+    from events import events_bp
+    from instrumentation import init_request_timing
+    from lifecycle import freeze
+    from metrics import flush_snapshot, init_metrics
     from projects import projects_bp
+    from responses import init_responses, ok
+    from slow_queries import init_slow_query_log
+    from static_files import send_frontend_file
+    from team import team_bp
+
+
+# STARTUP_PROFILE=1：记录 create_app 各阶段耗时（import 耗时见 benchmarks/startup.py）
+STARTUP_PROFILE = os.environ.get("STARTUP_PROFILE", "").strip().lower() in ("1", "true", "yes", "on")
+startup_logger = logging.getLogger("server.startup")
+
+
+class _StartupPhases:
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.timings = {}
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.timings[name] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+    def total_ms(self) -> float:
+        return round((self._last - self.started) * 1000, 2)
 
 
 def load_local_env() -> None:
@@ -41,11 +96,74 @@ def load_local_env() -> None:
                     os.environ[key] = value
 
 
+def preload_lazy_modules() -> None:
+    # 按需导入的模块（NumPy 打分、AI 客户端、上传处理）：普通启动时由首个请求导入；
+    # gunicorn --preload 时在 master 中导入一次，fork 出的 worker 直接共享
+    try:
+        from . import ai_client, uploads  # noqa: F401
+        from .ranking import load_numpy
+    except ImportError:
+        import ai_client  # noqa: F401
+        import uploads  # noqa: F401
+        from ranking import load_numpy
+    load_numpy()
+
+
+def prepare_for_fork(app: Flask) -> None:
+    # gunicorn --preload：fork 前在 master 中完成只读的准备工作，worker 以写时复制方式共享（见 lifecycle.py）
+    phases = _StartupPhases()
+    preload_lazy_modules()
+    phases.mark("lazy_modules")
+    # werkzeug 的路由匹配器、mimetypes 表默认在各 worker 的首个请求时才构建
+    app.url_map.update()
+    phases.mark("url_map")
+    mimetypes.init()
+    phases.mark("mimetypes")
+    # 缓存预热（CACHE_WARMUP=0 关闭）：在 fork 前加载热门数据，所有 worker 共享
+    warm_app_caches(app)
+    phases.mark("cache_warmup")
+    freeze()
+    phases.mark("gc_freeze")
+
+    app.extensions["prefork_phases"] = {**phases.timings, "total": phases.total_ms()}
+    if STARTUP_PROFILE:
+        startup_logger.warning(
+            json.dumps({"event": "prefork_profile", "pid": os.getpid(), "phases_ms": app.extensions["prefork_phases"]})
+        )
+    # worker 启动时会清空继承的指标；master 的启动工作（迁移、预热）由 master 自己的快照上报一次
+    flush_snapshot()
+
+
+def warm_app_caches(app: Flask) -> None:
+    # 按 CACHE_WARMUP_BUDGET_MS 限时加载热门项目、公开列表首页、近期 token 与热点索引（见 warmup.py）
+    try:
+        from .warmup import CACHE_WARMUP, warm_caches
+    except ImportError:
+        from warmup import CACHE_WARMUP, warm_caches
+    if not CACHE_WARMUP:
+        return
+    report = warm_caches()
+    app.extensions["cache_warmup"] = report
+    startup_logger.info(json.dumps({"event": "cache_warmup", "pid": os.getpid(), **report}))
+
+
 def create_app() -> Flask:
+    phases = _StartupPhases()
     load_local_env()
+    phases.mark("load_env")
     app = Flask(__name__)
     app.json.ensure_ascii = False
-    frontend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend"))
+    phases.mark("flask")
+
+    # JSON 序列化（有 orjson 时使用）、?fields= 字段裁剪、大响应 gzip/br 压缩；需在请求耗时统计之前安装
+    init_responses(app)
+    # 请求耗时/SQL 统计（REQUEST_TIMING=1 时启用，需在其他钩子之前注册）
+    init_request_timing(app)
+    # Prometheus 指标（/metrics，METRICS_ENABLED=0 可关闭）
+    init_metrics(app)
+    # 慢查询记录（SLOW_QUERY_MS 阈值，/api/admin/slow-queries 查看）
+    init_slow_query_log()
+    phases.mark("hooks")
 
     # CORS（保持你原来的行为：允许任意来源）
     CORS(app)
@@ -64,13 +182,35 @@ def create_app() -> Flask:
             return "", 200
         return None
 
+    # 读路由（DB_READ_MODE=ro/snapshot）：写请求内的读取走主库；快照读按 token 保证读到自己的写入
+    if DB_READ_MODE != "primary":
+
+        @app.before_request
+        def begin_request_read_route():
+            writes = request.method not in ("GET", "HEAD", "OPTIONS")
+            g._read_route_token = begin_read_route(_get_bearer_token(), primary=writes)
+
+        @app.after_request
+        def record_request_write(response):
+            if DB_READ_MODE == "snapshot" and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                token = _get_bearer_token()
+                if token:
+                    record_session_write(token)
+            return response
+
+        @app.teardown_request
+        def end_request_read_route(exc=None):  # noqa: ARG001
+            route_token = g.pop("_read_route_token", None)
+            if route_token is not None:
+                end_read_route(route_token)
+
     @app.get("/")
     def index_page():
-        return send_from_directory(frontend_dir, "index.html")
+        return send_frontend_file("index.html")
 
     @app.get("/health")
     def health_check():
-        return jsonify({"success": True, "message": "backend is running"})
+        return ok("backend is running")
 
     @app.get("/favicon.ico")
     def favicon():
@@ -78,42 +218,56 @@ def create_app() -> Flask:
 
     @app.get("/enterprisecenter")
     def enterprise_center_page():
-        return send_from_directory(frontend_dir, "enterprise_center.html")
+        return send_frontend_file("enterprise_center.html")
 
     @app.get("/enterprisecenter/publish")
     def enterprise_publish_page():
-        return send_from_directory(frontend_dir, "enterprise_publish.html")
+        return send_frontend_file("enterprise_publish.html")
 
     @app.get("/enterprisecenter/roles")
     def enterprise_roles_page():
-        return send_from_directory(frontend_dir, "enterprise_roles.html")
+        return send_frontend_file("enterprise_roles.html")
 
     @app.get("/enterprisecenter/review")
     def enterprise_review_page():
-        return send_from_directory(frontend_dir, "enterprise_review.html")
+        return send_frontend_file("enterprise_review.html")
 
     @app.get("/enterprisecenter/projects/<int:project_id>")
     def enterprise_project_detail_page(project_id: int):  # noqa: ARG001
-        return send_from_directory(frontend_dir, "enterprise_project_detail.html")
+        return send_frontend_file("enterprise_project_detail.html")
 
     @app.get("/admin")
     def admin_dashboard_page():
-        return send_from_directory(frontend_dir, "admin_dashboard.html")
+        return send_frontend_file("admin_dashboard.html")
 
     @app.get("/<path:filename>")
     def frontend_file(filename: str):
-        return send_from_directory(frontend_dir, filename)
+        return send_frontend_file(filename)
+
+    phases.mark("page_routes")
 
     # DB init/migrate + demo data
     init_database()
+    phases.mark("init_database")
     seed_demo_data_if_empty()
+    phases.mark("seed_demo_data")
     ensure_admin_user()
+    phases.mark("ensure_admin")
 
     # 路由注册
     app.register_blueprint(auth_bp)
     app.register_blueprint(projects_bp)
     app.register_blueprint(applications_bp)
     app.register_blueprint(admin_bp)
-    # legacy/team 接口不注册（按新方案重写）
+    app.register_blueprint(events_bp)
+    app.register_blueprint(team_bp)
+    # legacy 接口不注册（旧表结构，成员视图已由 team.py 按现有表重写）
+    phases.mark("blueprints")
 
+    app.extensions["startup_phases"] = {**phases.timings, "total": phases.total_ms()}
+    if STARTUP_PROFILE:
+        # 显式开启的诊断输出，用 warning 级别保证默认日志配置下也能看到
+        startup_logger.warning(
+            json.dumps({"event": "startup_profile", "pid": os.getpid(), "phases_ms": app.extensions["startup_phases"]})
+        )
     return app
@@ -1,7 +1,12 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, request
 
 try:
     from .auth import login_required, role_required
+    from .matching import recommend_candidates, recommend_roles
+    from .ranking import rank_applications
+    from .rate_limit import rate_limit
+    from .responses import fail, ok
+    from .sync import ListSync
     from .db import (
         apply_for_role,
         cancel_application,
@@ -11,6 +16,11 @@ try:
     )
 except ImportError:
     from auth import login_required, role_required
+    from matching import recommend_candidates, recommend_roles
+    from ranking import rank_applications
+    from rate_limit import rate_limit
+    from responses import fail, ok
+    from sync import ListSync
     from db import (
         apply_for_role,
         cancel_application,
@@ -23,17 +33,25 @@ except ImportError:
 applications_bp = Blueprint("applications", __name__)
 
 
+def _parse_limit(default: int = 20) -> int:
+    try:
+        return int((request.args.get("limit") or str(default)).strip())
+    except ValueError:
+        return default
+
+
 @applications_bp.route("/api/roles/<int:role_id>/apply", methods=["POST"])
 @login_required
 @role_required("学生")
+@rate_limit("apply", "30/minute", key="user", burst=10)
 def student_apply(role_id: int):
     data = request.json or {}
     motivation = (data.get("motivation") or "").strip()
     student_id = request.current_user["user_id"]
     res = apply_for_role(role_id=role_id, student_id=student_id, motivation=motivation)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), res["code"]
-    return jsonify({"success": True, "message": res["msg"], "application_id": res["data"]["application_id"]}), 201
+        return fail(res["msg"], res["code"])
+    return ok(res["msg"], 201, application_id=res["data"]["application_id"])
 
 
 @applications_bp.route("/api/student/applications", methods=["GET"])
@@ -41,8 +59,23 @@ def student_apply(role_id: int):
 @role_required("学生")
 def student_list_applications():
     student_id = request.current_user["user_id"]
+    # Rows embed role and project names, so renames of either resend the affected applications.
+    sync = ListSync(
+        "application",
+        "application_id",
+        scope={"user_id": student_id},
+        related={"role": "role_id", "project": "project_id"},
+    )
     rows = list_student_applications(student_id)
-    return jsonify({"success": True, "applications": rows})
+    return sync.respond("applications", rows)
+
+
+@applications_bp.route("/api/student/recommended-roles", methods=["GET"])
+@login_required
+@role_required("学生")
+def student_recommended_roles():
+    res = recommend_roles(request.current_user["user_id"], limit=_parse_limit())
+    return ok(tags=res["data"]["tags"], roles=res["data"]["roles"])
 
 
 @applications_bp.route("/api/student/applications/<int:application_id>/cancel", methods=["POST"])
@@ -52,8 +85,8 @@ def student_cancel_application(application_id: int):
     student_id = request.current_user["user_id"]
     res = cancel_application(application_id, student_id)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), res["code"]
-    return jsonify({"success": True, "message": res["msg"]})
+        return fail(res["msg"], res["code"])
+    return ok(res["msg"])
 
 
 @applications_bp.route("/api/enterprise/roles/<int:role_id>/applications", methods=["GET"])
@@ -61,10 +94,25 @@ def student_cancel_application(application_id: int):
 @role_required("企业")
 def enterprise_list_role_applications(role_id: int):
     enterprise_id = request.current_user["user_id"]
+    sync = ListSync("application", "application_id", scope={"role_id": role_id}, related={"user": "student_id"})
     res = list_role_applications(role_id, enterprise_id)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), res["code"]
-    return jsonify({"success": True, "applications": res["data"]})
+        return fail(res["msg"], res["code"])
+    rows = res["data"]
+    # ?sort=score: best match first, each row with its score and the features behind it.
+    if request.args.get("sort") == "score":
+        rows = rank_applications(role_id, rows)
+    return sync.respond("applications", rows)
+
+
+@applications_bp.route("/api/enterprise/roles/<int:role_id>/recommended-candidates", methods=["GET"])
+@login_required
+@role_required("企业")
+def enterprise_recommended_candidates(role_id: int):
+    res = recommend_candidates(role_id, request.current_user["user_id"], limit=_parse_limit())
+    if res["code"] != 200:
+        return fail(res["msg"], res["code"])
+    return ok(tags=res["data"]["tags"], candidates=res["data"]["candidates"])
 
 
 @applications_bp.route("/api/enterprise/applications/<int:application_id>/review", methods=["POST"])
@@ -76,5 +124,5 @@ def enterprise_review_application(application_id: int):
     decision = (data.get("decision") or "").strip()
     res = review_application(application_id, enterprise_id, decision)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), res["code"]
-    return jsonify({"success": True, "message": res["msg"]})
+        return fail(res["msg"], res["code"])
+    return ok(res["msg"])
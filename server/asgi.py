@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from .app_factory import create_app, warm_app_caches
+except ImportError:
+    from app_factory import create_app, warm_app_caches
+
+
+# Threads that run Flask views (and therefore every blocking SQLite/DeepSeek call).
+# Connections waiting on the network never occupy one of them.
+ASGI_THREADS = max(1, int(os.environ.get("ASGI_THREADS", "32").strip() or "32"))
+ASGI_MAX_BODY = int(os.environ.get("ASGI_MAX_BODY", str(32 * 1024 * 1024)).strip() or str(32 * 1024 * 1024))
+# Request bodies above this size are spooled to a temp file instead of memory.
+_SPOOL_LIMIT = 1024 * 1024
+_DONE = object()
+
+logger = logging.getLogger("server.asgi")
+
+
+class WsgiBridge:
+    """Serve a WSGI app over ASGI without tying a thread to each connection.
+
+    Request bodies are received on the event loop before the view runs, and response chunks are
+    sent from the event loop after the view returns, so slow uploads and slow readers only cost
+    a coroutine. The view itself runs on a bounded thread pool.
+    """
+
+    def __init__(self, wsgi_app: Callable, threads: int = ASGI_THREADS, max_body: int = ASGI_MAX_BODY):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi-view")
+        self.shutdown_hooks: List[Callable[[], None]] = []
+        # Paths served by native coroutines instead of the WSGI app, e.g. long-lived streams.
+        self.native_routes: Dict[str, Callable] = {}
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            handler = self.native_routes.get(scope.get("path", "")) if scope["method"] == "GET" else None
+            if handler is not None:
+                await handler(scope, receive, send, self.executor)
+            else:
+                await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hook in self.shutdown_hooks:
+                    try:
+                        hook()
+                    except Exception:
+                        logger.exception("asgi shutdown hook failed")
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive) -> Tuple[Optional[tempfile.SpooledTemporaryFile], int]:
+        body = tempfile.SpooledTemporaryFile(max_size=_SPOOL_LIMIT)
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None, size
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body:
+                body.close()
+                return None, size
+            body.write(chunk)
+            if not message.get("more_body", False):
+                body.seek(0)
+                return body, size
+
+    async def _http(self, scope, receive, send) -> None:
+        body, size = await self._read_body(receive)
+        if body is None:
+            if size > self.max_body:
+                await _send_simple(send, 413, b"Request Entity Too Large")
+            return
+
+        environ = build_environ(scope, body, size)
+        response: Dict = {}
+
+        def start_response(status: str, headers: List[Tuple[str, str]], exc_info=None):
+            if exc_info and response.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            return _unsupported_write
+
+        def run_view():
+            # The view and its first chunk in one hop: most responses are a single body chunk.
+            iterable = self.wsgi_app(environ, start_response)
+            iterator = iter(iterable)
+            return iterable, iterator, next(iterator, _DONE)
+
+        loop = asyncio.get_running_loop()
+        iterable = None
+        try:
+            iterable, iterator, chunk = await loop.run_in_executor(self.executor, run_view)
+            await send({"type": "http.response.start", "status": response["status"], "headers": response["headers"]})
+            response["sent"] = True
+            while chunk is not _DONE:
+                if chunk:
+                    await send({"type": "http.response.body", "body": bytes(chunk), "more_body": True})
+                chunk = await loop.run_in_executor(self.executor, next, iterator, _DONE)
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            # Client went away mid-response; nothing left to send.
+            pass
+        finally:
+            if iterable is not None and hasattr(iterable, "close"):
+                await loop.run_in_executor(self.executor, iterable.close)
+            body.close()
+
+
+def _unsupported_write(data: bytes) -> None:
+    raise RuntimeError("WSGI write() callable is not supported by the ASGI bridge")
+
+
+async def _send_simple(send, status: int, text: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain"), (b"content-length", str(len(text)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": text})
+
+
+def build_environ(scope, body, size: int) -> Dict:
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    path = scope.get("path", "/")
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf-8").decode("latin-1"),
+        # PEP 3333: native strings carrying the raw bytes as latin-1.
+        "PATH_INFO": path.encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server[0]),
+        "SERVER_PORT": str(server[1] if server[1] is not None else 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(size),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        "asgi.scope": scope,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def create_asgi_app() -> WsgiBridge:
+    flask_app = create_app()
+    # No gunicorn hooks here: each uvicorn process warms its own caches before it serves.
+    warm_app_caches(flask_app)
+    bridge = WsgiBridge(flask_app)
+    try:
+        from .events import STREAM_PATH, asgi_event_stream
+        from .passwords import shutdown_password_pool
+    except ImportError:
+        from events import STREAM_PATH, asgi_event_stream
+        from passwords import shutdown_password_pool
+    bridge.native_routes[STREAM_PATH] = asgi_event_stream
+    bridge.shutdown_hooks.append(shutdown_password_pool)
+    return bridge
+
+
+app = create_asgi_app()
@@ -3,10 +3,13 @@ from datetime import datetime
 from functools import wraps
 from typing import Callable, Optional
 
-from flask import Blueprint, jsonify, request
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask import Blueprint, request
 
 try:
+    from .metrics import AUTH_FAILURES
+    from .passwords import PasswordPoolBusy, hash_password, needs_rehash, rehash_in_background, verify_password
+    from .rate_limit import rate_limit
+    from .responses import fail, ok
     from .db import (
         delete_token,
         get_user_by_token,
@@ -16,6 +19,10 @@ try:
         user_update,
     )
 except ImportError:
+    from metrics import AUTH_FAILURES
+    from passwords import PasswordPoolBusy, hash_password, needs_rehash, rehash_in_background, verify_password
+    from rate_limit import rate_limit
+    from responses import fail, ok
     from db import (
         delete_token,
         get_user_by_token,
@@ -32,6 +39,12 @@ USER_TYPES = {"学生", "企业", "管理员"}
 REGISTER_USER_TYPES = {"学生", "企业"}
 
 
+def _password_pool_busy(exc: PasswordPoolBusy):
+    resp, status = fail(str(exc), 429)
+    resp.headers["Retry-After"] = str(exc.retry_after)
+    return resp, status
+
+
 def _get_bearer_token() -> Optional[str]:
     auth = request.headers.get("Authorization", "")
     if not auth:
@@ -50,11 +63,13 @@ def login_required(fn: Callable):
     def wrapper(*args, **kwargs):
         token = _get_bearer_token()
         if not token:
-            return jsonify({"success": False, "message": "未登录：缺少 Authorization Bearer token"}), 401
+            AUTH_FAILURES.inc(reason="missing_token")
+            return fail("未登录：缺少 Authorization Bearer token", 401)
 
         user = get_user_by_token(token)
         if not user:
-            return jsonify({"success": False, "message": "未登录：token 无效或已过期"}), 401
+            AUTH_FAILURES.inc(reason="invalid_token")
+            return fail("未登录：token 无效或已过期", 401)
 
         request.current_user = user
         return fn(*args, **kwargs)
@@ -68,9 +83,10 @@ def role_required(required_user_type: str):
         def wrapper(*args, **kwargs):
             user = getattr(request, "current_user", None)
             if not user:
-                return jsonify({"success": False, "message": "未登录"}), 401
+                return fail("未登录", 401)
             if user.get("user_type") != required_user_type:
-                return jsonify({"success": False, "message": f"无权限：需要{required_user_type}身份"}), 403
+                AUTH_FAILURES.inc(reason="forbidden")
+                return fail(f"无权限：需要{required_user_type}身份", 403)
             return fn(*args, **kwargs)
 
         return wrapper
@@ -79,6 +95,7 @@ def role_required(required_user_type: str):
 
 
 @auth_bp.route("/api/auth/register", methods=["POST"])
+@rate_limit("register", "20/hour")
 def api_register():
     data = request.json or {}
     username = (data.get("username") or data.get("email") or "").strip()
@@ -90,19 +107,22 @@ def api_register():
     contact = (data.get("contact") or "").strip()
 
     if not username:
-        return jsonify({"success": False, "message": "username 不能为空"}), 400
+        return fail("username 不能为空", 400)
     if len(username) < 3:
-        return jsonify({"success": False, "message": "username 长度至少 3 位"}), 400
+        return fail("username 长度至少 3 位", 400)
     if not password or len(password) < 6:
-        return jsonify({"success": False, "message": "password 长度至少 6 位"}), 400
+        return fail("password 长度至少 6 位", 400)
     if user_type not in REGISTER_USER_TYPES:
-        return jsonify({"success": False, "message": "user_type 仅支持：学生/企业"}), 400
+        return fail("user_type 仅支持：学生/企业", 400)
     if not real_name:
-        return jsonify({"success": False, "message": "real_name 不能为空"}), 400
+        return fail("real_name 不能为空", 400)
     if not school_company:
-        return jsonify({"success": False, "message": "school_company 不能为空"}), 400
+        return fail("school_company 不能为空", 400)
 
-    password_hash = generate_password_hash(password)
+    try:
+        password_hash = hash_password(password)
+    except PasswordPoolBusy as exc:
+        return _password_pool_busy(exc)
     res = user_add(
         username=username,
         password_hash=password_hash,
@@ -114,73 +134,66 @@ def api_register():
         status=1,
     )
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 400
-
-    return jsonify(
-        {
-            "success": True,
-            "message": "注册成功",
-            "user_id": res["data"]["user_id"],
-            "user_type": user_type,
-        }
-    ), 201
+        return fail(res["msg"], 400)
+
+    return ok("注册成功", 201, user_id=res["data"]["user_id"], user_type=user_type)
 
 
 @auth_bp.route("/api/auth/login", methods=["POST"])
+@rate_limit("login", "30/minute", burst=10)
 def api_login():
     data = request.json or {}
     username = (data.get("username") or data.get("email") or "").strip()
     password = (data.get("password") or "").strip()
 
     if not username or not password:
-        return jsonify({"success": False, "message": "username 和 password 不能为空"}), 400
+        return fail("username 和 password 不能为空", 400)
 
     user = get_user_by_username(username)
-    if not user or not check_password_hash(user["password_hash"], password):
-        return jsonify({"success": False, "message": "账号或密码错误"}), 401
+    try:
+        password_ok = bool(user) and verify_password(user["password_hash"], password)
+    except PasswordPoolBusy as exc:
+        return _password_pool_busy(exc)
+    if not password_ok:
+        AUTH_FAILURES.inc(reason="bad_credentials")
+        return fail("账号或密码错误", 401)
     if user["status"] != 1:
-        return jsonify({"success": False, "message": "账号已被禁用"}), 403
+        AUTH_FAILURES.inc(reason="disabled")
+        return fail("账号已被禁用", 403)
     if user["user_type"] not in USER_TYPES:
-        return jsonify({"success": False, "message": "账号类型不支持登录"}), 403
+        return fail("账号类型不支持登录", 403)
 
     token = secrets.token_urlsafe(32)
     save_token(token, user["user_id"])
     user_update(user["user_id"], last_login=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    if needs_rehash(user["password_hash"]):
+        # 哈希参数已调整：借本次明文在后台重新计算，下次登录即使用新参数
+        user_id = user["user_id"]
+        rehash_in_background(password, lambda new_hash: user_update(user_id, password_hash=new_hash))
 
-    return jsonify(
-        {
-            "success": True,
-            "message": "登录成功",
-            "user_id": user["user_id"],
-            "user_type": user["user_type"],
-            "token": token,
-        }
-    )
+    return ok("登录成功", user_id=user["user_id"], user_type=user["user_type"], token=token)
 
 
 @auth_bp.route("/api/auth/logout", methods=["POST"])
 def api_logout():
     token = _get_bearer_token()
     if not token:
-        return jsonify({"success": True, "message": "已退出（无 token）"})
+        return ok("已退出（无 token）")
 
     delete_token(token)
-    return jsonify({"success": True, "message": "退出成功"})
+    return ok("退出成功")
 
 
 @auth_bp.route("/api/auth/profile", methods=["GET"])
 @login_required
 def api_profile():
     user = request.current_user
-    return jsonify(
-        {
-            "success": True,
-            "user": {
-                "user_id": user["user_id"],
-                "username": user["username"],
-                "user_type": user["user_type"],
-                "real_name": user.get("real_name"),
-                "school_company": user.get("school_company"),
-            },
+    return ok(
+        user={
+            "user_id": user["user_id"],
+            "username": user["username"],
+            "user_type": user["user_type"],
+            "real_name": user.get("real_name"),
+            "school_company": user.get("school_company"),
         }
     )
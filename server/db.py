@@ -1,67 +1,357 @@
-﻿import os
+﻿import contextvars
+import hashlib
+import json
+import logging
+import math
+import os
+import re
 import sqlite3
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
 from werkzeug.security import generate_password_hash
 
+try:
+    from .backends import MySQLDialect, MySQLPool, SQLiteDialect, integrity_errors
+    from .instrumentation import connection_factory
+    from .lifecycle import register_after_fork
+    from .passwords import PASSWORD_HASH_METHOD, needs_rehash
+except ImportError:
+    from backends import MySQLDialect, MySQLPool, SQLiteDialect, integrity_errors
+    from instrumentation import connection_factory
+    from lifecycle import register_after_fork
+    from passwords import PASSWORD_HASH_METHOD, needs_rehash
+
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-DB_PATH = os.path.join(BASE_DIR, "multi_role_platform.db")
+DB_PATH = os.environ.get("MULTI_ROLE_DB_PATH", "").strip() or os.path.join(BASE_DIR, "multi_role_platform.db")
+
+# Called with each event dict after the transaction that recorded it commits (see server/events.py).
+EVENT_LISTENERS: List[Callable[[dict], None]] = []
+
+# Where read-only helpers (list_*/get_*, dashboard) run. "primary": the same connection as writes;
+# "ro": a read-only connection (mode=ro + query_only) on the primary file; "snapshot": a copy of the
+# primary made with the online backup API, never older than DB_SNAPSHOT_MAX_STALENESS seconds.
+READ_MODES = {"primary", "ro", "snapshot"}
+DB_READ_MODE = os.environ.get("DB_READ_MODE", "primary").strip().lower() or "primary"
+if DB_READ_MODE not in READ_MODES:
+    raise ValueError(f"DB_READ_MODE 仅支持：{'/'.join(sorted(READ_MODES))}")
+DB_SNAPSHOT_PATH = os.environ.get("DB_SNAPSHOT_PATH", "").strip()
+DB_SNAPSHOT_MAX_STALENESS = float(os.environ.get("DB_SNAPSHOT_MAX_STALENESS", "5").strip() or "5")
+
+# "sqlite": the DB_PATH file; "mysql": the MYSQL_URL server (requires PyMySQL), through a per-process pool.
+DB_BACKENDS = {"sqlite", "mysql"}
+DB_BACKEND = os.environ.get("DB_BACKEND", "sqlite").strip().lower() or "sqlite"
+if DB_BACKEND not in DB_BACKENDS:
+    raise ValueError(f"DB_BACKEND 仅支持：{'/'.join(sorted(DB_BACKENDS))}")
+if DB_BACKEND == "mysql" and DB_READ_MODE != "primary":
+    raise ValueError("DB_READ_MODE=ro/snapshot 仅适用于 SQLite")
+MYSQL_URL = os.environ.get("MYSQL_URL", "").strip() or "mysql://root@127.0.0.1:3306/multi_role_platform"
+MYSQL_POOL_SIZE = max(1, int(os.environ.get("MYSQL_POOL_SIZE", "10").strip() or "10"))
+MYSQL_POOL_TIMEOUT = float(os.environ.get("MYSQL_POOL_TIMEOUT", "5").strip() or "5")
+
+DIALECT = MySQLDialect() if DB_BACKEND == "mysql" else SQLiteDialect()
+_MYSQL_POOL = MySQLPool(MYSQL_URL, MYSQL_POOL_SIZE, MYSQL_POOL_TIMEOUT) if DB_BACKEND == "mysql" else None
+# Unique-key violations from whichever driver is in use.
+INTEGRITY_ERRORS = integrity_errors(DB_BACKEND)
 
 
 def get_db_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+    if _MYSQL_POOL is not None:
+        return _MYSQL_POOL.connect()
+    conn = sqlite3.connect(DB_PATH, factory=connection_factory())
     conn.execute("PRAGMA foreign_keys = ON")
     conn.row_factory = sqlite3.Row
     return conn
 
 
+# ===== Read routing =====
+
+
+class _ReadRoute:
+    __slots__ = ("primary", "token", "floor", "floor_loaded")
+
+    def __init__(self, primary: bool, token: Optional[str]):
+        self.primary = primary
+        self.token = token
+        # Lowest change_log seq a read may reflect; loaded lazily because most reads never need it.
+        self.floor = 0
+        self.floor_loaded = not token
+
+
+_read_route: contextvars.ContextVar = contextvars.ContextVar("read_route", default=None)
+
+
+def begin_read_route(token: Optional[str] = None, primary: bool = False) -> contextvars.Token:
+    """Scope read routing to one request: `primary` pins every read to the primary (write requests);
+    `token` lets snapshot reads honour that session's own writes. Undo with end_read_route()."""
+    return _read_route.set(_ReadRoute(primary, token))
+
+
+def end_read_route(route_token: contextvars.Token) -> None:
+    _read_route.reset(route_token)
+
+
+def require_read_seq(seq: int) -> None:
+    """Make the rest of this request's reads reflect at least change_log seq `seq`."""
+    route = _read_route.get()
+    if route is not None:
+        route.floor = max(route.floor, seq)
+
+
+def record_session_write(token: str) -> None:
+    """Remember how far the log had advanced when this session last wrote (read-your-writes)."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("UPDATE auth_tokens SET write_seq = ? WHERE token = ?", (_current_change_seq(cur), token))
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _read_floor(route: Optional["_ReadRoute"]) -> int:
+    if route is None:
+        return 0
+    if not route.floor_loaded:
+        route.floor_loaded = True
+        conn = get_db_connection()
+        cur = conn.cursor()
+        try:
+            # The session's own writes, plus changes other users made to rows this user owns
+            # (e.g. an application being accepted) that a pushed event may prompt it to reload.
+            cur.execute(
+                """
+                SELECT t.write_seq,
+                       (SELECT MAX(c.seq) FROM change_log c WHERE c.user_id = t.user_id) AS owned_seq
+                FROM auth_tokens t
+                WHERE t.token = ?
+                """,
+                (route.token,),
+            )
+            row = cur.fetchone()
+        finally:
+            cur.close()
+            conn.close()
+        if row:
+            route.floor = max(route.floor, row["write_seq"] or 0, row["owned_seq"] or 0)
+    return route.floor
+
+
+def _read_only_uri(path: str) -> str:
+    # urllib.request is imported on first use: nothing else on the startup path needs it.
+    from urllib.request import pathname2url
+
+    return f"file:{pathname2url(path)}?mode=ro"
+
+
+def _connect_read_only(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(_read_only_uri(path), uri=True, factory=connection_factory())
+    conn.execute("PRAGMA query_only = ON")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class _Snapshot:
+    """Backup-API copy of the primary, swapped in atomically and refreshed off the request path.
+
+    The file's mtime is the time its copy started, so its age bounds how stale a read can be.
+    Readers that find it older than the bound (or behind their read floor) use the primary instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._seq_cache: Tuple[Optional[Tuple[int, int]], int] = (None, 0)
+
+    @staticmethod
+    def path() -> str:
+        return DB_SNAPSHOT_PATH or os.path.join(
+            tempfile.gettempdir(), f"cp-snapshot-{hashlib.md5(DB_PATH.encode('utf-8')).hexdigest()[:12]}.db"
+        )
+
+    def connect(self, min_seq: int) -> Optional[sqlite3.Connection]:
+        path = self.path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.refresh_async()
+            return None
+        age = time.time() - stat.st_mtime
+        if age > DB_SNAPSHOT_MAX_STALENESS / 2:
+            self.refresh_async()
+        if age > DB_SNAPSHOT_MAX_STALENESS:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns)
+        cached_version, cached_seq = self._seq_cache
+        if min_seq and cached_version == version and cached_seq < min_seq:
+            return None
+        conn = _connect_read_only(path)
+        if min_seq and cached_version != version:
+            cur = conn.cursor()
+            seq = _current_change_seq(cur)
+            cur.close()
+            self._seq_cache = (version, seq)
+            if seq < min_seq:
+                conn.close()
+                return None
+        return conn
+
+    def reset_after_fork(self) -> None:
+        # A refresh thread running in the parent did not survive the fork; its flag and lock did.
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh_async(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name="db-snapshot", daemon=True).start()
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        except Exception:
+            logging.exception("db snapshot refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh(self, force: bool = False) -> bool:
+        """Copy the primary unless another worker just did or nothing changed. Returns True if copied."""
+        path = self.path()
+        started = time.time()
+        try:
+            age = started - os.stat(path).st_mtime
+        except FileNotFoundError:
+            age = None
+        if not force and age is not None and age < DB_SNAPSHOT_MAX_STALENESS / 2:
+            return False
+        src = sqlite3.connect(DB_PATH)
+        try:
+            primary = _copy_marker(src.cursor())
+            if not force and age is not None:
+                current = sqlite3.connect(_read_only_uri(path), uri=True)
+                try:
+                    unchanged = _copy_marker(current.cursor()) == primary
+                finally:
+                    current.close()
+                if unchanged:
+                    # Nothing logged since the last copy: it is as fresh as a new one would be.
+                    os.utime(path, (started, started))
+                    return False
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            dst = sqlite3.connect(tmp_path)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+            os.utime(tmp_path, (started, started))
+            # Open snapshot connections keep reading the old inode until they close.
+            os.replace(tmp_path, path)
+            return True
+        finally:
+            src.close()
+
+
+def _copy_marker(cur: sqlite3.Cursor) -> Optional[Tuple[int, int]]:
+    # View counts are written without a change_log entry (see add_project_views), so they are compared too.
+    try:
+        cur.execute("SELECT COALESCE(SUM(view_count), 0) FROM project")
+    except sqlite3.OperationalError:
+        # A copy taken before the view_count migration.
+        return None
+    views = cur.fetchone()[0]
+    return _current_change_seq(cur), views
+
+
+_SNAPSHOT = _Snapshot()
+
+
+@register_after_fork
+def reset_after_fork() -> None:
+    """Drop database state inherited from the parent (run by lifecycle.run_after_fork in a forked worker).
+
+    Connections are opened per call, so only the MySQL pool's idle sockets and the snapshot refresher's
+    state can leak across a fork.
+    """
+    if _MYSQL_POOL is not None:
+        _MYSQL_POOL.reset_after_fork()
+    _SNAPSHOT.reset_after_fork()
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """Connection for read-only helpers, routed by DB_READ_MODE. Writes always use get_db_connection()."""
+    route = _read_route.get()
+    if DB_READ_MODE == "primary" or (route is not None and route.primary):
+        return get_db_connection()
+    if DB_READ_MODE == "snapshot":
+        conn = _SNAPSHOT.connect(_read_floor(route))
+        if conn is not None:
+            return conn
+    return _connect_read_only(DB_PATH)
+
+
 def init_database() -> None:
     conn = get_db_connection()
     cursor = conn.cursor()
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS user (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            user_type TEXT NOT NULL,
-            real_name TEXT NOT NULL,
-            school_company TEXT,
-            skill_tags TEXT,
-            contact TEXT,
-            status INTEGER NOT NULL DEFAULT 1,
-            create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS user (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username VARCHAR(191) NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL,
+                user_type TEXT NOT NULL,
+                real_name TEXT NOT NULL,
+                school_company TEXT,
+                skill_tags TEXT,
+                contact TEXT,
+                status INTEGER NOT NULL DEFAULT 1,
+                create_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_login TIMESTAMP
+            )
+            """
         )
-        """
     )
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS project (
-            project_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_name TEXT NOT NULL,
-            description TEXT DEFAULT '无详细描述',
-            publisher_id INTEGER NOT NULL,
-            project_status TEXT NOT NULL DEFAULT '招募中',
-            publish_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            deadline TIMESTAMP,
-            result_url TEXT,
-            expected_market TEXT,
-            work_mode TEXT,
-            participant_count TEXT,
-            company TEXT NOT NULL,
-            FOREIGN KEY (publisher_id) REFERENCES user(user_id) ON DELETE CASCADE
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS project (
+                project_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_name TEXT NOT NULL,
+                description TEXT DEFAULT '无详细描述',
+                publisher_id INTEGER NOT NULL,
+                project_status TEXT NOT NULL DEFAULT '招募中',
+                publish_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                deadline TIMESTAMP,
+                result_url TEXT,
+                expected_market TEXT,
+                work_mode TEXT,
+                participant_count TEXT,
+                company TEXT NOT NULL,
+                role_count INTEGER NOT NULL DEFAULT 0,
+                total_slots INTEGER NOT NULL DEFAULT 0,
+                filled_slots INTEGER NOT NULL DEFAULT 0,
+                open_role_count INTEGER NOT NULL DEFAULT 0,
+                pending_applications INTEGER NOT NULL DEFAULT 0,
+                view_count INTEGER NOT NULL DEFAULT 0,
+                popularity REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (publisher_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
         )
-        """
     )
 
     # Backward-compatible migration for existing databases.
-    cursor.execute("PRAGMA table_info(project)")
-    project_columns = {row[1] for row in cursor.fetchall()}
+    project_columns = DIALECT.table_columns(cursor, "project")
     if "expected_market" not in project_columns:
         cursor.execute("ALTER TABLE project ADD COLUMN expected_market TEXT")
     if "work_mode" not in project_columns:
@@ -70,70 +360,211 @@ def init_database() -> None:
         cursor.execute("ALTER TABLE project ADD COLUMN participant_count TEXT")
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS role (
-            role_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER NOT NULL,
-            role_name TEXT NOT NULL,
-            task_desc TEXT NOT NULL,
-            skill_require TEXT,
-            limit_num INTEGER NOT NULL DEFAULT 1,
-            join_num INTEGER NOT NULL DEFAULT 0,
-            role_status TEXT NOT NULL DEFAULT '招募中',
-            task_deadline TIMESTAMP,
-            FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
-            UNIQUE (project_id, role_name)
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS role (
+                role_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER NOT NULL,
+                role_name VARCHAR(191) NOT NULL,
+                task_desc TEXT NOT NULL,
+                skill_require TEXT,
+                limit_num INTEGER NOT NULL DEFAULT 1,
+                join_num INTEGER NOT NULL DEFAULT 0,
+                role_status TEXT NOT NULL DEFAULT '招募中',
+                task_deadline TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
+                UNIQUE (project_id, role_name)
+            )
+            """
         )
-        """
     )
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS role_application (
-            application_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_id INTEGER NOT NULL,
-            project_id INTEGER NOT NULL,
-            student_id INTEGER NOT NULL,
-            motivation TEXT,
-            status TEXT NOT NULL DEFAULT 'pending',
-            apply_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            update_time TIMESTAMP,
-            UNIQUE (role_id, student_id),
-            FOREIGN KEY (role_id) REFERENCES role(role_id) ON DELETE CASCADE,
-            FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
-            FOREIGN KEY (student_id) REFERENCES user(user_id) ON DELETE CASCADE
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS role_application (
+                application_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                role_id INTEGER NOT NULL,
+                project_id INTEGER NOT NULL,
+                student_id INTEGER NOT NULL,
+                motivation TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                apply_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                update_time TIMESTAMP,
+                UNIQUE (role_id, student_id),
+                FOREIGN KEY (role_id) REFERENCES role(role_id) ON DELETE CASCADE,
+                FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
+                FOREIGN KEY (student_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
         )
-        """
     )
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS role_feedback (
-            feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER NOT NULL,
-            role_id INTEGER NOT NULL,
-            user_id INTEGER NOT NULL,
-            content TEXT NOT NULL,
-            evidence_url TEXT,
-            status TEXT NOT NULL DEFAULT 'submitted',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
-            FOREIGN KEY (role_id) REFERENCES role(role_id) ON DELETE CASCADE,
-            FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS role_feedback (
+                feedback_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER NOT NULL,
+                role_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                evidence_url TEXT,
+                status TEXT NOT NULL DEFAULT 'submitted',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (project_id) REFERENCES project(project_id) ON DELETE CASCADE,
+                FOREIGN KEY (role_id) REFERENCES role(role_id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
         )
-        """
     )
 
     cursor.execute(
-        """
-        CREATE TABLE IF NOT EXISTS auth_tokens (
-            token TEXT PRIMARY KEY,
-            user_id INTEGER NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS auth_tokens (
+                token VARCHAR(64) PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                write_seq INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
         )
-        """
     )
+    # write_seq：该会话最近一次写入时的 change_log 序号，快照读据此保证读到自己的写入
+    if "write_seq" not in DIALECT.table_columns(cursor, "auth_tokens"):
+        cursor.execute("ALTER TABLE auth_tokens ADD COLUMN write_seq INTEGER NOT NULL DEFAULT 0")
+
+    # 事件流票据：EventSource 不能带请求头，用一次性、短时有效的票据代替 token 放进 URL，避免 token 进入访问日志
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS stream_tickets (
+                ticket VARCHAR(64) PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                expires_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
+        )
+    )
+
+    # 事件日志：状态变化推送（SSE）与跨 worker 分发，user_id/publisher_id 为可接收事件的用户
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS event_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_type TEXT NOT NULL,
+                user_id INTEGER,
+                publisher_id INTEGER,
+                payload TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+    DIALECT.create_index(cursor, "idx_event_log_user", "event_log", "user_id, seq")
+    DIALECT.create_index(cursor, "idx_event_log_publisher", "event_log", "publisher_id, seq")
+
+    # 变更日志：与业务写入同一事务追加，列表接口据此返回 ?since=<seq> 之后的增量与删除墓碑
+    # project_id/role_id/user_id 为归属范围（项目、角色、发布者/学生/提交者），用于按列表范围过滤
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity VARCHAR(16) NOT NULL,
+                entity_id INTEGER NOT NULL,
+                op VARCHAR(16) NOT NULL,
+                project_id INTEGER,
+                role_id INTEGER,
+                user_id INTEGER,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+    )
+    DIALECT.create_index(cursor, "idx_change_log_entity", "change_log", "entity, seq")
+    DIALECT.create_index(cursor, "idx_change_log_user", "change_log", "user_id, seq")
+    # MySQL：追加 change_log/event_log 时持有的锁行，使 seq 顺序与提交顺序一致（见 backends.lock_sequence）
+    DIALECT.init_sequence_locks(cursor, ("change_log", "event_log"))
+
+    # 技能标签倒排索引：skill_tag 为归一化后的标签，role_tag/user_tag 为 标签→角色/用户 的倒排表
+    # 由 role_add/role_update、user_add/user_update 在同一事务中维护，推荐接口（server/matching.py）据此打分
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS skill_tag (
+                tag_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name VARCHAR(64) NOT NULL UNIQUE
+            )
+            """
+        )
+    )
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS role_tag (
+                tag_id INTEGER NOT NULL,
+                role_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, role_id),
+                FOREIGN KEY (tag_id) REFERENCES skill_tag(tag_id) ON DELETE CASCADE,
+                FOREIGN KEY (role_id) REFERENCES role(role_id) ON DELETE CASCADE
+            )
+            """
+        )
+    )
+    cursor.execute(
+        DIALECT.ddl(
+            """
+            CREATE TABLE IF NOT EXISTS user_tag (
+                tag_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                PRIMARY KEY (tag_id, user_id),
+                FOREIGN KEY (tag_id) REFERENCES skill_tag(tag_id) ON DELETE CASCADE,
+                FOREIGN KEY (user_id) REFERENCES user(user_id) ON DELETE CASCADE
+            )
+            """
+        )
+    )
+    DIALECT.create_index(cursor, "idx_role_tag_role", "role_tag", "role_id")
+    DIALECT.create_index(cursor, "idx_user_tag_user", "user_tag", "user_id")
+    # 旧数据库首次建表后，从已有的 role.skill_require / user.skill_tags 回填
+    cursor.execute("SELECT 1 FROM skill_tag LIMIT 1")
+    if not cursor.fetchone():
+        rebuild_tag_index(cursor)
+
+    # 项目汇总列：岗位数、名额、已录取、招募中岗位数、待审申请数，由角色/申请写入在同一事务中重算
+    # 旧数据库补列后按现有 role/role_application 回填
+    missing_summary = [c for c in PROJECT_SUMMARY_COLUMNS if c not in DIALECT.table_columns(cursor, "project")]
+    for column in missing_summary:
+        cursor.execute(f"ALTER TABLE project ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    DIALECT.create_index(cursor, "idx_role_application_project", "role_application", "project_id, status")
+    if missing_summary:
+        rebuild_project_summaries(cursor)
+    else:
+        # 草稿角色不计入汇总：按旧口径计入过草稿的数据库重算一次
+        cursor.execute(
+            """
+            SELECT 1 FROM role r JOIN project p ON p.project_id = r.project_id
+            WHERE r.role_status = '草稿'
+              AND p.role_count > (SELECT COUNT(*) FROM role r2 WHERE r2.project_id = p.project_id AND r2.role_status != '草稿')
+            LIMIT 1
+            """
+        )
+        if cursor.fetchone():
+            rebuild_project_summaries(cursor)
+
+    # 浏览量与热度：由 server/popularity.py 在各 worker 内存中累计，按批写回（不记 change_log）
+    project_columns = DIALECT.table_columns(cursor, "project")
+    if "view_count" not in project_columns:
+        cursor.execute("ALTER TABLE project ADD COLUMN view_count INTEGER NOT NULL DEFAULT 0")
+    if "popularity" not in project_columns:
+        cursor.execute("ALTER TABLE project ADD COLUMN popularity REAL NOT NULL DEFAULT 0")
+    DIALECT.create_index(cursor, "idx_project_popularity", "project", "popularity, publish_time")
 
     conn.commit()
     conn.close()
@@ -150,6 +581,7 @@ def seed_demo_data_if_empty() -> None:
         return
 
     _insert_demo_seed_data(cursor)
+    _log_change(cursor, CHANGE_RESET, 0, "reset")
     conn.commit()
     conn.close()
 
@@ -197,48 +629,662 @@ def _insert_demo_seed_data(cursor: sqlite3.Cursor) -> None:
         )
         project1_id = cursor.lastrowid
 
-        cursor.execute(
+        cursor.execute(
+            """
+            INSERT INTO project
+            (project_name, description, publisher_id, project_status, publish_time, deadline, result_url, expected_market, work_mode, participant_count, company)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                "大数据可视化",
+                "用户行为数据分析",
+                company2_id,
+                "进行中",
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "2026-05-15 23:59:59",
+                "",
+                "企业市场",
+                "混合协作",
+                "3-5人",
+                "腾讯云计算有限公司",
+            ),
+        )
+        project2_id = cursor.lastrowid
+
+        roles = [
+            (project1_id, "后端开发", "接口开发", "Python,Flask,SQLite", 3, 1, "招募中", "2026-04-30"),
+            (project1_id, "前端开发", "页面开发", "Vue,HTML/CSS", 2, 0, "招募中", "2026-05-10"),
+            (project2_id, "数据分析师", "数据清洗", "Python,Pandas", 2, 1, "进行中", "2026-04-20"),
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO role
+            (project_id, role_name, task_desc, skill_require, limit_num, join_num, role_status, task_deadline)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            roles,
+        )
+    rebuild_tag_index(cursor)
+    rebuild_project_summaries(cursor)
+
+
+# ===== Change log (delta sync) =====
+
+CHANGE_ENTITIES = {"user", "project", "role", "application", "feedback"}
+# Entity logged by bulk rewrites (seed/reset): a delta window containing it must be answered in full.
+CHANGE_RESET = "*"
+# Beyond this many changed rows a delta is no smaller than the list itself.
+CHANGE_SYNC_LIMIT = 1000
+
+
+def _log_change(
+    cur: sqlite3.Cursor,
+    entity: str,
+    entity_id: int,
+    op: str = "upsert",
+    project_id: Optional[int] = None,
+    role_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> None:
+    """Append to change_log inside the caller's transaction, so a row and its log entry commit together."""
+    DIALECT.lock_sequence(cur, "change_log")
+    cur.execute(
+        """
+        INSERT INTO change_log (entity, entity_id, op, project_id, role_id, user_id, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (entity, entity_id, op, project_id, role_id, user_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+
+
+def _log_deletes(cur: sqlite3.Cursor, entity: str, select_sql: str, params: Tuple = ()) -> None:
+    """Tombstone every (id, project_id, role_id, user_id) row of `select_sql` before a cascading delete removes it."""
+    DIALECT.lock_sequence(cur, "change_log")
+    cur.execute(
+        f"""
+        INSERT INTO change_log (entity, entity_id, op, project_id, role_id, user_id, changed_at)
+        SELECT ?, c.id, 'delete', c.project_id, c.role_id, c.user_id, ? FROM ({select_sql}) AS c
+        """,
+        (entity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), *params),
+    )
+
+
+def _log_project_deletes(cur: sqlite3.Cursor, where: str, params: Tuple) -> None:
+    # Projects cascade to their roles, applications and feedback; each needs its own tombstone.
+    projects = f"SELECT project_id FROM project WHERE {where}"
+    _log_deletes(
+        cur,
+        "application",
+        f"SELECT application_id AS id, project_id, role_id, student_id AS user_id FROM role_application WHERE project_id IN ({projects})",
+        params,
+    )
+    _log_deletes(
+        cur,
+        "feedback",
+        f"SELECT feedback_id AS id, project_id, role_id, user_id FROM role_feedback WHERE project_id IN ({projects})",
+        params,
+    )
+    _log_deletes(
+        cur,
+        "role",
+        f"SELECT role_id AS id, project_id, role_id, NULL AS user_id FROM role WHERE project_id IN ({projects})",
+        params,
+    )
+    _log_deletes(
+        cur,
+        "project",
+        f"SELECT project_id AS id, project_id, NULL AS role_id, publisher_id AS user_id FROM project WHERE {where}",
+        params,
+    )
+
+
+def _current_change_seq(cur: sqlite3.Cursor) -> int:
+    cur.execute(DIALECT.sequence_sql("change_log"))
+    row = cur.fetchone()
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+def latest_change_seq() -> int:
+    # Routed like the list reads, so a snapshot reports the position it was copied at.
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        return _current_change_seq(cur)
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _change_window_available(cur: sqlite3.Cursor, since: int, until: int) -> bool:
+    # (since, until] must still be in the retained log and must not span a reset.
+    cur.execute("SELECT MIN(seq) FROM change_log")
+    floor = cur.fetchone()[0]
+    if floor is None or since < floor - 1:
+        return False
+    cur.execute(
+        "SELECT 1 FROM change_log WHERE entity = ? AND seq > ? AND seq <= ? LIMIT 1",
+        (CHANGE_RESET, since, until),
+    )
+    return cur.fetchone() is None
+
+
+def changes_since(since: int, until: int, scopes: Dict[str, Dict[str, int]]) -> Optional[Dict[str, Dict[int, str]]]:
+    """Latest op per row changed in (since, until], for each entity in `scopes`.
+
+    `scopes` maps an entity to column filters, e.g. {"application": {"user_id": 7}, "role": {}}.
+    Returns None when the window cannot be answered as a delta: `since` is ahead of the log (another
+    database), older than the retained log, spans a reset, or covers more than CHANGE_SYNC_LIMIT rows.
+    """
+    if since > until:
+        return None
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if since == until:
+            return {entity: {} for entity in scopes}
+        if not _change_window_available(cur, since, until):
+            return None
+
+        result: Dict[str, Dict[int, str]] = {}
+        for entity, filters in scopes.items():
+            if entity not in CHANGE_ENTITIES or not set(filters) <= {"project_id", "role_id", "user_id"}:
+                raise ValueError(f"不支持的变更范围：{entity} {sorted(filters)}")
+            clauses = "".join(f" AND {column} = ?" for column in filters)
+            cur.execute(
+                f"""
+                SELECT entity_id, op FROM change_log
+                WHERE entity = ? AND seq > ? AND seq <= ?{clauses}
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (entity, since, until, *filters.values(), CHANGE_SYNC_LIMIT + 1),
+            )
+            rows = cur.fetchall()
+            if len(rows) > CHANGE_SYNC_LIMIT:
+                return None
+            result[entity] = {r["entity_id"]: r["op"] for r in rows}
+        return result
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _changed_scope_ids(column: str, since: int, until: int, entities: Tuple[str, ...]) -> Optional[List[int]]:
+    if since > until:
+        return None
+    if since == until:
+        return []
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if not _change_window_available(cur, since, until):
+            return None
+        cur.execute(
+            f"""
+            SELECT DISTINCT {column} FROM change_log
+            WHERE seq > ? AND seq <= ? AND entity IN ({', '.join('?' * len(entities))}) AND {column} IS NOT NULL
+            LIMIT ?
+            """,
+            (since, until, *entities, CHANGE_SYNC_LIMIT + 1),
+        )
+        rows = cur.fetchall()
+        if len(rows) > CHANGE_SYNC_LIMIT:
+            return None
+        return [r[0] for r in rows]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def changed_user_ids(since: int, until: int, entities: Tuple[str, ...] = ("user", "application")) -> Optional[List[int]]:
+    """Users whose own row or whose `entities` rows (scoped by change_log.user_id) changed in (since, until].
+
+    None under the same conditions as changes_since(): the caller must then drop everything it cached.
+    """
+    return _changed_scope_ids("user_id", since, until, entities)
+
+
+def changed_project_ids(
+    since: int, until: int, entities: Tuple[str, ...] = ("project", "role", "application")
+) -> Optional[List[int]]:
+    """Projects whose own row or whose `entities` rows changed in (since, until]; None like changed_user_ids()."""
+    return _changed_scope_ids("project_id", since, until, entities)
+
+
+def prune_change_log(before: str) -> int:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM change_log WHERE changed_at < ?", (before,))
+        conn.commit()
+        return cur.rowcount
+    finally:
+        cur.close()
+        conn.close()
+
+
+# ===== Skill tags (inverted index) =====
+
+# Free-text skill fields are split on list separators only, so "HTML/CSS", "C++" or "UI 设计" stay one tag.
+_TAG_SEPARATORS = re.compile(r"[,，、;；|\n]+")
+SKILL_TAG_MAX_LEN = 64
+# Posting table and key column for each kind of tagged row.
+TAG_POSTINGS = {"role": ("role_tag", "role_id"), "user": ("user_tag", "user_id")}
+_IN_CHUNK = 500
+
+
+def parse_skill_tags(text: Optional[str]) -> List[str]:
+    """Normalized, de-duplicated tags of a skill_tags/skill_require value: "Python, flask，Vue" -> ["python", "flask", "vue"]."""
+    tags: List[str] = []
+    for part in _TAG_SEPARATORS.split(text or ""):
+        tag = " ".join(part.split()).casefold()
+        if tag and len(tag) <= SKILL_TAG_MAX_LEN and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def _chunks(values: List, size: int = _IN_CHUNK):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _tag_ids(cur: sqlite3.Cursor, names: List[str]) -> Dict[str, int]:
+    """tag_id of each name, creating the missing ones."""
+    ids: Dict[str, int] = {}
+
+    def lookup(wanted: List[str]) -> None:
+        for chunk in _chunks(wanted):
+            cur.execute(f"SELECT tag_id, name FROM skill_tag WHERE name IN ({', '.join('?' * len(chunk))})", chunk)
+            ids.update({row[1]: row[0] for row in cur.fetchall()})
+
+    lookup(names)
+    # Insert only what is missing: a conflicting insert still burns an AUTOINCREMENT value on both backends.
+    missing = [name for name in names if name not in ids]
+    if missing:
+        cur.executemany(DIALECT.insert("skill_tag", ("name",), conflict=("name",)), [(name,) for name in missing])
+        lookup(missing)
+    return ids
+
+
+def _sync_tags(cur: sqlite3.Cursor, kind: str, entity_id: int, text: Optional[str]) -> None:
+    """Replace the postings of one role or user inside the caller's transaction."""
+    table, column = TAG_POSTINGS[kind]
+    cur.execute(f"DELETE FROM {table} WHERE {column} = ?", (entity_id,))
+    ids = _tag_ids(cur, parse_skill_tags(text))
+    # A set: names that differ only in ways the MySQL collation ignores share one tag_id.
+    if ids:
+        cur.executemany(
+            f"INSERT INTO {table} (tag_id, {column}) VALUES (?, ?)", [(tag_id, entity_id) for tag_id in sorted(set(ids.values()))]
+        )
+
+
+def rebuild_tag_index(cur: sqlite3.Cursor) -> Dict[str, int]:
+    """Rebuild role_tag and user_tag from role.skill_require and user.skill_tags.
+
+    For writers that bypass the helpers (demo seed, scripts/generate_data.py) and for the initial
+    backfill; runs in the caller's transaction and returns the posting counts.
+    """
+    sources = {"role": "SELECT role_id, skill_require FROM role", "user": "SELECT user_id, skill_tags FROM user"}
+    counts: Dict[str, int] = {}
+    for kind, select_sql in sources.items():
+        table, column = TAG_POSTINGS[kind]
+        cur.execute(f"DELETE FROM {table}")
+        cur.execute(select_sql)
+        parsed = [(row[0], parse_skill_tags(row[1])) for row in cur.fetchall()]
+        ids = _tag_ids(cur, sorted({name for _, names in parsed for name in names}))
+        postings = [
+            (tag_id, entity_id)
+            for entity_id, names in parsed
+            for tag_id in sorted({ids[name] for name in names if name in ids})
+        ]
+        cur.executemany(f"INSERT INTO {table} (tag_id, {column}) VALUES (?, ?)", postings)
+        counts[table] = len(postings)
+    return counts
+
+
+def load_tag_entities(
+    kind: str, entity_ids: Optional[List[int]] = None, project_ids: Optional[List[int]] = None
+) -> Dict[int, Tuple[List[int], bool]]:
+    """{id: (tag_ids, eligible)} for every role/user, or only for `entity_ids` (and roles of `project_ids`).
+
+    Eligible means recommendable: a role open for applications (same rules as apply_for_role), or an
+    active student. Ids asked for but missing from the result no longer exist.
+    """
+    if kind == "role":
+        select_sql = """
+            SELECT r.role_id, rt.tag_id,
+                   CASE WHEN r.role_status = '招募中' AND r.join_num < r.limit_num
+                             AND p.project_status NOT IN ('草稿', '已终止') THEN 1 ELSE 0 END
+            FROM role r
+            JOIN project p ON p.project_id = r.project_id
+            LEFT JOIN role_tag rt ON rt.role_id = r.role_id
+        """
+        filters = (("r.role_id", entity_ids), ("r.project_id", project_ids))
+    elif kind == "user":
+        select_sql = """
+            SELECT u.user_id, ut.tag_id, CASE WHEN u.user_type = '学生' AND u.status = 1 THEN 1 ELSE 0 END
+            FROM user u
+            LEFT JOIN user_tag ut ON ut.user_id = u.user_id
+        """
+        filters = (("u.user_id", entity_ids),)
+    else:
+        raise ValueError(f"不支持的标签对象：{kind}")
+
+    batches: List[Tuple[str, List]] = []
+    if entity_ids is None and project_ids is None:
+        batches.append((select_sql, []))
+    for column, values in filters:
+        for chunk in _chunks(sorted(set(values or ()))):
+            batches.append((f"{select_sql} WHERE {column} IN ({', '.join('?' * len(chunk))})", chunk))
+
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        entities: Dict[int, Tuple[List[int], bool]] = {}
+        for sql, params in batches:
+            cur.execute(sql, params)
+            for row in cur.fetchall():
+                tags = entities.setdefault(row[0], ([], bool(row[2])))[0]
+                if row[1] is not None and row[1] not in tags:
+                    tags.append(row[1])
+        return entities
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_entity_tags(kind: str, entity_id: int) -> List[dict]:
+    table, column = TAG_POSTINGS[kind]
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"""
+            SELECT t.tag_id, t.name FROM {table} x
+            JOIN skill_tag t ON t.tag_id = x.tag_id
+            WHERE x.{column} = ?
+            ORDER BY t.name
+            """,
+            (entity_id,),
+        )
+        return [dict(r) for r in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def list_unrecommendable_roles(student_id: int) -> List[int]:
+    """Roles apply_for_role would refuse for this student: already applied (pending/accepted) or project already joined."""
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT role_id FROM role_application WHERE student_id = ? AND status IN ('pending', 'accepted')
+            UNION
+            SELECT r.role_id FROM role_application a
+            JOIN role r ON r.project_id = a.project_id
+            WHERE a.student_id = ? AND a.status = 'accepted'
+            """,
+            (student_id, student_id),
+        )
+        return [r[0] for r in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def list_role_unrecommendable_students(role_id: int) -> List[int]:
+    """Students that already applied for the role (pending/accepted) or already joined its project."""
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT student_id FROM role_application WHERE role_id = ? AND status IN ('pending', 'accepted')
+            UNION
+            SELECT a.student_id FROM role_application a
+            JOIN role r ON r.project_id = a.project_id
+            WHERE r.role_id = ? AND a.status = 'accepted'
+            """,
+            (role_id, role_id),
+        )
+        return [r[0] for r in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def load_application_history(student_ids: List[int]) -> Dict[int, Tuple[int, int]]:
+    """{student_id: (accepted, decided)} over all of each student's reviewed applications."""
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        history: Dict[int, Tuple[int, int]] = {}
+        for chunk in _chunks(sorted(set(student_ids))):
+            cur.execute(
+                f"""
+                SELECT student_id,
+                       SUM(CASE WHEN status = 'accepted' THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN status IN ('accepted', 'rejected') THEN 1 ELSE 0 END)
+                FROM role_application
+                WHERE student_id IN ({', '.join('?' * len(chunk))})
+                GROUP BY student_id
+                """,
+                chunk,
+            )
+            history.update({r[0]: (int(r[1] or 0), int(r[2] or 0)) for r in cur.fetchall()})
+        return history
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_roles_by_ids(role_ids: List[int]) -> Dict[int, dict]:
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        rows: Dict[int, dict] = {}
+        for chunk in _chunks(list(role_ids)):
+            cur.execute(
+                f"""
+                SELECT r.role_id, r.role_name, r.skill_require, r.limit_num, r.join_num, r.role_status, r.task_deadline,
+                       p.project_id, p.project_name, p.company
+                FROM role r
+                JOIN project p ON p.project_id = r.project_id
+                WHERE r.role_id IN ({', '.join('?' * len(chunk))})
+                """,
+                chunk,
+            )
+            rows.update({r["role_id"]: dict(r) for r in cur.fetchall()})
+        return rows
+    finally:
+        cur.close()
+        conn.close()
+
+
+def get_students_by_ids(user_ids: List[int]) -> Dict[int, dict]:
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        rows: Dict[int, dict] = {}
+        for chunk in _chunks(list(user_ids)):
+            cur.execute(
+                f"""
+                SELECT user_id, username, real_name, school_company, skill_tags
+                FROM user
+                WHERE user_type = '学生' AND user_id IN ({', '.join('?' * len(chunk))})
+                """,
+                chunk,
+            )
+            rows.update({r["user_id"]: dict(r) for r in cur.fetchall()})
+        return rows
+    finally:
+        cur.close()
+        conn.close()
+
+
+# ===== Project summaries (denormalized role counters) =====
+
+# Kept on the project row so project lists can show, filter and sort on them without joining role.
+PROJECT_SUMMARY_COLUMNS = ("role_count", "total_slots", "filled_slots", "open_role_count", "pending_applications")
+# A role has an open seat while it is recruiting and not yet full (the same test apply_for_role makes).
+# Draft roles are not published, so they count nowhere.
+_PROJECT_SUMMARY_SET = """
+    role_count = (SELECT COUNT(*) FROM role r WHERE r.project_id = project.project_id AND r.role_status != '草稿'),
+    total_slots = (
+        SELECT COALESCE(SUM(r.limit_num), 0) FROM role r WHERE r.project_id = project.project_id AND r.role_status != '草稿'
+    ),
+    filled_slots = (
+        SELECT COALESCE(SUM(r.join_num), 0) FROM role r WHERE r.project_id = project.project_id AND r.role_status != '草稿'
+    ),
+    open_role_count = (
+        SELECT COUNT(*) FROM role r
+        WHERE r.project_id = project.project_id AND r.role_status = '招募中' AND r.join_num < r.limit_num
+    ),
+    pending_applications = (
+        SELECT COUNT(*) FROM role_application ra WHERE ra.project_id = project.project_id AND ra.status = 'pending'
+    )
+"""
+
+
+def rebuild_project_summaries(cur: sqlite3.Cursor) -> int:
+    """Recompute every project's summary columns; for bulk writers that bypass the helpers."""
+    cur.execute(f"UPDATE project SET {_PROJECT_SUMMARY_SET}")
+    return cur.rowcount
+
+
+def _refresh_project_summaries(cur: sqlite3.Cursor, project_ids: Iterable[Optional[int]]) -> None:
+    """Recompute the summary columns of these projects inside the caller's transaction.
+
+    A project whose numbers moved is logged as changed, so project lists synced with ?since= pick it up.
+    """
+    ids = sorted({project_id for project_id in project_ids if project_id is not None})
+    columns = ", ".join(PROJECT_SUMMARY_COLUMNS)
+    for chunk in _chunks(ids):
+        marks = ", ".join("?" * len(chunk))
+        select_sql = f"SELECT project_id, publisher_id, {columns} FROM project WHERE project_id IN ({marks})"
+        cur.execute(select_sql, chunk)
+        before = {r["project_id"]: [r[c] for c in PROJECT_SUMMARY_COLUMNS] for r in cur.fetchall()}
+        cur.execute(f"UPDATE project SET {_PROJECT_SUMMARY_SET} WHERE project_id IN ({marks})", chunk)
+        cur.execute(select_sql, chunk)
+        for r in cur.fetchall():
+            if [r[c] for c in PROJECT_SUMMARY_COLUMNS] != before.get(r["project_id"]):
+                _log_change(cur, "project", r["project_id"], project_id=r["project_id"], user_id=r["publisher_id"])
+
+
+# ===== View counts (see server/popularity.py) =====
+
+
+def add_project_views(views: Dict[int, Tuple[int, float]]) -> int:
+    """Apply buffered detail views, {project_id: (views, log weight)}, in one transaction.
+
+    popularity holds ln(sum of view weights), so adding views is a log-add-exp in place: concurrent
+    flushes from several workers never read-modify-write. Nothing is logged to change_log: a view is
+    not an edit, and logging it would drop the per-project caches and fill list deltas.
+    """
+    if not views:
+        return 0
+    conn = get_db_connection()
+    if DB_BACKEND == "sqlite":
+        # LN/EXP are built in only when SQLite was compiled with its math functions.
+        conn.create_function("ln", 1, math.log, deterministic=True)
+        conn.create_function("exp", 1, math.exp, deterministic=True)
+    cur = conn.cursor()
+    try:
+        # In id order, so two workers flushing at once lock rows in the same order (MySQL).
+        cur.executemany(
+            f"UPDATE project SET view_count = view_count + ?, popularity = {DIALECT.logaddexp('popularity', '?')} "
+            "WHERE project_id = ?",
+            [(count, weight, weight, project_id) for project_id, (count, weight) in sorted(views.items())],
+        )
+        updated = cur.rowcount
+        conn.commit()
+        return updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+# ===== Cache warm-up (see server/warmup.py) =====
+
+# Tables behind the public project pages, authentication and the in-process caches.
+WARMUP_TABLES = ("project", "role", "role_application", "user", "auth_tokens", "change_log", "role_tag", "user_tag", "skill_tag")
+
+
+def list_hot_project_ids(limit: int) -> List[int]:
+    """Published projects most likely to be opened next: the most popular first."""
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
             """
-            INSERT INTO project
-            (project_name, description, publisher_id, project_status, publish_time, deadline, result_url, expected_market, work_mode, participant_count, company)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            SELECT project_id FROM project
+            WHERE project_status != '草稿'
+            ORDER BY popularity DESC, project_id DESC
+            LIMIT ?
             """,
-            (
-                "大数据可视化",
-                "用户行为数据分析",
-                company2_id,
-                "进行中",
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "2026-05-15 23:59:59",
-                "",
-                "企业市场",
-                "混合协作",
-                "3-5人",
-                "腾讯云计算有限公司",
-            ),
+            (max(0, int(limit)),),
         )
-        project2_id = cursor.lastrowid
+        return [row["project_id"] for row in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
 
-        roles = [
-            (project1_id, "后端开发", "接口开发", "Python,Flask,SQLite", 3, 1, "招募中", "2026-04-30"),
-            (project1_id, "前端开发", "页面开发", "Vue,HTML/CSS", 2, 0, "招募中", "2026-05-10"),
-            (project2_id, "数据分析师", "数据清洗", "Python,Pandas", 2, 1, "进行中", "2026-04-20"),
-        ]
-        cursor.executemany(
-            """
-            INSERT INTO role
-            (project_id, role_name, task_desc, skill_require, limit_num, join_num, role_status, task_deadline)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            roles,
+
+def list_recent_tokens(limit: int) -> List[str]:
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT token FROM auth_tokens ORDER BY created_at DESC LIMIT ?", (max(0, int(limit)),))
+        return [row["token"] for row in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def list_warmup_indexes() -> List[Tuple[str, str]]:
+    """(index, table) pairs on WARMUP_TABLES. Empty on MySQL, whose buffer pool lives in the server."""
+    if DB_BACKEND != "sqlite":
+        return []
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        marks = ", ".join("?" * len(WARMUP_TABLES))
+        cur.execute(
+            f"SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ({marks}) ORDER BY tbl_name, name",
+            WARMUP_TABLES,
         )
+        return [(row["name"], row["tbl_name"]) for row in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def touch_index(index: Tuple[str, str]) -> int:
+    """Read every page of one index, so the OS page cache holds it for all workers' connections."""
+    name, table = index
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        # Names come from sqlite_master (list_warmup_indexes), never from a request.
+        cur.execute(f'SELECT COUNT(*) FROM "{table}" INDEXED BY "{name}"')
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+        conn.close()
 
 
 # ===== CRUD Functions (team contribution integration) =====
 
 USER_TYPES = {"学生", "企业", "管理员"}
 PROJECT_STATUS = {"草稿", "招募中", "进行中", "已完成", "已终止"}
-ROLE_STATUS = {"招募中", "进行中", "已完成"}
+ROLE_STATUS = {"草稿", "招募中", "进行中", "已完成"}
+# Saved but not published (e.g. batch AI suggestions): hidden from public reads and project summaries.
+DRAFT_ROLE_STATUS = "草稿"
 
 
 def ensure_admin_user() -> None:
@@ -246,10 +1292,25 @@ def ensure_admin_user() -> None:
     cur = conn.cursor()
     try:
         username = "Tea0104"
-        password_hash = generate_password_hash("jhyy10nd")
+        password = "jhyy10nd"
 
-        cur.execute("SELECT user_id FROM user WHERE username = ?", (username,))
+        cur.execute(
+            "SELECT user_id, password_hash, user_type, real_name, school_company, status FROM user WHERE username = ?",
+            (username,),
+        )
         row = cur.fetchone()
+        if row and (
+            row["user_type"] == "管理员"
+            and row["real_name"] == username
+            and row["school_company"] == "系统管理"
+            and row["status"] == 1
+            and not needs_rehash(row["password_hash"])
+        ):
+            # Already in place: every boot after the first skips the rehash and the change_log entry,
+            # which would otherwise make each running worker reload the admin from its caches. The hash
+            # is only compared by its method prefix, since verifying it would cost a full scrypt run.
+            return
+        password_hash = generate_password_hash(password, PASSWORD_HASH_METHOD)
         if row:
             cur.execute(
                 """
@@ -259,6 +1320,7 @@ def ensure_admin_user() -> None:
                 """,
                 (password_hash, username, "系统管理", row["user_id"]),
             )
+            _log_change(cur, "user", row["user_id"], user_id=row["user_id"])
         else:
             cur.execute(
                 """
@@ -279,6 +1341,7 @@ def ensure_admin_user() -> None:
                     datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 ),
             )
+            _log_change(cur, "user", cur.lastrowid, user_id=cur.lastrowid)
         conn.commit()
     finally:
         cur.close()
@@ -304,6 +1367,7 @@ def reset_demo_data_preserve_admin(admin_username: str = "Tea0104") -> Dict:
         cur.execute("DELETE FROM user WHERE user_id != ?", (admin_user_id,))
 
         _insert_demo_seed_data(cur)
+        _log_change(cur, CHANGE_RESET, 0, "reset")
         conn.commit()
 
         return {
@@ -344,9 +1408,12 @@ def user_add(
             """,
             (username, password_hash, user_type, real_name, school_company, skill_tags, contact, status, create_time),
         )
+        user_id = cur.lastrowid
+        _sync_tags(cur, "user", user_id, skill_tags)
+        _log_change(cur, "user", user_id, user_id=user_id)
         conn.commit()
-        return {"code": 200, "msg": "用户新增成功", "data": {"user_id": cur.lastrowid, "username": username}}
-    except sqlite3.IntegrityError:
+        return {"code": 200, "msg": "用户新增成功", "data": {"user_id": user_id, "username": username}}
+    except INTEGRITY_ERRORS:
         conn.rollback()
         return {"code": 409, "msg": "用户名已存在", "data": None}
     except Exception as e:
@@ -364,7 +1431,19 @@ def user_del(user_id: int) -> Dict:
         cur.execute("SELECT user_id FROM user WHERE user_id = ?", (user_id,))
         if not cur.fetchone():
             return {"code": 404, "msg": "用户ID不存在", "data": None}
+        _log_project_deletes(cur, "publisher_id = ?", (user_id,))
+        _log_deletes(
+            cur,
+            "application",
+            "SELECT application_id AS id, project_id, role_id, student_id AS user_id FROM role_application WHERE student_id = ?",
+            (user_id,),
+        )
+        _log_deletes(cur, "feedback", "SELECT feedback_id AS id, project_id, role_id, user_id FROM role_feedback WHERE user_id = ?", (user_id,))
+        _log_change(cur, "user", user_id, "delete", user_id=user_id)
+        cur.execute("SELECT DISTINCT project_id FROM role_application WHERE student_id = ?", (user_id,))
+        applied_projects = [r["project_id"] for r in cur.fetchall()]
         cur.execute("DELETE FROM user WHERE user_id = ?", (user_id,))
+        _refresh_project_summaries(cur, applied_projects)
         conn.commit()
         return {"code": 200, "msg": "用户删除成功", "data": {"user_id": user_id}}
     except Exception as e:
@@ -403,9 +1482,14 @@ def user_update(user_id: int, **kwargs) -> Dict:
             return {"code": 404, "msg": "用户ID不存在", "data": None}
         update_sql = f"UPDATE user SET {', '.join([f'{k}=?' for k in kwargs])} WHERE user_id=?"
         cur.execute(update_sql, list(kwargs.values()) + [user_id])
+        if "skill_tags" in kwargs:
+            _sync_tags(cur, "user", user_id, kwargs["skill_tags"])
+        # Login bookkeeping (last_login, rehashes) is not shown by any list; keep it out of the log.
+        if set(kwargs) - {"last_login", "password_hash"}:
+            _log_change(cur, "user", user_id, user_id=user_id)
         conn.commit()
         return {"code": 200, "msg": "用户修改成功", "data": {"user_id": user_id, "update_fields": list(kwargs.keys())}}
-    except sqlite3.IntegrityError:
+    except INTEGRITY_ERRORS:
         conn.rollback()
         return {"code": 409, "msg": "用户名已存在（修改用户名冲突）", "data": None}
     except Exception as e:
@@ -417,7 +1501,7 @@ def user_update(user_id: int, **kwargs) -> Dict:
 
 
 def get_user(user_id: int) -> Dict:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute("SELECT * FROM user WHERE user_id = ?", (user_id,))
@@ -485,8 +1569,10 @@ def project_add(
                 company,
             ),
         )
+        project_id = cur.lastrowid
+        _log_change(cur, "project", project_id, project_id=project_id, user_id=publisher_id)
         conn.commit()
-        return {"code": 200, "msg": "项目新增成功", "data": {"project_id": cur.lastrowid, "project_name": project_name}}
+        return {"code": 200, "msg": "项目新增成功", "data": {"project_id": project_id, "project_name": project_name}}
     except Exception as e:
         conn.rollback()
         return {"code": 500, "msg": f"项目新增失败：{str(e)}", "data": None}
@@ -528,11 +1614,17 @@ def project_update(project_id: int, **kwargs) -> Dict:
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT project_id FROM project WHERE project_id = ?", (project_id,))
-        if not cur.fetchone():
+        cur.execute("SELECT publisher_id FROM project WHERE project_id = ?", (project_id,))
+        current = cur.fetchone()
+        if not current:
             return {"code": 404, "msg": "项目ID不存在", "data": None}
         update_sql = f"UPDATE project SET {', '.join([f'{k}=?' for k in kwargs])} WHERE project_id=?"
         cur.execute(update_sql, list(kwargs.values()) + [project_id])
+        publisher_id = kwargs.get("publisher_id", current["publisher_id"])
+        _log_change(cur, "project", project_id, project_id=project_id, user_id=publisher_id)
+        if publisher_id != current["publisher_id"]:
+            # The previous publisher's list sees the row leave as a tombstone.
+            _log_change(cur, "project", project_id, project_id=project_id, user_id=current["publisher_id"])
         conn.commit()
         return {"code": 200, "msg": "项目修改成功", "data": {"project_id": project_id, "update_fields": list(kwargs.keys())}}
     except Exception as e:
@@ -550,6 +1642,7 @@ def project_del(project_id: int) -> Dict:
         cur.execute("SELECT project_id FROM project WHERE project_id = ?", (project_id,))
         if not cur.fetchone():
             return {"code": 404, "msg": "项目ID不存在", "data": None}
+        _log_project_deletes(cur, "project_id = ?", (project_id,))
         cur.execute("DELETE FROM project WHERE project_id = ?", (project_id,))
         conn.commit()
         return {"code": 200, "msg": "项目删除成功", "data": {"project_id": project_id}}
@@ -562,7 +1655,7 @@ def project_del(project_id: int) -> Dict:
 
 
 def get_project(project_id: int) -> Dict:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute("SELECT * FROM project WHERE project_id = ?", (project_id,))
@@ -578,7 +1671,7 @@ def get_project(project_id: int) -> Dict:
 
 
 def list_projects_by_publisher(publisher_id: int, status: Optional[str] = None) -> List[dict]:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     if status:
         cur.execute(
@@ -593,29 +1686,177 @@ def list_projects_by_publisher(publisher_id: int, status: Optional[str] = None)
     return rows
 
 
-def list_public_projects(q: str = "") -> List[dict]:
-    conn = get_db_connection()
+APPLICATION_STATUSES = ("pending", "accepted", "rejected", "cancelled")
+
+
+def get_project_team(project_id: int) -> Optional[dict]:
+    """A project's roles with their accepted members and seat counts, from one query; None if no such project.
+
+    Members are accepted applications; `filled` follows role.join_num, like the project summary columns.
+    """
+    conn = get_read_connection()
     cur = conn.cursor()
-    if q:
+    try:
         cur.execute(
             """
-            SELECT project_id, project_name, description, project_status, publish_time, deadline, expected_market, work_mode, participant_count, company
-            FROM project
-            WHERE project_status != '草稿'
-              AND (project_name LIKE ? OR description LIKE ? OR company LIKE ?)
-            ORDER BY publish_time DESC
+            SELECT p.project_id, p.project_name, p.project_status, p.publisher_id, p.company,
+                   r.role_id, r.role_name, r.task_desc, r.role_status, r.limit_num, r.join_num,
+                   ra.application_id, ra.update_time AS joined_at,
+                   u.user_id, u.username, u.real_name, u.school_company
+            FROM project p
+            LEFT JOIN role r ON r.project_id = p.project_id AND r.role_status != '草稿'
+            LEFT JOIN role_application ra ON ra.role_id = r.role_id AND ra.status = 'accepted'
+            LEFT JOIN user u ON u.user_id = ra.student_id
+            WHERE p.project_id = ?
+            ORDER BY r.role_id, ra.update_time, ra.application_id
             """,
-            (f"%{q}%", f"%{q}%", f"%{q}%"),
+            (project_id,),
         )
-    else:
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+    if not rows:
+        return None
+
+    first = rows[0]
+    project = {k: first[k] for k in ("project_id", "project_name", "project_status", "publisher_id", "company")}
+    roles: Dict[int, dict] = {}
+    for r in rows:
+        if r["role_id"] is None:
+            continue
+        role = roles.get(r["role_id"])
+        if role is None:
+            role = roles[r["role_id"]] = {
+                "role_id": r["role_id"],
+                "role_name": r["role_name"],
+                "task_desc": r["task_desc"],
+                "role_status": r["role_status"],
+                "limit_num": r["limit_num"],
+                "filled": r["join_num"],
+                "available": max(r["limit_num"] - r["join_num"], 0),
+                "members": [],
+            }
+        if r["application_id"] is not None:
+            role["members"].append(
+                {
+                    "application_id": r["application_id"],
+                    "user_id": r["user_id"],
+                    "username": r["username"],
+                    "real_name": r["real_name"],
+                    "school_company": r["school_company"],
+                    "joined_at": r["joined_at"],
+                }
+            )
+    roles_list = list(roles.values())
+    project["stats"] = {
+        "total_roles": len(roles_list),
+        "total_positions": sum(role["limit_num"] for role in roles_list),
+        "filled_positions": sum(role["filled"] for role in roles_list),
+        "available_positions": sum(role["available"] for role in roles_list),
+        "total_members": sum(len(role["members"]) for role in roles_list),
+    }
+    return {"project": project, "roles": roles_list}
+
+
+def get_enterprise_summary(publisher_id: int) -> List[dict]:
+    """The enterprise's projects, each with its roles, application counts by status and latest feedback.
+
+    Built from four set-based queries (projects, roles, grouped application counts, latest feedback
+    per project) however many projects and roles the enterprise has.
+    """
+    conn = get_read_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT * FROM project WHERE publisher_id = ? ORDER BY publish_time DESC", (publisher_id,))
+        projects = [dict(r) for r in cur.fetchall()]
         cur.execute(
             """
-            SELECT project_id, project_name, description, project_status, publish_time, deadline, expected_market, work_mode, participant_count, company
-            FROM project
-            WHERE project_status != '草稿'
-            ORDER BY publish_time DESC
+            SELECT r.*
+            FROM role r
+            JOIN project p ON r.project_id = p.project_id
+            WHERE p.publisher_id = ?
+            ORDER BY r.role_id
+            """,
+            (publisher_id,),
+        )
+        roles = [dict(r) for r in cur.fetchall()]
+        cur.execute(
+            """
+            SELECT ra.role_id, ra.status, COUNT(*) AS n
+            FROM role_application ra
+            JOIN project p ON ra.project_id = p.project_id
+            WHERE p.publisher_id = ?
+            GROUP BY ra.role_id, ra.status
+            """,
+            (publisher_id,),
+        )
+        counts: Dict[int, Dict[str, int]] = {}
+        for r in cur.fetchall():
+            counts.setdefault(r["role_id"], {})[r["status"]] = r["n"]
+        cur.execute(
             """
+            SELECT f.feedback_id, f.project_id, f.role_id, r.role_name, f.user_id, f.content, f.evidence_url, f.status, f.created_at
+            FROM role_feedback f
+            LEFT JOIN role r ON f.role_id = r.role_id
+            WHERE f.feedback_id IN (
+                SELECT MAX(f2.feedback_id)
+                FROM role_feedback f2
+                JOIN project p ON f2.project_id = p.project_id
+                WHERE p.publisher_id = ?
+                GROUP BY f2.project_id
+            )
+            """,
+            (publisher_id,),
         )
+        latest_feedback = {r["project_id"]: dict(r) for r in cur.fetchall()}
+    finally:
+        cur.close()
+        conn.close()
+
+    roles_by_project: Dict[int, List[dict]] = {}
+    for role in roles:
+        role["applications"] = {status: counts.get(role["role_id"], {}).get(status, 0) for status in APPLICATION_STATUSES}
+        roles_by_project.setdefault(role["project_id"], []).append(role)
+    for project in projects:
+        project["roles"] = roles_by_project.get(project["project_id"], [])
+        project["applications"] = {
+            status: sum(role["applications"][status] for role in project["roles"]) for status in APPLICATION_STATUSES
+        }
+        project["latest_feedback"] = latest_feedback.get(project["project_id"])
+    return projects
+
+
+PROJECT_LIST_SORTS = {
+    "latest": "publish_time DESC",
+    # Projects with the most roles still recruiting first; full or closed projects last.
+    "open": "open_role_count DESC, publish_time DESC",
+    # Time-decayed detail views (server/popularity.py); idx_project_popularity serves this order.
+    "popular": "popularity DESC, publish_time DESC",
+}
+
+
+def list_public_projects(q: str = "", open_only: bool = False, sort: str = "latest") -> List[dict]:
+    """Published projects, each with its role summary columns; open_only keeps projects with an open seat."""
+    where = ["project_status != '草稿'"]
+    params: List[str] = []
+    if q:
+        where.append("(project_name LIKE ? OR description LIKE ? OR company LIKE ?)")
+        params += [f"%{q}%", f"%{q}%", f"%{q}%"]
+    if open_only:
+        where.append("open_role_count > 0 AND project_status != '已终止'")
+    conn = get_read_connection()
+    cur = conn.cursor()
+    cur.execute(
+        f"""
+        SELECT project_id, project_name, description, project_status, publish_time, deadline, expected_market, work_mode, participant_count, company,
+               {", ".join(PROJECT_SUMMARY_COLUMNS)}
+        FROM project
+        WHERE {" AND ".join(where)}
+        ORDER BY {PROJECT_LIST_SORTS.get(sort, PROJECT_LIST_SORTS["latest"])}
+        """,
+        params,
+    )
     rows = [dict(r) for r in cur.fetchall()]
     cur.close()
     conn.close()
@@ -650,8 +1891,12 @@ def role_add(
             """,
             (project_id, role_name, task_desc, skill_require, limit_num, join_num, role_status, task_deadline),
         )
+        role_id = cur.lastrowid
+        _sync_tags(cur, "role", role_id, skill_require)
+        _log_change(cur, "role", role_id, project_id=project_id, role_id=role_id)
+        _refresh_project_summaries(cur, [project_id])
         conn.commit()
-        return {"code": 200, "msg": "角色新增成功", "data": {"role_id": cur.lastrowid, "role_name": role_name}}
+        return {"code": 200, "msg": "角色新增成功", "data": {"role_id": role_id, "role_name": role_name}}
     except Exception as e:
         conn.rollback()
         return {"code": 500, "msg": f"角色新增失败：{str(e)}", "data": None}
@@ -660,6 +1905,135 @@ def role_add(
         conn.close()
 
 
+ROLE_CONFLICT_MODES = {"error", "skip", "update"}
+
+
+def role_add_many(
+    project_id: int,
+    roles: List[dict],
+    role_status: str = "招募中",
+    publisher_id: Optional[int] = None,
+    on_conflict: str = "error",
+) -> Dict:
+    if not roles:
+        return {"code": 400, "msg": "角色列表不能为空", "data": None}
+    if on_conflict not in ROLE_CONFLICT_MODES:
+        return {"code": 400, "msg": "on_conflict 仅支持：error/skip/update", "data": None}
+    rows = []
+    seen_names = set()
+    for index, item in enumerate(roles, start=1):
+        # 调用方（如 role_batch 的模型输出）未必校验过字段，逐项校验并指出第几个角色
+        if not isinstance(item, dict):
+            return {"code": 400, "msg": f"第 {index} 个角色：格式不合法", "data": None}
+        status = item.get("role_status") or role_status
+        try:
+            limit_num = int(item.get("limit_num", 1))
+            join_num = int(item.get("join_num", 0))
+        except (TypeError, ValueError):
+            return {"code": 400, "msg": f"第 {index} 个角色：人数必须为整数", "data": None}
+        if not item.get("role_name") or not item.get("task_desc"):
+            return {"code": 400, "msg": f"第 {index} 个角色：角色名称和任务描述不能为空", "data": None}
+        if status not in ROLE_STATUS:
+            return {"code": 400, "msg": f"第 {index} 个角色：角色状态不合法", "data": None}
+        if join_num > limit_num:
+            return {"code": 400, "msg": f"第 {index} 个角色：已有人数不能超过人数限制", "data": None}
+        if item["role_name"] in seen_names:
+            return {"code": 400, "msg": f"角色名称重复：{item['role_name']}", "data": None}
+        seen_names.add(item["role_name"])
+        rows.append(
+            (
+                project_id,
+                item["role_name"],
+                item["task_desc"],
+                item.get("skill_require", ""),
+                limit_num,
+                join_num,
+                status,
+                item.get("task_deadline"),
+            )
+        )
+
+    names = [row[1] for row in rows]
+    name_marks = ", ".join("?" * len(names))
+    columns = ("project_id", "role_name", "task_desc", "skill_require", "limit_num", "join_num", "role_status", "task_deadline")
+    if on_conflict == "skip":
+        insert_sql = DIALECT.insert("role", columns, conflict=("project_id", "role_name"))
+    elif on_conflict == "update":
+        # join_num is owned by review_application; never shrink limit_num below it.
+        update = {col: DIALECT.excluded(col) for col in ("task_desc", "skill_require", "role_status", "task_deadline")}
+        update["limit_num"] = DIALECT.greatest(DIALECT.excluded("limit_num"), "role.join_num")
+        insert_sql = DIALECT.insert("role", columns, conflict=("project_id", "role_name"), update=update)
+    else:
+        insert_sql = DIALECT.insert("role", columns)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        # Take the write lock up front so the existing-name snapshot matches what the upsert sees.
+        if DIALECT.begin_write:
+            cur.execute(DIALECT.begin_write)
+        cur.execute("SELECT publisher_id FROM project WHERE project_id = ?" + DIALECT.for_update, (project_id,))
+        project = cur.fetchone()
+        if not project:
+            conn.rollback()
+            return {"code": 404, "msg": "项目ID不存在", "data": None}
+        if publisher_id is not None and project["publisher_id"] != publisher_id:
+            conn.rollback()
+            return {"code": 403, "msg": "项目不存在或无权限", "data": None}
+
+        cur.execute(
+            f"SELECT role_name FROM role WHERE project_id = ? AND role_name IN ({name_marks})" + DIALECT.for_update,
+            [project_id, *names],
+        )
+        existing = {r["role_name"] for r in cur.fetchall()}
+        if existing and on_conflict == "error":
+            conn.rollback()
+            return {"code": 409, "msg": f"角色名称已存在：{'、'.join(sorted(existing))}", "data": None}
+
+        cur.executemany(insert_sql, rows)
+        cur.execute(
+            f"SELECT role_id, role_name FROM role WHERE project_id = ? AND role_name IN ({name_marks})",
+            [project_id, *names],
+        )
+        id_by_name = {r["role_name"]: r["role_id"] for r in cur.fetchall()}
+        skills_by_name = {row[1]: row[3] for row in rows}
+        for name, role_id in id_by_name.items():
+            if name not in existing or on_conflict == "update":
+                _sync_tags(cur, "role", role_id, skills_by_name[name])
+                _log_change(cur, "role", role_id, project_id=project_id, role_id=role_id)
+        _refresh_project_summaries(cur, [project_id])
+        conn.commit()
+
+        action_for_existing = "updated" if on_conflict == "update" else "skipped"
+        result = [
+            {
+                "role_id": id_by_name.get(name),
+                "role_name": name,
+                "action": action_for_existing if name in existing else "created",
+            }
+            for name in names
+        ]
+        return {
+            "code": 200,
+            "msg": "角色批量保存成功",
+            "data": {
+                "roles": result,
+                "created": sum(1 for r in result if r["action"] == "created"),
+                "updated": sum(1 for r in result if r["action"] == "updated"),
+                "skipped": sum(1 for r in result if r["action"] == "skipped"),
+            },
+        }
+    except INTEGRITY_ERRORS:
+        conn.rollback()
+        return {"code": 409, "msg": "角色名称重复", "data": None}
+    except Exception as e:
+        conn.rollback()
+        return {"code": 500, "msg": f"角色批量保存失败：{str(e)}", "data": None}
+    finally:
+        cur.close()
+        conn.close()
+
+
 def role_update(role_id: int, **kwargs) -> Dict:
     allow_fields = [
         "project_id",
@@ -695,11 +2069,19 @@ def role_update(role_id: int, **kwargs) -> Dict:
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT role_id FROM role WHERE role_id = ?", (role_id,))
-        if not cur.fetchone():
+        cur.execute("SELECT project_id FROM role WHERE role_id = ?", (role_id,))
+        current = cur.fetchone()
+        if not current:
             return {"code": 404, "msg": "角色ID不存在", "data": None}
         update_sql = f"UPDATE role SET {', '.join([f'{k}=?' for k in kwargs])} WHERE role_id=?"
         cur.execute(update_sql, list(kwargs.values()) + [role_id])
+        if "skill_require" in kwargs:
+            _sync_tags(cur, "role", role_id, kwargs["skill_require"])
+        project_id = kwargs.get("project_id", current["project_id"])
+        _log_change(cur, "role", role_id, project_id=project_id, role_id=role_id)
+        if project_id != current["project_id"]:
+            _log_change(cur, "role", role_id, project_id=current["project_id"], role_id=role_id)
+        _refresh_project_summaries(cur, [project_id, current["project_id"]])
         conn.commit()
         return {"code": 200, "msg": "角色修改成功", "data": {"role_id": role_id, "update_fields": list(kwargs.keys())}}
     except Exception as e:
@@ -714,10 +2096,20 @@ def role_del(role_id: int) -> Dict:
     conn = get_db_connection()
     cur = conn.cursor()
     try:
-        cur.execute("SELECT role_id FROM role WHERE role_id = ?", (role_id,))
-        if not cur.fetchone():
+        cur.execute("SELECT project_id FROM role WHERE role_id = ?", (role_id,))
+        current = cur.fetchone()
+        if not current:
             return {"code": 404, "msg": "角色ID不存在", "data": None}
+        _log_deletes(
+            cur,
+            "application",
+            "SELECT application_id AS id, project_id, role_id, student_id AS user_id FROM role_application WHERE role_id = ?",
+            (role_id,),
+        )
+        _log_deletes(cur, "feedback", "SELECT feedback_id AS id, project_id, role_id, user_id FROM role_feedback WHERE role_id = ?", (role_id,))
+        _log_deletes(cur, "role", "SELECT role_id AS id, project_id, role_id, NULL AS user_id FROM role WHERE role_id = ?", (role_id,))
         cur.execute("DELETE FROM role WHERE role_id = ?", (role_id,))
+        _refresh_project_summaries(cur, [current["project_id"]])
         conn.commit()
         return {"code": 200, "msg": "角色删除成功", "data": {"role_id": role_id}}
     except Exception as e:
@@ -729,7 +2121,7 @@ def role_del(role_id: int) -> Dict:
 
 
 def get_role(role_id: int) -> Dict:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute("SELECT * FROM role WHERE role_id = ?", (role_id,))
@@ -744,10 +2136,12 @@ def get_role(role_id: int) -> Dict:
         conn.close()
 
 
-def list_roles_by_project(project_id: int) -> List[dict]:
-    conn = get_db_connection()
+def list_roles_by_project(project_id: int, include_drafts: bool = False) -> List[dict]:
+    """A project's roles; 草稿 drafts (unpublished batch suggestions) only for the publisher's views."""
+    conn = get_read_connection()
     cur = conn.cursor()
-    cur.execute("SELECT * FROM role WHERE project_id = ? ORDER BY role_id", (project_id,))
+    draft_filter = "" if include_drafts else " AND role_status != '草稿'"
+    cur.execute(f"SELECT * FROM role WHERE project_id = ?{draft_filter} ORDER BY role_id", (project_id,))
     rows = [dict(r) for r in cur.fetchall()]
     cur.close()
     conn.close()
@@ -790,6 +2184,175 @@ def get_user_by_token(token: str) -> Optional[dict]:
     return dict(row) if row else None
 
 
+def save_stream_ticket(ticket: str, user_id: int, ttl_seconds: float) -> None:
+    now = datetime.now()
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        # 顺带清理过期票据，表中只保留最近签发且未使用的少量记录
+        cur.execute("DELETE FROM stream_tickets WHERE expires_at < ?", (now.strftime("%Y-%m-%d %H:%M:%S"),))
+        cur.execute(
+            "INSERT INTO stream_tickets (ticket, user_id, expires_at) VALUES (?, ?, ?)",
+            (ticket, user_id, (now + timedelta(seconds=ttl_seconds)).strftime("%Y-%m-%d %H:%M:%S")),
+        )
+        conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+
+
+def redeem_stream_ticket(ticket: str) -> Optional[dict]:
+    """Consume a stream ticket: return its user if it exists and has not expired, and delete it either way."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            """
+            SELECT u.user_id, u.username, u.user_type, u.real_name, u.school_company, t.expires_at
+            FROM stream_tickets t
+            JOIN user u ON t.user_id = u.user_id
+            WHERE t.ticket = ?
+            """,
+            (ticket,),
+        )
+        row = cur.fetchone()
+        cur.execute("DELETE FROM stream_tickets WHERE ticket = ?", (ticket,))
+        conn.commit()
+        # 并发兑换同一票据时只有删除成功的一方有效
+        if not row or cur.rowcount != 1 or str(row["expires_at"]) < datetime.now().strftime("%Y-%m-%d %H:%M:%S"):
+            return None
+        user = dict(row)
+        user.pop("expires_at")
+        return user
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _record_event(cur: sqlite3.Cursor, event_type: str, data: dict, user_id: Optional[int], publisher_id: Optional[int]) -> dict:
+    """Append to event_log inside the caller's transaction; publish the result only after commit."""
+    DIALECT.lock_sequence(cur, "event_log")
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cur.execute(
+        """
+        INSERT INTO event_log (event_type, user_id, publisher_id, payload, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (event_type, user_id, publisher_id, json.dumps(data, ensure_ascii=False), created_at),
+    )
+    return {
+        "seq": cur.lastrowid,
+        "event": event_type,
+        "user_id": user_id,
+        "publisher_id": publisher_id,
+        "data": data,
+        "created_at": created_at,
+    }
+
+
+def _record_review_event(cur: sqlite3.Cursor, app_row: sqlite3.Row, enterprise_id: int, status: str) -> dict:
+    return _record_event(
+        cur,
+        f"application.{status}",
+        {
+            "application_id": app_row["application_id"],
+            "role_id": app_row["role_id"],
+            "project_id": app_row["project_id"],
+            "status": status,
+        },
+        user_id=app_row["student_id"],
+        publisher_id=enterprise_id,
+    )
+
+
+def _log_review_change(cur: sqlite3.Cursor, app_row: sqlite3.Row) -> None:
+    _log_change(
+        cur,
+        "application",
+        app_row["application_id"],
+        project_id=app_row["project_id"],
+        role_id=app_row["role_id"],
+        user_id=app_row["student_id"],
+    )
+
+
+def _publish_events(events: List[dict]) -> None:
+    for event in events:
+        for listener in EVENT_LISTENERS:
+            try:
+                listener(event)
+            except Exception:
+                logging.exception("event listener failed")
+
+
+def list_events_since(after_seq: int, user_id: Optional[int] = None, limit: int = 500) -> List[dict]:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if user_id is None:
+            cur.execute(
+                """
+                SELECT seq, event_type, user_id, publisher_id, payload, created_at
+                FROM event_log
+                WHERE seq > ?
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (after_seq, limit),
+            )
+        else:
+            # Two indexed range scans instead of an OR that would fall back to a full scan.
+            cur.execute(
+                """
+                SELECT seq, event_type, user_id, publisher_id, payload, created_at
+                FROM event_log WHERE user_id = ? AND seq > ?
+                UNION
+                SELECT seq, event_type, user_id, publisher_id, payload, created_at
+                FROM event_log WHERE publisher_id = ? AND seq > ?
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (user_id, after_seq, user_id, after_seq, limit),
+            )
+        return [
+            {
+                "seq": r["seq"],
+                "event": r["event_type"],
+                "user_id": r["user_id"],
+                "publisher_id": r["publisher_id"],
+                "data": json.loads(r["payload"]),
+                "created_at": r["created_at"],
+            }
+            for r in cur.fetchall()
+        ]
+    finally:
+        cur.close()
+        conn.close()
+
+
+def latest_event_seq() -> int:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(seq), 0) FROM event_log")
+        return int(cur.fetchone()[0])
+    finally:
+        cur.close()
+        conn.close()
+
+
+def prune_events(before: str) -> int:
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM event_log WHERE created_at < ?", (before,))
+        conn.commit()
+        return cur.rowcount
+    finally:
+        cur.close()
+        conn.close()
+
+
 def apply_for_role(role_id: int, student_id: int, motivation: str) -> Dict:
     conn = get_db_connection()
     cur = conn.cursor()
@@ -797,7 +2360,7 @@ def apply_for_role(role_id: int, student_id: int, motivation: str) -> Dict:
         cur.execute(
             """
             SELECT r.role_id, r.project_id, r.role_status, r.limit_num, r.join_num,
-                   p.project_status
+                   p.project_status, p.publisher_id
             FROM role r
             JOIN project p ON r.project_id = p.project_id
             WHERE r.role_id = ?
@@ -853,7 +2416,17 @@ def apply_for_role(role_id: int, student_id: int, motivation: str) -> Dict:
                 (role_id, role["project_id"], student_id, motivation, now, now),
             )
             application_id = cur.lastrowid
+        _log_change(cur, "application", application_id, project_id=role["project_id"], role_id=role_id, user_id=student_id)
+        _refresh_project_summaries(cur, [role["project_id"]])
+        event = _record_event(
+            cur,
+            "application.created",
+            {"application_id": application_id, "role_id": role_id, "project_id": role["project_id"], "status": "pending"},
+            user_id=student_id,
+            publisher_id=role["publisher_id"],
+        )
         conn.commit()
+        _publish_events([event])
         return {"code": 200, "msg": "申请成功", "data": {"application_id": application_id}}
     except Exception as e:
         conn.rollback()
@@ -864,7 +2437,7 @@ def apply_for_role(role_id: int, student_id: int, motivation: str) -> Dict:
 
 
 def list_student_applications(student_id: int) -> List[dict]:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     cur.execute(
         """
@@ -888,26 +2461,57 @@ def list_student_applications(student_id: int) -> List[dict]:
 def cancel_application(application_id: int, student_id: int) -> Dict:
     conn = get_db_connection()
     cur = conn.cursor()
-    cur.execute(
-        """
+    update_sql = """
         UPDATE role_application
         SET status = 'cancelled', update_time = ?
         WHERE application_id = ? AND student_id = ? AND status = 'pending'
-        """,
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), application_id, student_id),
-    )
-    if cur.rowcount == 0:
+    """
+    params = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), application_id, student_id)
+    if DIALECT.supports_returning:
+        cur.execute(update_sql + " RETURNING role_id, project_id", params)
+        cancelled = cur.fetchone()
+    else:
+        # Lock the row first so the ids read belong to the row the UPDATE changes.
+        cur.execute(
+            "SELECT role_id, project_id FROM role_application"
+            " WHERE application_id = ? AND student_id = ? AND status = 'pending'" + DIALECT.for_update,
+            (application_id, student_id),
+        )
+        cancelled = cur.fetchone()
+        if cancelled:
+            cur.execute(update_sql, params)
+    if not cancelled:
         cur.close()
+        conn.rollback()
         conn.close()
         return {"code": 400, "msg": "撤回失败：记录不存在或状态不可撤回", "data": None}
+    _log_change(
+        cur, "application", application_id, project_id=cancelled["project_id"], role_id=cancelled["role_id"], user_id=student_id
+    )
+    _refresh_project_summaries(cur, [cancelled["project_id"]])
+    cur.execute("SELECT publisher_id FROM project WHERE project_id = ?", (cancelled["project_id"],))
+    project = cur.fetchone()
+    event = _record_event(
+        cur,
+        "application.cancelled",
+        {
+            "application_id": application_id,
+            "role_id": cancelled["role_id"],
+            "project_id": cancelled["project_id"],
+            "status": "cancelled",
+        },
+        user_id=student_id,
+        publisher_id=project["publisher_id"] if project else None,
+    )
     conn.commit()
+    _publish_events([event])
     cur.close()
     conn.close()
     return {"code": 200, "msg": "已撤回", "data": {"application_id": application_id}}
 
 
 def list_role_applications(role_id: int, enterprise_id: int) -> Dict:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     cur.execute(
         """
@@ -969,7 +2573,11 @@ def review_application(application_id: int, enterprise_id: int, decision: str) -
                 "UPDATE role_application SET status = 'rejected', update_time = ? WHERE application_id = ?",
                 (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), application_id),
             )
+            _log_review_change(cur, app_row)
+            _refresh_project_summaries(cur, [app_row["project_id"]])
+            event = _record_review_event(cur, app_row, enterprise_id, "rejected")
             conn.commit()
+            _publish_events([event])
             return {"code": 200, "msg": "已拒绝", "data": {"application_id": application_id}}
 
         if app_row["project_status"] in ("草稿", "已终止"):
@@ -999,7 +2607,12 @@ def review_application(application_id: int, enterprise_id: int, decision: str) -
         role_counts = cur.fetchone()
         if role_counts and role_counts["join_num"] >= role_counts["limit_num"]:
             cur.execute("UPDATE role SET role_status = '已完成' WHERE role_id = ?", (app_row["role_id"],))
+        _log_review_change(cur, app_row)
+        _log_change(cur, "role", app_row["role_id"], project_id=app_row["project_id"], role_id=app_row["role_id"])
+        _refresh_project_summaries(cur, [app_row["project_id"]])
+        event = _record_review_event(cur, app_row, enterprise_id, "accepted")
         conn.commit()
+        _publish_events([event])
         return {"code": 200, "msg": "已录取", "data": {"application_id": application_id}}
     except Exception as e:
         conn.rollback()
@@ -1031,8 +2644,10 @@ def add_role_feedback(role_id: int, user_id: int, content: str, evidence_url: st
             """,
             (project_id, role_id, user_id, content, evidence_url),
         )
+        feedback_id = cur.lastrowid
+        _log_change(cur, "feedback", feedback_id, project_id=project_id, role_id=role_id, user_id=user_id)
         conn.commit()
-        return {"code": 200, "msg": "successfully submitted", "data": {"feedback_id": cur.lastrowid}}
+        return {"code": 200, "msg": "successfully submitted", "data": {"feedback_id": feedback_id}}
     except Exception as e:
         conn.rollback()
         return {"code": 500, "msg": f"提交反馈失败：{str(e)}", "data": None}
@@ -1042,7 +2657,7 @@ def add_role_feedback(role_id: int, user_id: int, content: str, evidence_url: st
 
 
 def list_feedbacks_by_project(project_id: int, status: Optional[str] = None) -> List[dict]:
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         if status:
@@ -1099,7 +2714,7 @@ def update_feedback_status(feedback_id: int, status: str, operator_user_id: int)
     try:
         cur.execute(
             """
-            SELECT f.feedback_id, f.project_id, p.publisher_id
+            SELECT f.feedback_id, f.project_id, f.role_id, f.user_id, f.status, p.publisher_id
             FROM role_feedback f
             JOIN project p ON f.project_id = p.project_id
             WHERE f.feedback_id = ?
@@ -1116,7 +2731,26 @@ def update_feedback_status(feedback_id: int, status: str, operator_user_id: int)
             "UPDATE role_feedback SET status = ? WHERE feedback_id = ?",
             (status, feedback_id),
         )
+        events = []
+        if status != row["status"]:
+            _log_change(cur, "feedback", feedback_id, project_id=row["project_id"], role_id=row["role_id"], user_id=row["user_id"])
+            events.append(
+                _record_event(
+                    cur,
+                    "feedback.status_changed",
+                    {
+                        "feedback_id": feedback_id,
+                        "role_id": row["role_id"],
+                        "project_id": row["project_id"],
+                        "previous_status": row["status"],
+                        "status": status,
+                    },
+                    user_id=row["user_id"],
+                    publisher_id=row["publisher_id"],
+                )
+            )
         conn.commit()
+        _publish_events(events)
         return {"code": 200, "msg": "updated", "data": {"feedback_id": feedback_id, "status": status}}
     except Exception as e:
         conn.rollback()
@@ -1128,7 +2762,7 @@ def update_feedback_status(feedback_id: int, status: str, operator_user_id: int)
 
 def get_admin_dashboard_data(limit: int = 8) -> Dict:
     safe_limit = max(1, min(20, int(limit or 8)))
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         stats = {}
@@ -1207,7 +2841,7 @@ def get_admin_dashboard_data(limit: int = 8) -> Dict:
 
 def list_all_users(limit: int = 100) -> Dict:
     safe_limit = max(1, min(500, int(limit or 100)))
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute(
@@ -1242,6 +2876,7 @@ def admin_set_user_status(target_user_id: int, status: int, operator_user_id: in
             return {"code": 400, "msg": "不能禁用当前管理员账号", "data": None}
 
         cur.execute("UPDATE user SET status = ? WHERE user_id = ?", (status, target_user_id))
+        _log_change(cur, "user", target_user_id, user_id=target_user_id)
         conn.commit()
         return {
             "code": 200,
@@ -1258,7 +2893,7 @@ def admin_set_user_status(target_user_id: int, status: int, operator_user_id: in
 
 def list_all_projects(limit: int = 100) -> Dict:
     safe_limit = max(1, min(500, int(limit or 100)))
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute(
@@ -1289,7 +2924,7 @@ def list_all_projects(limit: int = 100) -> Dict:
 
 def list_all_applications(limit: int = 100) -> Dict:
     safe_limit = max(1, min(500, int(limit or 100)))
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute(
@@ -1327,7 +2962,7 @@ def list_all_applications(limit: int = 100) -> Dict:
 
 def list_all_feedbacks(limit: int = 100) -> Dict:
     safe_limit = max(1, min(500, int(limit or 100)))
-    conn = get_db_connection()
+    conn = get_read_connection()
     cur = conn.cursor()
     try:
         cur.execute(
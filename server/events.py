@@ -0,0 +1,397 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl
+
+from flask import Blueprint, Response, request
+
+try:
+    from .auth import _get_bearer_token, login_required
+    from .db import (
+        EVENT_LISTENERS,
+        get_user_by_token,
+        latest_event_seq,
+        list_events_since,
+        prune_events,
+        redeem_stream_ticket,
+        save_stream_ticket,
+    )
+    from .lifecycle import register_after_fork
+    from .responses import fail, ok
+except ImportError:
+    from auth import _get_bearer_token, login_required
+    from db import (
+        EVENT_LISTENERS,
+        get_user_by_token,
+        latest_event_seq,
+        list_events_since,
+        prune_events,
+        redeem_stream_ticket,
+        save_stream_ticket,
+    )
+    from lifecycle import register_after_fork
+    from responses import fail, ok
+
+
+# How often each worker tails event_log for events committed by other workers.
+EVENT_POLL_INTERVAL = float(os.environ.get("EVENT_POLL_INTERVAL", "0.5").strip() or "0.5")
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get("EVENT_HEARTBEAT_SECONDS", "15").strip() or "15")
+# Streams end after this long; EventSource reconnects with Last-Event-ID and loses nothing.
+EVENT_STREAM_MAX_SECONDS = float(os.environ.get("EVENT_STREAM_MAX_SECONDS", "300").strip() or "300")
+EVENT_RETENTION_HOURS = float(os.environ.get("EVENT_RETENTION_HOURS", "72").strip() or "72")
+# A WSGI stream holds a worker thread until it ends; past this many per worker new streams get 503
+# so ordinary requests keep free threads. The ASGI stream holds no thread and is not capped.
+EVENT_MAX_STREAMS = int(os.environ.get("EVENT_MAX_STREAMS", "4").strip() or "4")
+# Lifetime of the one-time ticket that EventSource passes as ?ticket= instead of the auth token.
+EVENT_TICKET_SECONDS = float(os.environ.get("EVENT_TICKET_SECONDS", "30").strip() or "30")
+EVENT_QUEUE_SIZE = 256
+REPLAY_BATCH = 500
+STREAM_RETRY_AFTER = 10
+STREAM_PATH = "/api/events/stream"
+TICKET_PATH = "/api/events/ticket"
+
+logger = logging.getLogger("server.events")
+events_bp = Blueprint("events", __name__)
+_OVERFLOW = object()
+
+
+class EventHub:
+    """In-process pub/sub keyed by recipient user id, fed only by an event_log tail.
+
+    Every event, this worker's included, reaches subscribers through the tail in log order, so a
+    stream's high-water mark (the seq it last sent) never skips an event another worker committed
+    just before one of ours. A local commit only wakes the tail instead of waiting for the next poll.
+    """
+
+    def __init__(self, poll_interval: float = EVENT_POLL_INTERVAL):
+        self.poll_interval = max(0.05, poll_interval)
+        self._subs: Dict[int, Dict[int, Callable[[dict], None]]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._last_seq: Optional[int] = None
+        self._wake = threading.Event()
+        self._pid: Optional[int] = None
+        self._last_prune = 0.0
+
+    def subscribe(self, user_id: int, deliver: Callable[[dict], None]) -> int:
+        self._ensure_poller()
+        with self._lock:
+            if self._last_seq is None:
+                self._last_seq = latest_event_seq()
+            self._next_id += 1
+            self._subs.setdefault(user_id, {})[self._next_id] = deliver
+            return self._next_id
+
+    def unsubscribe(self, user_id: int, sub_id: int) -> None:
+        with self._lock:
+            subs = self._subs.get(user_id)
+            if subs is not None:
+                subs.pop(sub_id, None)
+                if not subs:
+                    del self._subs[user_id]
+            if not self._subs:
+                # Idle: the next subscriber starts tailing from the then-current end of the log.
+                self._last_seq = None
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    def publish_local(self, event: dict) -> None:
+        # Delivered by the tail, after any earlier seq committed by another worker.
+        self._wake.set()
+
+    def _dispatch(self, event: dict) -> None:
+        recipients = {event.get("user_id"), event.get("publisher_id")} - {None}
+        with self._lock:
+            targets = [d for uid in recipients for d in self._subs.get(uid, {}).values()]
+        for deliver in targets:
+            try:
+                deliver(event)
+            except Exception:
+                logger.exception("event delivery failed")
+
+    def reset_after_fork(self) -> None:
+        # Subscribers and the tail thread belong to the parent; the next subscribe starts this worker's own.
+        self._lock = threading.Lock()
+        self._subs.clear()
+        self._last_seq = None
+        self._wake = threading.Event()
+        self._pid = None
+
+    def _ensure_poller(self) -> None:
+        # Threads do not survive fork, so each worker starts its own tail on first subscribe.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._subs.clear()
+            self._last_seq = None
+        threading.Thread(target=self._run, name="event-tail", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("event log tail failed")
+
+    def poll_once(self) -> int:
+        with self._lock:
+            after = self._last_seq
+        if after is None:
+            return 0
+        delivered = 0
+        while True:
+            events = list_events_since(after, limit=1000)
+            for event in events:
+                with self._lock:
+                    if self._last_seq is not None:
+                        self._last_seq = max(self._last_seq, event["seq"])
+                self._dispatch(event)
+                delivered += 1
+            if len(events) < 1000:
+                break
+            after = events[-1]["seq"]
+        if time.time() - self._last_prune > 3600:
+            self._last_prune = time.time()
+            cutoff = (datetime.now() - timedelta(hours=EVENT_RETENTION_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+            prune_events(cutoff)
+        return delivered
+
+
+HUB = EventHub()
+register_after_fork(HUB.reset_after_fork)
+if HUB.publish_local not in EVENT_LISTENERS:
+    EVENT_LISTENERS.append(HUB.publish_local)
+
+
+# ===== SSE helpers shared by the WSGI and ASGI streams =====
+
+
+def format_sse(event: dict) -> str:
+    data = {"seq": event["seq"], "data": event["data"], "created_at": event["created_at"]}
+    return f"id: {event['seq']}\nevent: {event['event']}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(0, int((value or "").strip()))
+    except ValueError:
+        return None
+
+
+def replay_events(user_id: int, after_seq: int) -> Iterator[dict]:
+    while True:
+        batch = list_events_since(after_seq, user_id=user_id, limit=REPLAY_BATCH)
+        yield from batch
+        if len(batch) < REPLAY_BATCH:
+            return
+        after_seq = batch[-1]["seq"]
+
+
+class StreamSlots:
+    """Counts this worker's open WSGI streams against EVENT_MAX_STREAMS."""
+
+    def __init__(self, limit: int = EVENT_MAX_STREAMS):
+        self.limit = limit
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def acquire(self) -> Optional[Callable[[], None]]:
+        """Take a slot and return its release function, or None when the worker is full."""
+        with self._lock:
+            if self._active >= self.limit:
+                return None
+            self._active += 1
+        released = []
+
+        def release() -> None:
+            with self._lock:
+                if not released:
+                    released.append(True)
+                    self._active -= 1
+
+        return release
+
+
+STREAM_SLOTS = StreamSlots()
+
+
+def _stream_user(bearer: Optional[str], ticket: Optional[str]) -> Optional[dict]:
+    # EventSource cannot set headers, so browsers pass a one-time ticket; the auth token never goes in the URL.
+    if bearer:
+        return get_user_by_token(bearer)
+    return redeem_stream_ticket(ticket) if ticket else None
+
+
+def _stream_unavailable(message: str):
+    resp, status = fail(message, 503)
+    resp.headers["Retry-After"] = str(STREAM_RETRY_AFTER)
+    return resp, status
+
+
+def _wsgi_stream(user_id: int, last_seq: Optional[int]) -> Iterator[str]:
+    inbox: "queue.Queue" = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
+
+    def deliver(event: dict) -> None:
+        try:
+            inbox.put_nowait(event)
+        except queue.Full:
+            # A stalled reader is cut off; it resumes from Last-Event-ID on reconnect.
+            with inbox.mutex:
+                inbox.queue.clear()
+            inbox.put_nowait(_OVERFLOW)
+
+    sub_id = HUB.subscribe(user_id, deliver)
+    try:
+        yield "retry: 3000\n: connected\n\n"
+        sent = last_seq or 0
+        if last_seq is not None:
+            for event in replay_events(user_id, last_seq):
+                yield format_sse(event)
+                sent = event["seq"]
+        deadline = time.monotonic() + EVENT_STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            try:
+                event = inbox.get(timeout=min(EVENT_HEARTBEAT_SECONDS, max(0.1, deadline - time.monotonic())))
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            if event is _OVERFLOW:
+                return
+            if event["seq"] <= sent:
+                continue
+            yield format_sse(event)
+            sent = event["seq"]
+    finally:
+        HUB.unsubscribe(user_id, sub_id)
+
+
+@events_bp.route(TICKET_PATH, methods=["POST"])
+@login_required
+def issue_stream_ticket():
+    ticket = secrets.token_urlsafe(32)
+    save_stream_ticket(ticket, request.current_user["user_id"], EVENT_TICKET_SECONDS)
+    return ok(ticket=ticket, expires_in=EVENT_TICKET_SECONDS)
+
+
+@events_bp.route(STREAM_PATH, methods=["GET"])
+def event_stream():
+    # A single-threaded worker (gunicorn sync) would be tied up by one stream for minutes.
+    if not request.environ.get("wsgi.multithread"):
+        return _stream_unavailable("当前部署不支持实时推送，请使用 ASGI 模式或多线程 worker")
+    user = _stream_user(_get_bearer_token(), (request.args.get("ticket") or "").strip())
+    if not user:
+        return fail("未登录：缺少有效 token 或 ticket", 401)
+    release = STREAM_SLOTS.acquire()
+    if release is None:
+        return _stream_unavailable("实时推送连接数已满，请稍后重试")
+    last_seq = parse_last_event_id(request.headers.get("Last-Event-ID") or request.args.get("last_event_id"))
+    resp = Response(
+        _wsgi_stream(user["user_id"], last_seq),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # close() runs even when the server drops the response before iterating it.
+    resp.call_on_close(release)
+    return resp
+
+
+# ===== Native ASGI stream (no thread held per connection) =====
+
+
+async def asgi_event_stream(scope, receive, send, executor) -> None:
+    loop = asyncio.get_running_loop()
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+    args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    auth = headers.get("authorization", "")
+    bearer = auth.split(" ", 1)[1].strip() if auth.lower().startswith("bearer ") else None
+    user = await loop.run_in_executor(executor, _stream_user, bearer, args.get("ticket", "").strip())
+    cors = [(b"access-control-allow-origin", b"*")]
+    if not user:
+        body = json.dumps({"success": False, "message": "未登录：缺少有效 token 或 ticket"}, ensure_ascii=False).encode("utf-8")
+        await send({"type": "http.response.start", "status": 401, "headers": [(b"content-type", b"application/json")] + cors})
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    user_id = user["user_id"]
+    last_seq = parse_last_event_id(headers.get("last-event-id") or args.get("last_event_id"))
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    def deliver(event: dict) -> None:
+        loop.call_soon_threadsafe(inbox.put_nowait, event)
+
+    sub_id = await loop.run_in_executor(executor, HUB.subscribe, user_id, deliver)
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ]
+                + cors,
+            }
+        )
+        await _send_text(send, "retry: 3000\n: connected\n\n")
+        sent = last_seq or 0
+        if last_seq is not None:
+            replayed: List[dict] = await loop.run_in_executor(executor, lambda: list(replay_events(user_id, last_seq)))
+            for event in replayed:
+                await _send_text(send, format_sse(event))
+                sent = event["seq"]
+        deadline = loop.time() + EVENT_STREAM_MAX_SECONDS
+        while loop.time() < deadline and not disconnected.done():
+            getter = asyncio.ensure_future(inbox.get())
+            done, _ = await asyncio.wait(
+                {getter, disconnected},
+                timeout=min(EVENT_HEARTBEAT_SECONDS, max(0.1, deadline - loop.time())),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if getter not in done:
+                getter.cancel()
+                if not disconnected.done():
+                    await _send_text(send, ": ping\n\n")
+                continue
+            event = getter.result()
+            if inbox.qsize() > EVENT_QUEUE_SIZE:
+                # Same policy as the WSGI stream: end it and let the client resume from Last-Event-ID.
+                break
+            if event["seq"] > sent:
+                await _send_text(send, format_sse(event))
+                sent = event["seq"]
+        if not disconnected.done():
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+    except OSError:
+        pass
+    finally:
+        disconnected.cancel()
+        HUB.unsubscribe(user_id, sub_id)
+
+
+async def _wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _send_text(send, text: str) -> None:
+    await send({"type": "http.response.body", "body": text.encode("utf-8"), "more_body": True})
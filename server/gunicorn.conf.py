@@ -0,0 +1,75 @@
+import os
+import sys
+
+# gunicorn -c server/gunicorn.conf.py [-w 4 --threads 8 -b 127.0.0.1:5000]
+#
+# With preload_app the master imports wsgi.py (create_app: imports, route tables, migrations, admin
+# check), runs the pre-fork preparation once and forks every worker from it, so a new or restarted
+# worker is ready as soon as the fork returns and shares the master's pages copy-on-write.
+# GUNICORN_PRELOAD=0 goes back to every worker building its own app.
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+if SERVER_DIR not in sys.path:
+    # Hooks import server modules the way wsgi.py does (flat, from server/).
+    sys.path.insert(0, SERVER_DIR)
+
+chdir = SERVER_DIR
+wsgi_app = "wsgi:app"
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1").strip().lower() in ("1", "true", "yes", "on")
+
+if preload_app:
+    from lifecycle import begin_master
+
+    # The config is read before the app is loaded, so this covers create_app as well.
+    begin_master()
+
+
+def on_starting(server):
+    # Metric snapshots and slow queries left by a previous run (METRICS_MULTIPROC_DIR) must not leak into this one.
+    from metrics import clear_multiproc_dir
+    from slow_queries import clear_slow_queries
+
+    clear_multiproc_dir()
+    clear_slow_queries()
+
+
+def when_ready(server):
+    # Runs in the master after the preload and before the first fork.
+    if server.cfg.preload_app:
+        from app_factory import prepare_for_fork
+
+        prepare_for_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    # Without preload the worker has inherited nothing and builds everything itself.
+    if server.cfg.preload_app:
+        from lifecycle import run_after_fork
+
+        run_after_fork()
+
+
+def post_worker_init(worker):
+    # With preload the caches were warmed in the master before the fork; otherwise each worker warms its own.
+    if not worker.cfg.preload_app:
+        from app_factory import warm_app_caches
+        from metrics import flush_snapshot
+
+        warm_app_caches(worker.wsgi)
+        flush_snapshot()
+
+
+def worker_exit(server, worker):
+    # Views buffered since the last flush (server/popularity.py) would otherwise leave with the worker.
+    from popularity import flush_views
+
+    flush_views(final=True)
+
+
+def child_exit(server, worker):
+    # In the master: fold the dead worker's metric snapshot and slow queries into archives so its files do not linger.
+    from metrics import mark_process_dead
+    from slow_queries import mark_process_dead as archive_slow_queries
+
+    mark_process_dead(worker.pid)
+    archive_slow_queries(worker.pid)
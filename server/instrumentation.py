@@ -0,0 +1,251 @@
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Callable, List, Optional
+
+
+REQUEST_TIMING_ENABLED = os.environ.get("REQUEST_TIMING", "").strip().lower() in ("1", "true", "yes", "on")
+
+timing_logger = logging.getLogger("server.timing")
+
+# Callables invoked with a QueryEvent after every statement on an instrumented connection. Connections
+# are only instrumented while one is registered (or REQUEST_TIMING is on); both registrants default off.
+QUERY_LISTENERS: List[Callable] = []
+
+
+class QueryEvent:
+    __slots__ = ("sql", "params", "elapsed", "rows", "many", "conn")
+
+    def __init__(self, sql: str, params, elapsed: float, rows: int, many: bool, conn):
+        self.sql = sql
+        self.params = params
+        self.elapsed = elapsed
+        self.rows = rows
+        self.many = many
+        self.conn = conn
+
+
+class RequestStats:
+    __slots__ = ("started", "sql_count", "sql_time", "json_time")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.json_time = 0.0
+
+
+_current_stats: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+def _emit(sql: str, params, elapsed: float, rows: int, many: bool, conn) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.sql_count += 1
+        stats.sql_time += elapsed
+    if QUERY_LISTENERS:
+        event = QueryEvent(sql, params, elapsed, rows, many, conn)
+        for listener in QUERY_LISTENERS:
+            try:
+                listener(event)
+            except Exception:
+                logging.exception("query listener failed")
+
+
+def record_query(sql: str, params, elapsed: float, rows: int, many: bool, conn) -> None:
+    # For drivers other than sqlite3 (server/backends.py), which time their own statements.
+    if REQUEST_TIMING_ENABLED or QUERY_LISTENERS:
+        _emit(sql, params, elapsed, rows, many, conn)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    # SQLite steps lazily, so a statement is accounted for only once its rows are consumed
+    # (next execute, close, or connection close); fetch time is added to execute time.
+    _pending = None
+
+    def _finish(self) -> None:
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        sql, params, elapsed, rows, many = pending
+        if self.description is None:
+            rows = max(self.rowcount, 0)
+        _emit(sql, params, elapsed, rows, many, self.connection)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._pending = [sql, parameters, time.perf_counter() - started, 0, False]
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        params = list(seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, params)
+        finally:
+            self._pending = [sql, params, time.perf_counter() - started, 0, True]
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        pending = self._pending
+        if pending is not None:
+            pending[2] += time.perf_counter() - started
+            if isinstance(result, list):
+                pending[3] += len(result)
+            elif result is not None:
+                pending[3] += 1
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            return self._timed_fetch(super().fetchmany)
+        return self._timed_fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Strong refs: cursors from conn.execute() are often dropped unread and still need accounting.
+        self._cursors = []
+
+    def cursor(self, factory=InstrumentedCursor):
+        cur = super().cursor(factory)
+        if isinstance(cur, InstrumentedCursor):
+            self._cursors.append(cur)
+        return cur
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def _timed(self, name: str, fn) -> None:
+        for cur in list(self._cursors):
+            cur._finish()
+        started = time.perf_counter()
+        fn()
+        _emit(name, (), time.perf_counter() - started, 0, False, self)
+
+    def commit(self):
+        if self.in_transaction:
+            self._timed("COMMIT", super().commit)
+
+    def rollback(self):
+        if self.in_transaction:
+            self._timed("ROLLBACK", super().rollback)
+
+    def close(self):
+        for cur in self._cursors:
+            cur._finish()
+        self._cursors = []
+        super().close()
+
+
+def connection_factory():
+    # Plain sqlite3 connections unless something is listening, so the disabled path costs nothing.
+    if REQUEST_TIMING_ENABLED or QUERY_LISTENERS:
+        return InstrumentedConnection
+    return sqlite3.Connection
+
+
+def init_request_timing(app) -> None:
+    if not REQUEST_TIMING_ENABLED:
+        return
+
+    from flask import g, request
+
+    def _timed_json(dump, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return dump(*args, **kwargs)
+        finally:
+            stats = _current_stats.get()
+            if stats is not None:
+                stats.json_time += time.perf_counter() - started
+
+    # Wraps whichever provider is installed (server/responses.py's unless replaced).
+    class TimedJSONProvider(type(app.json)):
+        ensure_ascii = app.json.ensure_ascii
+
+        def dumps(self, obj, **kwargs):
+            return _timed_json(super().dumps, obj, **kwargs)
+
+        def dump_bytes(self, obj):
+            return _timed_json(super().dump_bytes, obj)
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timing():
+        g._request_stats_token = _current_stats.set(RequestStats())
+
+    def finish_request_timing(response):
+        stats = _current_stats.get()
+        if stats is None:
+            return response
+        total_ms = (time.perf_counter() - stats.started) * 1000
+        sql_ms = stats.sql_time * 1000
+        json_ms = stats.json_time * 1000
+        if response.is_streamed or response.direct_passthrough:
+            # Unknown: measuring a streamed body (SSE, send_file) would hold its headers until it ends.
+            size = None
+        else:
+            size = response.content_length
+            if size is None:
+                size = response.calculate_content_length()
+        response.headers["Server-Timing"] = (
+            f'app;dur={total_ms:.2f}, db;dur={sql_ms:.2f};desc="{stats.sql_count} queries", json;dur={json_ms:.2f}'
+        )
+        timing_logger.info(
+            json.dumps(
+                {
+                    "event": "request_timing",
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "status": response.status_code,
+                    "total_ms": round(total_ms, 2),
+                    "sql_count": stats.sql_count,
+                    "sql_ms": round(sql_ms, 2),
+                    "json_ms": round(json_ms, 2),
+                    "response_bytes": size,
+                    "content_encoding": response.headers.get("Content-Encoding"),
+                },
+                ensure_ascii=False,
+            )
+        )
+        return response
+
+    # Flask runs after_request hooks in reverse order, so the first one runs last: the size logged
+    # is the body as sent, after compress_response and any other hook has rewritten it.
+    app.after_request_funcs.setdefault(None, []).insert(0, finish_request_timing)
+
+    @app.teardown_request
+    def reset_request_timing(exc=None):  # noqa: ARG001
+        token = g.pop("_request_stats_token", None)
+        if token is not None:
+            _current_stats.reset(token)
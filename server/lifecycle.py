@@ -0,0 +1,43 @@
+import gc
+import random
+from typing import Callable, List
+
+# Process lifecycle under gunicorn --preload (see server/gunicorn.conf.py):
+#
+#   master:  begin_master() -> create_app() -> app_factory.prepare_for_fork(app) -> fork
+#   worker:  run_after_fork() as the first thing in the child
+#
+# Everything built before the fork (imports, route tables, compiled regexes, warmed caches) is shared
+# copy-on-write. Per-process state that must not be shared registers a reset here at import time:
+# locks (a parent thread may have held one at the fork), pools and sockets, counters and buffers that
+# would otherwise report the master's startup work once per worker.
+AFTER_FORK: List[Callable[[], None]] = []
+
+
+def register_after_fork(fn: Callable[[], None]) -> Callable[[], None]:
+    if fn not in AFTER_FORK:
+        AFTER_FORK.append(fn)
+    return fn
+
+
+def begin_master() -> None:
+    # No collections while the master builds the app: they would leave freed holes in pages the
+    # workers share, and touch the GC header of every object that survives.
+    gc.disable()
+
+
+def freeze() -> None:
+    # Objects that exist now are moved out of the collector's reach, so collections in the workers
+    # never write to (and so never copy) the pages they live on.
+    gc.freeze()
+    gc.enable()
+
+
+def run_after_fork() -> None:
+    gc.enable()
+    # CPython reseeds `random` in forked children itself; done here too so the guarantee does not
+    # depend on how the worker was started.
+    random.seed()
+    # A reset that fails leaves the worker unsafe to run, so errors propagate and the worker does not boot.
+    for fn in AFTER_FORK:
+        fn()
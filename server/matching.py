@@ -0,0 +1,277 @@
+import math
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from .db import (
+        changes_since,
+        get_entity_tags,
+        get_project,
+        get_role,
+        get_roles_by_ids,
+        get_students_by_ids,
+        latest_change_seq,
+        list_role_unrecommendable_students,
+        list_unrecommendable_roles,
+        load_tag_entities,
+    )
+    from .lifecycle import register_after_fork
+except ImportError:
+    from db import (
+        changes_since,
+        get_entity_tags,
+        get_project,
+        get_role,
+        get_roles_by_ids,
+        get_students_by_ids,
+        latest_change_seq,
+        list_role_unrecommendable_students,
+        list_unrecommendable_roles,
+        load_tag_entities,
+    )
+    from lifecycle import register_after_fork
+
+
+# Only the query's highest-IDF tags take part in ranking; each one at most doubles the match classes.
+RECOMMEND_MAX_QUERY_TAGS = max(1, int(os.environ.get("RECOMMEND_MAX_QUERY_TAGS", "8").strip() or "8"))
+RECOMMEND_LIMIT_MAX = 100
+# Bitmasks of tags that were queried are kept between calls, up to this many per index.
+_MASK_CACHE_SIZE = 4096
+
+
+def _bitmask(ids: Iterable[int]) -> int:
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _bits_desc(mask: int) -> Iterator[int]:
+    while mask:
+        bit = mask.bit_length() - 1
+        yield bit
+        mask ^= 1 << bit
+
+
+class TagIndex:
+    """In-process copy of one posting table (role_tag or user_tag): tag -> ids, with IDF weights.
+
+    Loaded once, then kept current from change_log: every use replays the log since the last one
+    and reloads only the roles/users that changed (and the roles of changed projects); it falls back
+    to a full reload when the log cannot answer (see changes_since). IDF is recomputed whenever the
+    postings change, so ranking only looks weights up.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.lock = threading.Lock()
+        self.seq: Optional[int] = None
+        self.tags_of: Dict[int, Tuple[int, ...]] = {}
+        self.postings: Dict[int, Set[int]] = {}
+        self.eligible: Set[int] = set()
+        self.idf: Dict[int, float] = {}
+        self._masks: Dict[int, int] = {}
+        self._eligible_mask: Optional[int] = None
+
+    def reset_after_fork(self) -> None:
+        # Postings loaded in the master stay, shared with it until this worker changes them.
+        self.lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Bring the index up to the current change_log position; call with self.lock held."""
+        seq = latest_change_seq()
+        if self.seq is not None and seq <= self.seq:
+            return
+        scopes = {"role": {}, "project": {}} if self.kind == "role" else {"user": {}}
+        changes = None if self.seq is None else changes_since(self.seq, seq, scopes)
+        if changes is None:
+            self._reset()
+            self._apply(load_tag_entities(self.kind), ())
+        else:
+            ids = list(changes.get(self.kind, {}))
+            projects = list(changes.get("project", {}))
+            if ids or projects:
+                self._apply(load_tag_entities(self.kind, ids, projects if self.kind == "role" else None), ids)
+        self.seq = seq
+
+    def _reset(self) -> None:
+        self.tags_of, self.postings, self.eligible = {}, {}, set()
+        self._masks, self._eligible_mask = {}, None
+
+    def _drop(self, entity_id: int) -> None:
+        for tag_id in self.tags_of.pop(entity_id, ()):
+            ids = self.postings[tag_id]
+            ids.discard(entity_id)
+            if not ids:
+                del self.postings[tag_id]
+            self._masks.pop(tag_id, None)
+        if entity_id in self.eligible:
+            self.eligible.discard(entity_id)
+            self._eligible_mask = None
+
+    def _apply(self, entities: Dict[int, Tuple[List[int], bool]], removed: Iterable[int]) -> None:
+        for entity_id in removed:
+            self._drop(entity_id)
+        for entity_id, (tags, eligible) in entities.items():
+            self._drop(entity_id)
+            # Rows without tags can never match, so they are not indexed at all.
+            if not tags:
+                continue
+            self.tags_of[entity_id] = tuple(tags)
+            for tag_id in tags:
+                self.postings.setdefault(tag_id, set()).add(entity_id)
+                self._masks.pop(tag_id, None)
+            if eligible:
+                self.eligible.add(entity_id)
+                self._eligible_mask = None
+        total = len(self.tags_of)
+        self.idf = {tag_id: math.log(1 + total / len(ids)) for tag_id, ids in self.postings.items()}
+
+    def _mask(self, tag_id: int) -> int:
+        mask = self._masks.get(tag_id)
+        if mask is None:
+            if len(self._masks) >= _MASK_CACHE_SIZE:
+                self._masks.clear()
+            mask = self._masks[tag_id] = _bitmask(self.postings.get(tag_id, ()))
+        return mask
+
+    def weight_of(self, entity_id: int) -> float:
+        return sum(self.idf.get(tag_id, 0.0) for tag_id in self.tags_of.get(entity_id, ()))
+
+    def rank(self, weights: Dict[int, float], exclude: Iterable[int], limit: int) -> List[Tuple[int, float, Tuple[int, ...]]]:
+        """Top `limit` eligible ids by summed weight of the query tags they carry, newest id first on ties.
+
+        Partition refinement over bitmasks: the candidates (eligible, in any query tag's posting) are
+        split tag by tag into classes that carry exactly the same query tags. Each class has a single
+        score, so only the best classes are ever expanded into ids.
+        """
+        tags = sorted(weights, key=lambda t: (-weights[t], t))[:RECOMMEND_MAX_QUERY_TAGS]
+        masks = [self._mask(tag_id) for tag_id in tags]
+        if self._eligible_mask is None:
+            self._eligible_mask = _bitmask(self.eligible)
+        candidates = 0
+        for mask in masks:
+            candidates |= mask
+        candidates &= self._eligible_mask
+        excluded = _bitmask(exclude)
+        if excluded:
+            candidates &= ~excluded
+
+        classes = [(candidates, ())] if candidates else []
+        for tag_id, mask in zip(tags, masks):
+            split = []
+            for members, matched in classes:
+                inside = members & mask
+                if inside:
+                    split.append((inside, matched + (tag_id,)))
+                outside = members & ~mask
+                if outside:
+                    split.append((outside, matched))
+            classes = split
+
+        scored = sorted(((sum(weights[t] for t in matched), matched, members) for members, matched in classes), reverse=True)
+        results = []
+        for score, matched, members in scored:
+            for entity_id in _bits_desc(members):
+                results.append((entity_id, score, matched))
+                if len(results) >= limit:
+                    return results
+        return results
+
+
+_INDEXES = {"role": TagIndex("role"), "user": TagIndex("user")}
+for _index in _INDEXES.values():
+    register_after_fork(_index.reset_after_fork)
+
+
+def refresh_index(kind: str) -> int:
+    """Bring one index up to date (a full load the first time); returns how many ids it holds."""
+    index = _INDEXES[kind]
+    with index.lock:
+        index.refresh()
+        return len(index.tags_of)
+
+
+def tag_weights(kind: str, tag_ids: Iterable[int]) -> Dict[int, float]:
+    """Current IDF of each tag over the role or user postings; a tag nobody has yet weighs as the rarest."""
+    index = _INDEXES[kind]
+    with index.lock:
+        index.refresh()
+        rarest = math.log(1 + max(len(index.tags_of), 1))
+        return {tag_id: index.idf.get(tag_id, rarest) for tag_id in tag_ids}
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(int(limit), RECOMMEND_LIMIT_MAX))
+
+
+def _ranked(kind: str, query_tags: List[dict], exclude: List[int], limit: int):
+    index = _INDEXES[kind]
+    with index.lock:
+        index.refresh()
+        weights = {t["tag_id"]: index.idf[t["tag_id"]] for t in query_tags if t["tag_id"] in index.idf}
+        ranked = index.rank(weights, exclude, limit)
+        totals = {entity_id: index.weight_of(entity_id) for entity_id, _, _ in ranked}
+    return ranked, weights, totals
+
+
+def recommend_roles(student_id: int, limit: int = 20) -> Dict:
+    """Open roles ranked by the IDF-weighted overlap of their skill_require with the student's skill_tags.
+
+    coverage is the share of the role's (IDF-weighted) requirements the student has.
+    """
+    tags = get_entity_tags("user", student_id)
+    if not tags:
+        return {"code": 200, "msg": "完善技能标签后即可获得推荐", "data": {"tags": [], "roles": []}}
+    names = {t["tag_id"]: t["name"] for t in tags}
+    ranked, _, totals = _ranked("role", tags, list_unrecommendable_roles(student_id), _clamp_limit(limit))
+    details = get_roles_by_ids([role_id for role_id, _, _ in ranked])
+    roles = []
+    for role_id, score, matched in ranked:
+        if role_id not in details:
+            continue
+        roles.append(
+            {
+                **details[role_id],
+                "score": round(score, 4),
+                "coverage": round(score / totals[role_id], 4) if totals.get(role_id) else 0.0,
+                "matched_tags": [names[t] for t in matched],
+            }
+        )
+    return {"code": 200, "msg": "查询成功", "data": {"tags": [t["name"] for t in tags], "roles": roles}}
+
+
+def recommend_candidates(role_id: int, enterprise_id: int, limit: int = 20) -> Dict:
+    """Active students ranked by the IDF-weighted overlap of their skill_tags with the role's skill_require.
+
+    Students who already applied or already joined the project are left out. coverage is the share
+    of the role's (IDF-weighted) requirements the student has.
+    """
+    role = get_role(role_id)["data"]
+    project = get_project(role["project_id"])["data"] if role else None
+    if not project or project["publisher_id"] != enterprise_id:
+        return {"code": 404, "msg": "角色不存在或无权限", "data": None}
+    tags = get_entity_tags("role", role_id)
+    if not tags:
+        return {"code": 200, "msg": "角色未填写技能要求，无法推荐", "data": {"tags": [], "candidates": []}}
+    names = {t["tag_id"]: t["name"] for t in tags}
+    ranked, weights, _ = _ranked("user", tags, list_role_unrecommendable_students(role_id), _clamp_limit(limit))
+    required = sum(weights.values())
+    details = get_students_by_ids([user_id for user_id, _, _ in ranked])
+    candidates = []
+    for user_id, score, matched in ranked:
+        if user_id not in details:
+            continue
+        candidates.append(
+            {
+                **details[user_id],
+                "score": round(score, 4),
+                "coverage": round(score / required, 4) if required else 0.0,
+                "matched_tags": [names[t] for t in matched],
+            }
+        )
+    return {"code": 200, "msg": "查询成功", "data": {"tags": [t["name"] for t in tags], "candidates": candidates}}
@@ -0,0 +1,438 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .instrumentation import QUERY_LISTENERS
+    from .lifecycle import register_after_fork
+except ImportError:
+    from instrumentation import QUERY_LISTENERS
+    from lifecycle import register_after_fork
+
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "").strip()
+# Gunicorn workers each write a snapshot file here; a scrape on any worker merges all of them.
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "").strip()
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", "1").strip() or "1")
+# Per-statement DB metrics wrap every connection (server/instrumentation.py), so they are opt-in.
+METRICS_DB_QUERIES = os.environ.get("METRICS_DB_QUERIES", "").strip().lower() in ("1", "true", "yes", "on")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+AI_BUCKETS = (0.05, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List["_Metric"] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def metrics(self) -> List["_Metric"]:
+        with self._lock:
+            return list(self._metrics)
+
+    def snapshot(self) -> Dict:
+        return {m.name: m.snapshot() for m in self.metrics()}
+
+    def reset(self) -> None:
+        for m in self.metrics():
+            m.reset()
+
+    def reset_after_fork(self) -> None:
+        # Values recorded while the master built the app (migration queries etc.) are not this
+        # worker's, and would be counted once per worker when snapshots are merged.
+        self._lock = threading.Lock()
+        for m in self._metrics:
+            m._lock = threading.Lock()
+        self.reset()
+
+
+REGISTRY = Registry()
+register_after_fork(REGISTRY.reset_after_fork)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = [[list(k), v if not isinstance(v, list) else list(v)] for k, v in self._values.items()]
+        return {"kind": self.kind, "samples": samples}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS, **kwargs):
+        super().__init__(name, documentation, labelnames, **kwargs)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            # Per-bucket counts (non-cumulative) + [+Inf bucket, sum, count].
+            data = self._values.get(key)
+            if data is None:
+                data = [0.0] * (len(self.buckets) + 3)
+                self._values[key] = data
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by endpoint", ("endpoint", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency", ("endpoint", "method"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed", ("op",))
+DB_LATENCY = Histogram("db_query_duration_seconds", "SQL statement latency including fetch", ("op",), buckets=DB_BUCKETS)
+CACHE_REQUESTS = Counter("cache_requests_total", "In-process cache lookups", ("cache", "result"))
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes accepted through file uploads", ("kind",))
+AI_SUGGEST_LATENCY = Histogram(
+    "ai_suggest_provider_duration_seconds", "AI role suggestion provider latency", ("provider",), buckets=AI_BUCKETS
+)
+AI_SUGGEST_FALLBACKS = Counter("ai_suggest_fallback_total", "AI role suggestions served by the local stub", ("reason",))
+AUTH_FAILURES = Counter("auth_failures_total", "Rejected authentication/authorization attempts", ("reason",))
+PASSWORD_HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds", "Password hash/verify time inside the hash pool", ("op",), buckets=DB_BUCKETS + (2.5,)
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "Password hash jobs running or queued")
+PASSWORD_HASH_REJECTED = Counter("password_hash_rejected_total", "Password hash jobs refused by back-pressure", ("op",))
+RATE_LIMITED = Counter("rate_limited_total", "Requests rejected by the rate limiter", ("rule",))
+PROJECT_VIEWS = Counter("project_views_total", "Public project detail views counted")
+PROJECT_VIEWS_FLUSHED = Counter("project_views_flushed_total", "Counted views written to the database")
+PROJECT_VIEWS_DROPPED = Counter("project_views_dropped_total", "Counted views lost before reaching the database", ("reason",))
+PROJECT_VIEWS_PENDING = Gauge("project_views_pending", "Counted views waiting for the next flush")
+PROJECT_VIEW_FLUSH_SECONDS = Histogram(
+    "project_view_flush_duration_seconds", "Time spent writing one batch of buffered views", buckets=DB_BUCKETS
+)
+CACHE_WARMUP_ITEMS = Counter("cache_warmup_items_total", "Items loaded by the startup cache warm-up", ("step",))
+CACHE_WARMUP_SECONDS = Gauge("cache_warmup_duration_seconds", "Time the last cache warm-up spent per step", ("step",))
+CACHE_WARMUP_CUT = Counter("cache_warmup_cut_total", "Warm-up steps cut short by the time budget or an error", ("step", "reason"))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+_DB_OPS = {"SELECT", "INSERT", "UPDATE", "DELETE", "COMMIT", "ROLLBACK", "BEGIN", "PRAGMA"}
+
+
+def _observe_query(event) -> None:
+    head = event.sql.lstrip()[:12].split(None, 1)
+    op = head[0].upper() if head else "OTHER"
+    if op not in _DB_OPS:
+        op = "OTHER"
+    DB_QUERIES.inc(op=op)
+    DB_LATENCY.observe(event.elapsed, op=op)
+
+
+# ===== Multi-process snapshots =====
+
+
+class _SnapshotWriter:
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = max(0.1, interval)
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+
+    def ensure_started(self) -> None:
+        # Threads do not survive fork, so each worker starts its own writer on first use.
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop = threading.Event()
+        thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+        thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pid != os.getpid():
+            return
+        self.write()
+
+    def write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"pid": os.getpid(), "metrics": REGISTRY.snapshot()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logging.warning("metrics snapshot write failed: %s", exc)
+
+    def read_others(self) -> List[Dict]:
+        own = os.getpid()
+        snapshots = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return snapshots
+        for name in names:
+            if not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if data.get("pid") == own:
+                continue
+            data["alive"] = _pid_alive(data.get("pid"))
+            snapshots.append(data)
+        return snapshots
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+_writer: Optional[_SnapshotWriter] = None
+
+
+def flush_snapshot() -> None:
+    """Write this process's snapshot once, without a writer thread.
+
+    For startup work done before any request starts the writer: the preload master serves no
+    requests, but its migrations and cache warm-up are reported from this file, once, while workers
+    start from cleared metrics. A worker without preload flushes its own warm-up the same way.
+    """
+    if _writer is not None:
+        os.makedirs(_writer.directory, exist_ok=True)
+        _writer.write()
+
+
+def _merge(sources: List[Dict]) -> Dict:
+    merged: Dict[str, Dict] = {}
+    for source in sources:
+        for name, data in source["metrics"].items():
+            # Gauges describe live state, so exited workers no longer contribute.
+            if data["kind"] == "gauge" and not source.get("alive"):
+                continue
+            target = merged.setdefault(name, {"kind": data["kind"], "values": {}})["values"]
+            for labels, value in data["samples"]:
+                key = tuple(labels)
+                if isinstance(value, list):
+                    current = target.get(key)
+                    target[key] = [a + b for a, b in zip(current, value)] if current else list(value)
+                else:
+                    target[key] = target.get(key, 0.0) + value
+    return merged
+
+
+def _merged_snapshot() -> Dict:
+    sources = [{"metrics": REGISTRY.snapshot(), "alive": True}]
+    if _writer is not None:
+        sources.extend(_writer.read_others())
+    return _merge(sources)
+
+
+def clear_multiproc_dir() -> None:
+    """Delete every snapshot left in METRICS_MULTIPROC_DIR (gunicorn on_starting, before any worker runs).
+
+    Files of an earlier run would otherwise be merged into every scrape of this one.
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return
+    try:
+        names = os.listdir(METRICS_MULTIPROC_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.startswith("metrics-") and (name.endswith(".json") or name.endswith(".tmp")):
+            try:
+                os.remove(os.path.join(METRICS_MULTIPROC_DIR, name))
+            except FileNotFoundError:
+                pass
+
+
+def mark_process_dead(pid: int) -> None:
+    """Fold an exited worker's snapshot into metrics-archive.json and delete it (gunicorn child_exit).
+
+    Its counters and histograms stay in the totals, so they never go backwards on a worker restart;
+    its gauges are dropped. The directory keeps one file per live process plus the archive.
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"metrics-{pid}.json")
+    archive_path = os.path.join(METRICS_MULTIPROC_DIR, "metrics-archive.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            dead = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError):
+        dead = {"metrics": {}}
+    try:
+        with open(archive_path, "r", encoding="utf-8") as f:
+            archive = json.load(f)
+    except (OSError, ValueError):
+        archive = {"metrics": {}}
+    merged = _merge([{"metrics": archive["metrics"]}, {"metrics": dead["metrics"]}])
+    metrics = {
+        name: {"kind": data["kind"], "samples": [[list(key), value] for key, value in data["values"].items()]}
+        for name, data in merged.items()
+    }
+    try:
+        with open(f"{archive_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"pid": None, "metrics": metrics}, f)
+        os.replace(f"{archive_path}.tmp", archive_path)
+        os.remove(path)
+    except OSError as exc:
+        logging.warning("metrics archive write failed: %s", exc)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return f"{int(value)}"
+    return repr(float(value))
+
+
+def render_metrics() -> str:
+    merged = _merged_snapshot()
+    lines: List[str] = []
+    for metric in REGISTRY.metrics():
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        values = merged.get(metric.name, {}).get("values", {})
+        for key in sorted(values):
+            value = values[key]
+            if metric.kind != "histogram":
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+                continue
+            cumulative = 0.0
+            bounds = [repr(float(b)) for b in metric.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, value[:-2]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {_format_value(value[-2])}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {_format_value(value[-1])}")
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app) -> None:
+    global _writer
+    if not METRICS_ENABLED:
+        return
+
+    from flask import Response, g, request
+
+    if METRICS_DB_QUERIES and _observe_query not in QUERY_LISTENERS:
+        QUERY_LISTENERS.append(_observe_query)
+    if METRICS_MULTIPROC_DIR and _writer is None:
+        _writer = _SnapshotWriter(METRICS_MULTIPROC_DIR, METRICS_FLUSH_INTERVAL)
+        atexit.register(_writer.flush)
+
+    @app.before_request
+    def start_request_metrics():
+        if _writer is not None:
+            _writer.ensure_started()
+        g._metrics_started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.get("_metrics_started")
+        if started is not None:
+            endpoint = request.endpoint or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+            HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc=None):  # noqa: ARG001
+        if g.pop("_metrics_started", None) is not None:
+            HTTP_IN_FLIGHT.dec()
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        if METRICS_TOKEN and request.headers.get("Authorization", "") != f"Bearer {METRICS_TOKEN}":
+            return Response("forbidden\n", status=403, mimetype="text/plain")
+        # content_type, not mimetype: Flask would append a second "; charset=utf-8" to a mimetype.
+        return Response(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Optional
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+try:
+    from .lifecycle import register_after_fork
+    from .metrics import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_LATENCY, PASSWORD_HASH_REJECTED
+except ImportError:
+    from lifecycle import register_after_fork
+    from metrics import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_LATENCY, PASSWORD_HASH_REJECTED
+
+
+# Werkzeug method string, e.g. "scrypt", "scrypt:16384:8:1" or "pbkdf2:sha256:600000".
+PASSWORD_HASH_METHOD = os.environ.get("PASSWORD_HASH_METHOD", "scrypt").strip() or "scrypt"
+# scrypt at the default N=32768 allocates ~32 MB per call, so concurrency is capped independently of request threads.
+PASSWORD_HASH_WORKERS = max(1, int(os.environ.get("PASSWORD_HASH_WORKERS", "").strip() or min(4, os.cpu_count() or 1)))
+# Hash jobs allowed to be running or queued at once; beyond this requests get 429 instead of piling up.
+PASSWORD_HASH_QUEUE = max(
+    PASSWORD_HASH_WORKERS, int(os.environ.get("PASSWORD_HASH_QUEUE", "").strip() or PASSWORD_HASH_WORKERS * 4)
+)
+PASSWORD_HASH_TIMEOUT = float(os.environ.get("PASSWORD_HASH_TIMEOUT", "5").strip() or "5")
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the hash pool is saturated; callers should answer 429."""
+
+    retry_after = 1
+
+
+class _HashPool:
+    def __init__(self, workers: int, queue: int, timeout: float):
+        self.workers = workers
+        self.queue = queue
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._slots = threading.BoundedSemaphore(queue)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily and per process: pool threads do not survive a gunicorn fork.
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+                    self._slots = threading.BoundedSemaphore(self.queue)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def reset_after_fork(self) -> None:
+        # The parent's pool threads are gone; the next submit starts this process's own.
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def submit(self, op: str, fn: Callable, *args):
+        executor = self._get_executor()
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED.inc(op=op)
+            raise PasswordPoolBusy("密码校验繁忙，请稍后重试")
+        PASSWORD_HASH_IN_FLIGHT.inc()
+
+        def run():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                PASSWORD_HASH_LATENCY.observe(time.perf_counter() - started, op=op)
+
+        def release(_future) -> None:
+            PASSWORD_HASH_IN_FLIGHT.dec()
+            slots.release()
+
+        future = executor.submit(run)
+        future.add_done_callback(release)
+        return future
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None and self._pid == os.getpid():
+            executor.shutdown(wait=True)
+
+    def run(self, op: str, fn: Callable, *args):
+        future = self.submit(op, fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # The job still finishes and frees its slot; this request just stops waiting for it.
+            PASSWORD_HASH_REJECTED.inc(op=f"{op}_timeout")
+            raise PasswordPoolBusy("密码校验超时，请稍后重试") from None
+
+
+_pool = _HashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE, PASSWORD_HASH_TIMEOUT)
+register_after_fork(_pool.reset_after_fork)
+
+
+def hash_password(password: str) -> str:
+    return _pool.run("hash", generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return _pool.run("verify", check_password_hash, password_hash, password)
+
+
+def _method_prefix(method: str) -> str:
+    """The method part Werkzeug stores in a hash for `method`, with its defaults filled in.
+
+    "scrypt" -> "scrypt:32768:8:1", "pbkdf2" -> "pbkdf2:sha256:<iterations>". Derived from the string
+    rather than by hashing, which would cost a full scrypt run (and its memory) outside the pool.
+    """
+    name, *args = method.split(":")
+    if name == "scrypt" and not args:
+        return "scrypt:32768:8:1"
+    if name == "pbkdf2" and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return method
+
+
+_METHOD_PREFIX = _method_prefix(PASSWORD_HASH_METHOD)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return (password_hash or "").split("$", 1)[0] != _METHOD_PREFIX
+
+
+def shutdown_password_pool() -> None:
+    """Wait for queued jobs (including background rehashes) and stop the pool threads."""
+    _pool.shutdown()
+
+
+def rehash_in_background(password: str, save: Callable[[str], None]) -> bool:
+    """Re-hash with the current parameters off the request path; skipped when the pool is busy."""
+
+    def job():
+        new_hash = generate_password_hash(password, PASSWORD_HASH_METHOD)
+        try:
+            save(new_hash)
+        except Exception:
+            logging.exception("password rehash failed")
+
+    try:
+        _pool.submit("rehash", job)
+    except PasswordPoolBusy:
+        return False
+    return True
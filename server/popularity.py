@@ -0,0 +1,169 @@
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    from .db import add_project_views
+    from .lifecycle import register_after_fork
+    from .metrics import (
+        PROJECT_VIEW_FLUSH_SECONDS,
+        PROJECT_VIEWS,
+        PROJECT_VIEWS_DROPPED,
+        PROJECT_VIEWS_FLUSHED,
+        PROJECT_VIEWS_PENDING,
+    )
+except ImportError:
+    from db import add_project_views
+    from lifecycle import register_after_fork
+    from metrics import (
+        PROJECT_VIEW_FLUSH_SECONDS,
+        PROJECT_VIEWS,
+        PROJECT_VIEWS_DROPPED,
+        PROJECT_VIEWS_FLUSHED,
+        PROJECT_VIEWS_PENDING,
+    )
+
+
+VIEW_COUNTING = os.environ.get("VIEW_COUNTING", "1").strip().lower() in ("1", "true", "yes", "on")
+# Seconds between flushes of a worker's buffered views; views in the buffer are lost if the worker is killed.
+VIEW_FLUSH_INTERVAL = float(os.environ.get("VIEW_FLUSH_INTERVAL", "5").strip() or "5")
+# Distinct projects a worker buffers between flushes; views of further projects are dropped and counted.
+VIEW_BUFFER_MAX = int(os.environ.get("VIEW_BUFFER_MAX", "10000").strip() or "10000")
+# A view's weight in the popularity score halves every this many hours.
+POPULARITY_HALF_LIFE_HOURS = float(os.environ.get("POPULARITY_HALF_LIFE_HOURS", "72").strip() or "72")
+# Weights are measured from a fixed epoch (2024-01-01 UTC), so stored scores never need rescaling.
+POPULARITY_EPOCH = 1704067200.0
+
+logger = logging.getLogger("server.popularity")
+
+
+def view_weight(at: float) -> float:
+    """ln of the weight of a view at `at`: views grow e-fold every tau rather than old ones decaying.
+
+    Every stored score would decay by the same factor, so ranking by ln(sum of weights) is ranking by
+    the decayed view count, and a project's score only changes when it is viewed.
+    """
+    tau = POPULARITY_HALF_LIFE_HOURS * 3600 / math.log(2)
+    return (at - POPULARITY_EPOCH) / tau
+
+
+def decayed_views(popularity: float, now: Optional[float] = None) -> float:
+    """The stored score as a view count, each view discounted by its age."""
+    return math.exp(popularity - view_weight(time.time() if now is None else now))
+
+
+class ViewBuffer:
+    """Per-worker view counts, written behind in one batched transaction every few seconds.
+
+    A detail view costs a dict increment instead of an UPDATE behind the database write lock. What
+    the buffer cannot hold, or a flush cannot write, is dropped and counted in
+    project_views_dropped_total, so counted = flushed + dropped + pending.
+    """
+
+    def __init__(self, max_projects: int = VIEW_BUFFER_MAX, interval: float = VIEW_FLUSH_INTERVAL):
+        self.max_projects = max(1, max_projects)
+        self.interval = max(0.1, interval)
+        self._lock = threading.Lock()
+        # Serializes flushes (the writer thread, shutdown), so one batch is never written twice.
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[int, int] = {}
+        self._pending_views = 0
+        self._pid: Optional[int] = None
+        self._stop = threading.Event()
+
+    def reset_after_fork(self) -> None:
+        # The writer thread did not survive the fork; views buffered in the parent are the parent's to flush.
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._pending_views = 0
+        self._pid = None
+
+    def _ensure_started(self) -> None:
+        # Threads do not survive fork, so each worker starts its own writer on its first view.
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+        threading.Thread(target=self._run, name="view-writer", daemon=True).start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def _add(self, counts: Dict[int, int], reason: str) -> None:
+        # Caller holds self._lock.
+        dropped = 0
+        for project_id, count in counts.items():
+            if project_id in self._pending:
+                self._pending[project_id] += count
+            elif len(self._pending) < self.max_projects:
+                self._pending[project_id] = count
+            else:
+                dropped += count
+                continue
+            self._pending_views += count
+        if dropped:
+            PROJECT_VIEWS_DROPPED.inc(dropped, reason=reason)
+        PROJECT_VIEWS_PENDING.set(self._pending_views)
+
+    def record(self, project_id: int) -> None:
+        self._ensure_started()
+        PROJECT_VIEWS.inc()
+        with self._lock:
+            self._add({project_id: 1}, "buffer_full")
+
+    def flush(self, final: bool = False) -> int:
+        """Write everything buffered so far; returns the number of views written.
+
+        `final` is the last flush of the process (exit, worker shutdown): nothing will retry a failed
+        write, so its views are counted as dropped instead of going back into the buffer.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                views, self._pending_views = self._pending_views, 0
+                PROJECT_VIEWS_PENDING.set(0)
+            if not batch:
+                return 0
+            weight = view_weight(time.time())
+            started = time.perf_counter()
+            try:
+                # A flush window is seconds long; its views are all weighted as of now.
+                add_project_views({project_id: (count, math.log(count) + weight) for project_id, count in batch.items()})
+            except Exception:
+                if final:
+                    logger.exception("final view flush failed; %d views dropped", views)
+                    PROJECT_VIEWS_DROPPED.inc(views, reason="flush_failed")
+                    return 0
+                logger.exception("view flush failed; %d views kept for the next one", views)
+                # Back into the buffer, behind anything counted meanwhile; what no longer fits is lost.
+                with self._lock:
+                    self._add(batch, "flush_failed")
+                return 0
+            finally:
+                PROJECT_VIEW_FLUSH_SECONDS.observe(time.perf_counter() - started)
+            PROJECT_VIEWS_FLUSHED.inc(views)
+            return views
+
+
+_VIEWS = ViewBuffer()
+register_after_fork(_VIEWS.reset_after_fork)
+# Development servers and single-process runs; gunicorn workers also flush in the worker_exit hook.
+atexit.register(_VIEWS.flush, final=True)
+
+
+def record_view(project_id: int) -> None:
+    if VIEW_COUNTING:
+        _VIEWS.record(project_id)
+
+
+def flush_views(final: bool = False) -> int:
+    return _VIEWS.flush(final)
@@ -1,19 +1,20 @@
-import json
 import logging
-import os
 import re
-import uuid
 from datetime import datetime
-from urllib import error as urllib_error
-from urllib import request as urllib_request
 
-from flask import Blueprint, jsonify, request
-from werkzeug.utils import secure_filename
+from flask import Blueprint, request
 
 try:
     from .auth import login_required, role_required
+    from .metrics import AI_SUGGEST_FALLBACKS, AI_SUGGEST_LATENCY
+    from .popularity import record_view
+    from .rate_limit import rate_limit
+    from .responses import fail, ok
+    from .role_batch import BATCH_MAX_PROJECTS, run_role_suggest_batch
+    from .sync import ListSync
     from .db import (
         add_role_feedback,
+        get_enterprise_summary,
         get_project,
         get_role,
         get_user,
@@ -24,13 +25,21 @@ try:
         project_add,
         project_update,
         role_add,
+        role_add_many,
         role_update,
         update_feedback_status,
     )
 except ImportError:
     from auth import login_required, role_required
+    from metrics import AI_SUGGEST_FALLBACKS, AI_SUGGEST_LATENCY
+    from popularity import record_view
+    from rate_limit import rate_limit
+    from responses import fail, ok
+    from role_batch import BATCH_MAX_PROJECTS, run_role_suggest_batch
+    from sync import ListSync
     from db import (
         add_role_feedback,
+        get_enterprise_summary,
         get_project,
         get_role,
         get_user,
@@ -41,6 +50,7 @@ except ImportError:
         project_add,
         project_update,
         role_add,
+        role_add_many,
         role_update,
         update_feedback_status,
     )
@@ -49,7 +59,7 @@ except ImportError:
 projects_bp = Blueprint("projects", __name__)
 
 PROJECT_STATUS = {"草稿", "招募中", "进行中", "已完成", "已终止"}
-ROLE_STATUS = {"招募中", "进行中", "已完成"}
+ROLE_STATUS = {"草稿", "招募中", "进行中", "已完成"}
 ACTION_VERBS = (
     "实现",
     "搭建",
@@ -66,30 +76,7 @@ ACTION_VERBS = (
     "test",
     "deploy",
 )
-
-DEEPSEEK_API_URL = os.environ.get("DEEPSEEK_API_URL", "https://api.deepseek.com/chat/completions").strip()
-DEEPSEEK_MODEL = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat").strip() or "deepseek-chat"
-DEEPSEEK_TIMEOUT = float(os.environ.get("DEEPSEEK_TIMEOUT", "15").strip() or "15")
-FEEDBACK_UPLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend", "uploads", "feedbacks"))
-MAX_FEEDBACK_FILE_SIZE = 20 * 1024 * 1024
-ALLOWED_FEEDBACK_EXTENSIONS = {
-    ".pdf",
-    ".doc",
-    ".docx",
-    ".ppt",
-    ".pptx",
-    ".xls",
-    ".xlsx",
-    ".zip",
-    ".rar",
-    ".7z",
-    ".png",
-    ".jpg",
-    ".jpeg",
-    ".gif",
-    ".txt",
-    ".md",
-}
+_WHITESPACE = re.compile(r"\s+")
 
 
 @projects_bp.route("/api/enterprise/projects", methods=["GET"])
@@ -98,8 +85,17 @@ ALLOWED_FEEDBACK_EXTENSIONS = {
 def enterprise_list_projects():
     user_id = request.current_user["user_id"]
     status = (request.args.get("status") or "").strip()
+    sync = ListSync("project", "project_id", scope={"user_id": user_id})
     projects = list_projects_by_publisher(user_id, status or None)
-    return jsonify({"success": True, "projects": projects})
+    return sync.respond("projects", projects)
+
+
+@projects_bp.route("/api/enterprise/summary", methods=["GET"])
+@login_required
+@role_required("企业")
+def enterprise_summary():
+    # One round trip for the enterprise pages instead of a roles/applications call per project and role.
+    return ok(projects=get_enterprise_summary(request.current_user["user_id"]))
 
 
 @projects_bp.route("/api/enterprise/projects", methods=["POST"])
@@ -119,11 +115,11 @@ def enterprise_create_project():
     participant_count = (data.get("participant_count") or "").strip()
 
     if not project_name:
-        return jsonify({"success": False, "message": "project_name 不能为空"}), 400
+        return fail("project_name 不能为空", 400)
     if not company:
-        return jsonify({"success": False, "message": "company 不能为空"}), 400
+        return fail("company 不能为空", 400)
     if project_status not in PROJECT_STATUS:
-        return jsonify({"success": False, "message": "project_status 不合法"}), 400
+        return fail("project_status 不合法", 400)
 
     res = project_add(
         project_name=project_name,
@@ -138,8 +134,8 @@ def enterprise_create_project():
         participant_count=participant_count,
     )
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 400
-    return jsonify({"success": True, "project_id": res["data"]["project_id"]}), 201
+        return fail(res["msg"], 400)
+    return ok(status=201, project_id=res["data"]["project_id"])
 
 
 @projects_bp.route("/api/enterprise/projects/<int:project_id>", methods=["PUT"])
@@ -161,20 +157,20 @@ def enterprise_update_project(project_id: int):
     }
     update_fields = {k: v for k, v in data.items() if k in allow_fields}
     if not update_fields:
-        return jsonify({"success": True, "message": "无可更新字段"})
+        return ok("无可更新字段")
     if "project_status" in update_fields and update_fields["project_status"] not in PROJECT_STATUS:
-        return jsonify({"success": False, "message": "project_status 不合法"}), 400
+        return fail("project_status 不合法", 400)
 
     proj = get_project(project_id)
     if proj["code"] != 200:
-        return jsonify({"success": False, "message": proj["msg"]}), 404
+        return fail(proj["msg"], 404)
     if proj["data"]["publisher_id"] != user_id:
-        return jsonify({"success": False, "message": "项目不存在或无权限"}), 403
+        return fail("项目不存在或无权限", 403)
 
     res = project_update(project_id, **update_fields)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 400
-    return jsonify({"success": True, "message": "更新成功"})
+        return fail(res["msg"], 400)
+    return ok("更新成功")
 
 
 @projects_bp.route("/api/enterprise/projects/<int:project_id>/roles", methods=["GET"])
@@ -184,20 +180,16 @@ def enterprise_list_roles(project_id: int):
     user_id = request.current_user["user_id"]
     proj = get_project(project_id)
     if proj["code"] != 200:
-        return jsonify({"success": False, "message": proj["msg"]}), 404
+        return fail(proj["msg"], 404)
     if proj["data"]["publisher_id"] != user_id:
-        return jsonify({"success": False, "message": "项目不存在或无权限"}), 403
+        return fail("项目不存在或无权限", 403)
 
-    roles = list_roles_by_project(project_id)
-    return jsonify({"success": True, "roles": roles})
+    sync = ListSync("role", "role_id", scope={"project_id": project_id})
+    roles = list_roles_by_project(project_id, include_drafts=True)
+    return sync.respond("roles", roles)
 
 
-@projects_bp.route("/api/enterprise/projects/<int:project_id>/roles", methods=["POST"])
-@login_required
-@role_required("企业")
-def enterprise_create_role(project_id: int):
-    user_id = request.current_user["user_id"]
-    data = request.json or {}
+def _parse_role_fields(data: dict):
     role_name = (data.get("role_name") or data.get("name") or "").strip()
     task_desc = (data.get("task_desc") or data.get("description") or "").strip()
     skill_require = (data.get("skill_require") or data.get("required_skills") or "").strip()
@@ -206,37 +198,85 @@ def enterprise_create_role(project_id: int):
     task_deadline = data.get("task_deadline")
 
     if not role_name:
-        return jsonify({"success": False, "message": "role_name 不能为空"}), 400
+        return None, "role_name 不能为空"
     if not task_desc:
-        return jsonify({"success": False, "message": "task_desc 不能为空"}), 400
+        return None, "task_desc 不能为空"
     try:
         limit_num = int(limit_num)
     except Exception:
-        return jsonify({"success": False, "message": "limit_num 必须是整数"}), 400
+        return None, "limit_num 必须是整数"
     if limit_num <= 0:
-        return jsonify({"success": False, "message": "limit_num 必须大于 0"}), 400
+        return None, "limit_num 必须大于 0"
     if role_status not in ROLE_STATUS:
-        return jsonify({"success": False, "message": "role_status 不合法"}), 400
+        return None, "role_status 不合法"
+    return {
+        "role_name": role_name,
+        "task_desc": task_desc,
+        "skill_require": skill_require,
+        "limit_num": limit_num,
+        "role_status": role_status,
+        "task_deadline": task_deadline,
+    }, None
+
+
+@projects_bp.route("/api/enterprise/projects/<int:project_id>/roles", methods=["POST"])
+@login_required
+@role_required("企业")
+def enterprise_create_role(project_id: int):
+    user_id = request.current_user["user_id"]
+    fields, error = _parse_role_fields(request.json or {})
+    if error:
+        return fail(error, 400)
 
     proj = get_project(project_id)
     if proj["code"] != 200:
-        return jsonify({"success": False, "message": proj["msg"]}), 404
+        return fail(proj["msg"], 404)
     if proj["data"]["publisher_id"] != user_id:
-        return jsonify({"success": False, "message": "项目不存在或无权限"}), 403
-
-    res = role_add(
-        project_id=project_id,
-        role_name=role_name,
-        task_desc=task_desc,
-        skill_require=skill_require,
-        limit_num=limit_num,
-        join_num=0,
-        role_status=role_status,
-        task_deadline=task_deadline,
+        return fail("项目不存在或无权限", 403)
+
+    res = role_add(project_id=project_id, join_num=0, **fields)
+    if res["code"] != 200:
+        return fail(res["msg"], 400)
+    return ok(status=201, role_id=res["data"]["role_id"])
+
+
+@projects_bp.route("/api/enterprise/projects/<int:project_id>/roles/bulk", methods=["POST"])
+@login_required
+@role_required("企业")
+@rate_limit("roles_bulk", "30/minute", key="user")
+def enterprise_bulk_save_roles(project_id: int):
+    data = request.json or {}
+    items = data.get("roles")
+    on_conflict = data.get("on_conflict") or "error"
+    if not isinstance(items, list) or not items:
+        return fail("roles 不能为空", 400)
+    if not isinstance(on_conflict, str):
+        return fail("on_conflict 仅支持：error/skip/update", 400)
+    on_conflict = on_conflict.strip()
+
+    roles = []
+    for index, item in enumerate(items, start=1):
+        fields, error = _parse_role_fields(item if isinstance(item, dict) else {})
+        if error:
+            return fail(f"第 {index} 个角色：{error}", 400)
+        roles.append(fields)
+
+    res = role_add_many(
+        project_id,
+        roles,
+        publisher_id=request.current_user["user_id"],
+        on_conflict=on_conflict,
     )
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 400
-    return jsonify({"success": True, "role_id": res["data"]["role_id"]}), 201
+        return fail(res["msg"], res["code"])
+    return ok(
+        status=201,
+        roles=res["data"]["roles"],
+        role_ids=[r["role_id"] for r in res["data"]["roles"]],
+        created=res["data"]["created"],
+        updated=res["data"]["updated"],
+        skipped=res["data"]["skipped"],
+    )
 
 
 @projects_bp.route("/api/enterprise/roles/<int:role_id>", methods=["PUT"])
@@ -248,56 +288,64 @@ def enterprise_update_role(role_id: int):
     allow_fields = {"role_name", "task_desc", "skill_require", "limit_num", "join_num", "role_status", "task_deadline"}
     update_fields = {k: v for k, v in data.items() if k in allow_fields}
     if not update_fields:
-        return jsonify({"success": True, "message": "无可更新字段"})
+        return ok("无可更新字段")
 
     if "role_status" in update_fields and update_fields["role_status"] not in ROLE_STATUS:
-        return jsonify({"success": False, "message": "role_status 不合法"}), 400
+        return fail("role_status 不合法", 400)
     if "limit_num" in update_fields:
         try:
             update_fields["limit_num"] = int(update_fields["limit_num"])
         except Exception:
-            return jsonify({"success": False, "message": "limit_num 必须是整数"}), 400
+            return fail("limit_num 必须是整数", 400)
         if update_fields["limit_num"] <= 0:
-            return jsonify({"success": False, "message": "limit_num 必须大于 0"}), 400
+            return fail("limit_num 必须大于 0", 400)
     if "join_num" in update_fields and "limit_num" in update_fields:
         if int(update_fields["join_num"]) > int(update_fields["limit_num"]):
-            return jsonify({"success": False, "message": "join_num 不能超过 limit_num"}), 400
+            return fail("join_num 不能超过 limit_num", 400)
 
     role_res = get_role(role_id)
     if role_res["code"] != 200:
-        return jsonify({"success": False, "message": role_res["msg"]}), 404
+        return fail(role_res["msg"], 404)
     proj = get_project(role_res["data"]["project_id"])
     if proj["code"] != 200 or proj["data"]["publisher_id"] != user_id:
-        return jsonify({"success": False, "message": "角色不存在或无权限"}), 403
+        return fail("角色不存在或无权限", 403)
 
     res = role_update(role_id, **update_fields)
     if res["code"] != 200:
-        return jsonify({"success": False, "message": res["msg"]}), 400
-    return jsonify({"success": True, "message": "更新成功"})
+        return fail(res["msg"], 400)
+    return ok("更新成功")
 
 
 @projects_bp.route("/api/projects", methods=["GET"])
 def public_list_projects():
     q = (request.args.get("q") or "").strip()
-    projects = list_public_projects(q)
-    return jsonify({"success": True, "projects": projects})
+    # ?open=1: only projects with a role still recruiting; ?sort=open: most open roles first;
+    # ?sort=popular: most viewed recently first (see server/popularity.py).
+    open_only = (request.args.get("open") or "").strip().lower() in ("1", "true", "yes")
+    sort = (request.args.get("sort") or "latest").strip()
+    sync = ListSync("project", "project_id")
+    projects = list_public_projects(q, open_only=open_only, sort=sort)
+    return sync.respond("projects", projects)
 
 
 @projects_bp.route("/api/projects/<int:project_id>", methods=["GET"])
 def public_project_detail(project_id: int):
     proj = get_project(project_id)
     if proj["code"] != 200:
-        return jsonify({"success": False, "message": proj["msg"]}), 404
+        return fail(proj["msg"], 404)
     publisher = get_user(proj["data"]["publisher_id"])
     publisher_name = publisher["data"]["real_name"] if publisher["code"] == 200 else ""
     project = dict(proj["data"])
     project["publisher_name"] = publisher_name
     roles = list_roles_by_project(project_id)
-    return jsonify({"success": True, "project": project, "roles": roles})
+    # Buffered in this worker and written in batches: no write per page view.
+    record_view(project_id)
+    return ok(project=project, roles=roles)
 
 
 @projects_bp.route("/api/roles/<int:role_id>/feedbacks", methods=["POST"])
 @login_required
+@rate_limit("feedback", "20/minute", key="user", burst=5)
 def submit_role_feedback(role_id: int):
     if request.content_type and request.content_type.startswith("multipart/form-data"):
         data = request.form or {}
@@ -311,25 +359,37 @@ def submit_role_feedback(role_id: int):
     user_id = request.current_user["user_id"]
 
     if not content:
-        return jsonify({"code": 400, "msg": "content is required"}), 400
+        return fail("content is required", 400)
 
     if upload_file and upload_file.filename:
+        # Upload handling is imported on the first file upload, not at worker startup.
+        try:
+            from .uploads import save_feedback_file
+        except ImportError:
+            from uploads import save_feedback_file
         try:
-            evidence_url = _save_feedback_file(upload_file)
+            evidence_url = save_feedback_file(upload_file)
         except ValueError as exc:
-            return jsonify({"code": 400, "msg": str(exc)}), 400
+            return fail(str(exc), 400)
 
     res = add_role_feedback(role_id=role_id, user_id=user_id, content=content, evidence_url=evidence_url)
     if res["code"] != 200:
-        return jsonify({"code": res["code"], "msg": res["msg"]}), res["code"]
-    return jsonify({"code": 200, "msg": "successfully submitted", "evidence_url": evidence_url})
+        return fail(res["msg"], res["code"])
+    return ok("successfully submitted", evidence_url=evidence_url)
 
 
 @projects_bp.route("/api/projects/<int:project_id>/feedbacks", methods=["GET"])
 def list_project_feedbacks(project_id: int):
     status = (request.args.get("status") or "").strip()
+    sync = ListSync(
+        "feedback",
+        "feedback_id",
+        scope={"project_id": project_id},
+        related={"role": "role_id"},
+        related_scope={"project_id": project_id},
+    )
     feedbacks = list_feedbacks_by_project(project_id, status or None)
-    return jsonify({"success": True, "feedbacks": feedbacks})
+    return sync.respond("feedbacks", feedbacks)
 
 
 @projects_bp.route("/api/feedbacks/<int:feedback_id>/status", methods=["PUT"])
@@ -338,43 +398,17 @@ def set_feedback_status(feedback_id: int):
     data = request.json or {}
     status = (data.get("status") or "").strip()
     if not status:
-        return jsonify({"code": 400, "msg": "status is required"}), 400
+        return fail("status is required", 400)
 
     user_id = request.current_user["user_id"]
     res = update_feedback_status(feedback_id=feedback_id, status=status, operator_user_id=user_id)
     if res["code"] != 200:
-        return jsonify({"code": res["code"], "msg": res["msg"]}), res["code"]
-    return jsonify({"code": 200, "msg": "updated"})
+        return fail(res["msg"], res["code"])
+    return ok("updated")
 
 
 def _normalize_role_name(name: str) -> str:
-    return re.sub(r"\s+", "", str(name or "")).strip()
-
-
-def _allowed_feedback_file(filename: str) -> bool:
-    ext = os.path.splitext(filename or "")[1].lower()
-    return ext in ALLOWED_FEEDBACK_EXTENSIONS
-
-
-def _save_feedback_file(file_storage) -> str:
-    filename = secure_filename(file_storage.filename or "")
-    if not filename:
-        raise ValueError("uploaded file is empty")
-    if not _allowed_feedback_file(filename):
-        raise ValueError("unsupported file type")
-
-    os.makedirs(FEEDBACK_UPLOAD_DIR, exist_ok=True)
-    file_storage.stream.seek(0, os.SEEK_END)
-    size = file_storage.stream.tell()
-    file_storage.stream.seek(0)
-    if size > MAX_FEEDBACK_FILE_SIZE:
-        raise ValueError("file is too large, max 20MB")
-
-    ext = os.path.splitext(filename)[1].lower()
-    saved_name = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:10]}{ext}"
-    save_path = os.path.join(FEEDBACK_UPLOAD_DIR, saved_name)
-    file_storage.save(save_path)
-    return f"/uploads/feedbacks/{saved_name}"
+    return _WHITESPACE.sub("", str(name or "")).strip()
 
 
 def _coerce_limit_num(value) -> int:
@@ -422,26 +456,6 @@ def _sanitize_text_field(value, fallback: str = "", max_len: int = 500) -> str:
     return text
 
 
-def _extract_json_object(text: str) -> dict:
-    raw = str(text or "").strip()
-    if not raw:
-        raise ValueError("empty model content")
-
-    fenced_match = re.search(r"```(?:json)?\s*(\{.*\})\s*```", raw, re.S)
-    if fenced_match:
-        raw = fenced_match.group(1).strip()
-    else:
-        start = raw.find("{")
-        end = raw.rfind("}")
-        if start >= 0 and end > start:
-            raw = raw[start : end + 1]
-
-    parsed = json.loads(raw)
-    if not isinstance(parsed, dict):
-        raise ValueError("model output is not a JSON object")
-    return parsed
-
-
 def _build_ai_contract_payload(project: dict, payload: dict) -> dict:
     project_name = (payload.get("project_name") or project.get("project_name") or "").strip()
     description = (payload.get("description") or project.get("description") or "").strip()
@@ -469,62 +483,12 @@ def _build_ai_contract_payload(project: dict, payload: dict) -> dict:
 
 
 def _call_deepseek_role_suggest(contract_payload: dict) -> dict:
-    api_key = os.environ.get("DEEPSEEK_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("DEEPSEEK_API_KEY is not configured")
-
-    system_prompt = (
-        "You are a project staffing assistant. "
-        "Return only valid JSON. "
-        "Generate practical roles for an enterprise-student collaboration project."
-    )
-    user_prompt = (
-        "Return a JSON object with keys roles, assumptions, questions_to_confirm.\n"
-        "roles must be a non-empty array.\n"
-        "Each role must contain role_name, task_desc, skill_require, limit_num, task_deadline.\n"
-        "role_name must be unique.\n"
-        "limit_num must be an integer between 1 and 3.\n"
-        "task_deadline must not be later than the project deadline when a deadline exists.\n"
-        "Keep the content concise and practical.\n"
-        f"Input JSON:\n{json.dumps(contract_payload, ensure_ascii=False)}"
-    )
-    body = {
-        "model": DEEPSEEK_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "response_format": {"type": "json_object"},
-        "temperature": 0.5,
-        "stream": False,
-    }
-
-    req = urllib_request.Request(
-        DEEPSEEK_API_URL,
-        data=json.dumps(body).encode("utf-8"),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-
+    # The HTTP client is imported on the first suggestion, not at worker startup.
     try:
-        with urllib_request.urlopen(req, timeout=DEEPSEEK_TIMEOUT) as resp:
-            raw = resp.read().decode("utf-8")
-    except urllib_error.HTTPError as exc:
-        detail = exc.read().decode("utf-8", errors="ignore")
-        raise RuntimeError(f"DeepSeek HTTP {exc.code}: {detail[:300]}") from exc
-    except urllib_error.URLError as exc:
-        raise RuntimeError(f"DeepSeek request failed: {exc.reason}") from exc
-
-    parsed = json.loads(raw)
-    choices = parsed.get("choices") or []
-    message = choices[0].get("message") if choices else {}
-    result = _extract_json_object((message or {}).get("content") or "")
-    if not isinstance(result.get("roles"), list) or not result.get("roles"):
-        raise ValueError("DeepSeek returned empty roles")
-    return result
+        from .ai_client import call_role_suggest
+    except ImportError:
+        from ai_client import call_role_suggest
+    return call_role_suggest(contract_payload)
 
 
 def _generate_stub_roles(description: str, project_deadline: str = "") -> list[dict]:
@@ -592,7 +556,12 @@ def _normalize_questions(items) -> list[str]:
     return values[:5]
 
 
-def _generate_role_suggestions(project: dict, payload: dict, existing_names: set[str]) -> dict:
+def _generate_role_suggestions(
+    project: dict,
+    payload: dict,
+    existing_names: set[str],
+    call_provider=None,
+) -> dict:
     contract_payload = _build_ai_contract_payload(project, payload)
     deadline = contract_payload["deadline"]
     project_name = contract_payload["project_name"]
@@ -604,7 +573,8 @@ def _generate_role_suggestions(project: dict, payload: dict, existing_names: set
     )
 
     try:
-        llm_result = _call_deepseek_role_suggest(contract_payload)
+        with AI_SUGGEST_LATENCY.time(provider="deepseek"):
+            llm_result = (call_provider or _call_deepseek_role_suggest)(contract_payload)
         roles = _clean_roles_for_persist(llm_result.get("roles") or [], deadline, existing_names)
         if not roles:
             raise ValueError("cleaned roles are empty")
@@ -619,6 +589,7 @@ def _generate_role_suggestions(project: dict, payload: dict, existing_names: set
         }
     except Exception as exc:
         logging.warning("ai-suggest fallback: %s", exc)
+        AI_SUGGEST_FALLBACKS.inc(reason=type(exc).__name__)
         return {
             "roles": fallback_roles,
             "assumptions": [
@@ -635,17 +606,20 @@ def _generate_role_suggestions(project: dict, payload: dict, existing_names: set
 @projects_bp.route("/api/projects/<int:project_id>/roles/ai-suggest", methods=["POST"])
 @login_required
 @role_required("企业")
+@rate_limit("ai_suggest", "10/minute", key="user", burst=3)
 def ai_suggest_project_roles(project_id: int):
     proj = get_project(project_id)
     if proj["code"] != 200:
-        return jsonify({"code": 404, "msg": "project not found", "data": None}), 404
+        return fail("project not found", 404, data=None)
 
     project = proj["data"] or {}
     if project.get("publisher_id") != request.current_user["user_id"]:
-        return jsonify({"code": 403, "msg": "forbidden", "data": None}), 403
+        return fail("forbidden", 403, data=None)
 
     payload = request.get_json(silent=True) or {}
-    existing_names = {_normalize_role_name(row.get("role_name", "")) for row in list_roles_by_project(project_id)}
+    existing_names = {
+        _normalize_role_name(row.get("role_name", "")) for row in list_roles_by_project(project_id, include_drafts=True)
+    }
     result = _generate_role_suggestions(project, payload, existing_names)
 
     logging.info(
@@ -655,4 +629,46 @@ def ai_suggest_project_roles(project_id: int):
         result["fallback_used"],
         len(result["roles"]),
     )
-    return jsonify({"code": 200, "msg": result["message"], "data": result})
+    return ok(result["message"], data=result)
+
+
+@projects_bp.route("/api/projects/roles/ai-suggest/batch", methods=["POST"])
+@login_required
+@role_required("企业")
+@rate_limit("ai_suggest_batch", "3/minute", key="user", burst=1)
+def ai_suggest_project_roles_batch():
+    payload = request.get_json(silent=True) or {}
+    project_ids = payload.get("project_ids") or []
+    if not isinstance(project_ids, list) or not project_ids:
+        return fail("project_ids 不能为空", 400, data=None)
+    if len(project_ids) > BATCH_MAX_PROJECTS:
+        return fail(f"单次最多 {BATCH_MAX_PROJECTS} 个项目", 400, data=None)
+    try:
+        project_ids = [int(pid) for pid in project_ids]
+    except (TypeError, ValueError):
+        return fail("project_ids 必须是整数列表", 400, data=None)
+
+    persist = payload.get("persist", True)
+    if not isinstance(persist, bool):
+        return fail("persist 必须是布尔值", 400, data=None)
+    max_roles = payload.get("max_roles", 4)
+    if isinstance(max_roles, bool) or not isinstance(max_roles, int):
+        return fail("max_roles 必须是整数", 400, data=None)
+
+    options = {}
+    if "max_workers" in payload:
+        try:
+            options["max_workers"] = int(payload.get("max_workers"))
+        except (TypeError, ValueError):
+            return fail("max_workers 必须是整数", 400, data=None)
+    report = run_role_suggest_batch(
+        project_ids,
+        suggest=_generate_role_suggestions,
+        call_provider=_call_deepseek_role_suggest,
+        normalize_name=_normalize_role_name,
+        publisher_id=request.current_user["user_id"],
+        persist=persist,
+        payload={"max_roles": max(1, min(5, max_roles))},
+        **options,
+    )
+    return ok("success", data=report)
@@ -0,0 +1,188 @@
+import os
+import threading
+from operator import itemgetter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    from .db import changed_user_ids, get_entity_tags, latest_change_seq, load_application_history, load_tag_entities
+    from .lifecycle import register_after_fork
+    from .matching import tag_weights
+except ImportError:
+    from db import changed_user_ids, get_entity_tags, latest_change_seq, load_application_history, load_tag_entities
+    from lifecycle import register_after_fork
+    from matching import tag_weights
+
+
+# "auto": NumPy when it is installed, else plain Python; "python": always plain Python. Both give the same scores.
+APPLICANT_SCORING = os.environ.get("APPLICANT_SCORING", "auto").strip().lower() or "auto"
+# Share of the 0-100 applicant score carried by each feature; every feature is in [0, 1].
+SCORE_WEIGHTS = (("skill", 0.5), ("history", 0.2), ("motivation", 0.15), ("keywords", 0.15))
+# Motivation length (characters) at which the length feature saturates.
+MOTIVATION_FULL_CHARS = 200
+# Cached students beyond this are dropped wholesale rather than tracked for recency.
+_FEATURE_CACHE_MAX = 200_000
+
+# NumPy is the largest import on the startup path, so it is loaded by the first ranking call (or a preload).
+np = None
+_numpy_checked = False
+
+StudentFeatures = Tuple[FrozenSet[int], int, int]
+
+
+class StudentFeatureCache:
+    """Per-student ranking features: skill tag ids, and accepted / reviewed application counts.
+
+    Follows change_log like the tag index: students whose profile or applications changed since
+    the last call are dropped, so a ranking call only loads students it has not seen or that changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq: Optional[int] = None
+        self._entries: Dict[int, StudentFeatures] = {}
+
+    def reset_after_fork(self) -> None:
+        # Entries loaded in the master stay valid: the next lookup catches up from change_log.
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        seq = latest_change_seq()
+        if self._seq is not None and seq <= self._seq:
+            return
+        changed = None if self._seq is None else changed_user_ids(self._seq, seq)
+        if changed is None or len(self._entries) > _FEATURE_CACHE_MAX:
+            self._entries = {}
+        else:
+            for user_id in changed:
+                self._entries.pop(user_id, None)
+        self._seq = seq
+
+    def get(self, student_ids: List[int]) -> Dict[int, StudentFeatures]:
+        with self._lock:
+            self._refresh()
+            entries = self._entries
+            missing = [sid for sid in set(student_ids) if sid not in entries]
+            if missing:
+                tags = load_tag_entities("user", missing)
+                history = load_application_history(missing)
+                for sid in missing:
+                    accepted, decided = history.get(sid, (0, 0))
+                    entries[sid] = (frozenset(tags[sid][0]) if sid in tags else frozenset(), accepted, decided)
+            return {sid: entries[sid] for sid in student_ids}
+
+
+_FEATURES = StudentFeatureCache()
+register_after_fork(_FEATURES.reset_after_fork)
+
+
+def load_numpy() -> bool:
+    """Import NumPy if it is installed; True when the NumPy scorer can be used."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np, _numpy_checked = numpy, True
+    return np is not None
+
+
+def _columns(rows: List[dict], features: Dict[int, StudentFeatures], tag_ids: List[int], keywords: List[str]):
+    # Raw per-applicant columns, each built by one comprehension or C-level map over the batch.
+    student_tags, accepted, decided = zip(*map(features.__getitem__, map(itemgetter("student_id"), rows)))
+    has_tag = [[tag_id in tags for tags in student_tags] for tag_id in tag_ids]
+    texts = [(text or "").strip() for text in map(itemgetter("motivation"), rows)]
+    length = list(map(len, texts))
+    lowered = list(map(str.casefold, texts))
+    has_keyword = [[keyword in text for text in lowered] for keyword in keywords]
+    return has_tag, list(accepted), list(decided), length, has_keyword
+
+
+def _score_numpy(columns, weights: List[float]) -> Tuple[List[List[float]], List[float]]:
+    has_tag, accepted, decided, length, has_keyword = columns
+    n = len(accepted)
+    features = np.zeros((len(SCORE_WEIGHTS), n), dtype=np.float64)
+    if weights:
+        w = np.asarray(weights, dtype=np.float64)
+        features[0] = (w @ np.asarray(has_tag, dtype=np.float64)) / w.sum()
+    features[1] = (np.asarray(accepted, dtype=np.float64) + 1) / (np.asarray(decided, dtype=np.float64) + 2)
+    features[2] = np.minimum(np.asarray(length, dtype=np.float64) / MOTIVATION_FULL_CHARS, 1.0)
+    if has_keyword:
+        features[3] = np.asarray(has_keyword, dtype=np.float64).mean(axis=0)
+    contributions = features * (np.asarray([share for _, share in SCORE_WEIGHTS]) * 100)[:, None]
+    return np.round(contributions.T, 2).tolist(), np.round(contributions.sum(axis=0), 2).tolist()
+
+
+def _score_python(columns, weights: List[float]) -> Tuple[List[List[float]], List[float]]:
+    has_tag, accepted, decided, length, has_keyword = columns
+    n = len(accepted)
+    total = sum(weights)
+    skill = [0.0] * n
+    for weight, column in zip(weights, has_tag):
+        skill = [s + weight if hit else s for s, hit in zip(skill, column)]
+    skill = [s / total for s in skill] if total else skill
+    history = [(a + 1) / (d + 2) for a, d in zip(accepted, decided)]
+    motivation = [min(chars / MOTIVATION_FULL_CHARS, 1.0) for chars in length]
+    keywords = [0.0] * n
+    for column in has_keyword:
+        keywords = [k + hit for k, hit in zip(keywords, column)]
+    keywords = [k / len(has_keyword) for k in keywords] if has_keyword else keywords
+    (_, ws), (_, wh), (_, wm), (_, wk) = SCORE_WEIGHTS
+    contributions = [[s * ws * 100, h * wh * 100, m * wm * 100, k * wk * 100] for s, h, m, k in zip(skill, history, motivation, keywords)]
+    return [[round(c, 2) for c in row] for row in contributions], [round(sum(row), 2) for row in contributions]
+
+
+def _labels(columns: List[List[bool]], names: List[str], n: int) -> List[List[str]]:
+    # Names set in each row; rows share one list per distinct combination (at most 2**len(names), usually few).
+    codes = [0] * n
+    for bit, column in enumerate(columns):
+        flag = 1 << bit
+        codes = [code | flag if hit else code for code, hit in zip(codes, column)]
+    by_code: Dict[int, List[str]] = {}
+    labels = []
+    for code in codes:
+        label = by_code.get(code)
+        if label is None:
+            label = by_code[code] = [name for bit, name in enumerate(names) if code >> bit & 1]
+        labels.append(label)
+    return labels
+
+
+def rank_applications(role_id: int, rows: List[dict]) -> List[dict]:
+    """Score every application of a role in one batch and return the rows best first.
+
+    Each row gains `score` (0-100) and `score_detail`: the points each feature contributed (skill
+    match, acceptance history, motivation length, role skills mentioned in the motivation) and the
+    evidence behind them. Ties keep the incoming order (newest application first).
+    """
+    if not rows:
+        return rows
+    role_tags = get_entity_tags("role", role_id)
+    tag_ids = [t["tag_id"] for t in role_tags]
+    names = [t["name"] for t in role_tags]
+    idf = tag_weights("user", tag_ids)
+    features = _FEATURES.get([row["student_id"] for row in rows])
+
+    columns = _columns(rows, features, tag_ids, names)
+    points, scores = (_score_numpy if APPLICANT_SCORING != "python" and load_numpy() else _score_python)(columns, [idf[tag_id] for tag_id in tag_ids])
+
+    has_tag, accepted, decided, length, has_keyword = columns
+    matched = _labels(has_tag, names, len(rows))
+    mentioned = _labels(has_keyword, names, len(rows))
+    for row, score, (skill, history, motivation, keywords), tags, words, acc, rev, chars in zip(
+        rows, scores, points, matched, mentioned, accepted, decided, length
+    ):
+        row["score"] = score
+        row["score_detail"] = {
+            "skill": skill,
+            "history": history,
+            "motivation": motivation,
+            "keywords": keywords,
+            "matched_tags": tags,
+            "mentioned_tags": words,
+            "accepted": acc,
+            "reviewed": rev,
+            "motivation_chars": chars,
+        }
+    order = sorted(range(len(rows)), key=scores.__getitem__, reverse=True)
+    return [rows[i] for i in order]
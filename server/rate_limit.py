@@ -0,0 +1,255 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import make_response, request
+
+try:
+    from .db import DB_PATH
+    from .lifecycle import register_after_fork
+    from .metrics import RATE_LIMITED
+    from .responses import fail
+except ImportError:
+    from db import DB_PATH
+    from lifecycle import register_after_fork
+    from metrics import RATE_LIMITED
+    from responses import fail
+
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+# "sqlite" shares buckets across gunicorn workers on one host; "memory" keeps them per process.
+RATE_LIMIT_STORE = os.environ.get("RATE_LIMIT_STORE", "sqlite").strip().lower() or "sqlite"
+RATE_LIMIT_DB = os.environ.get("RATE_LIMIT_DB", "").strip() or os.path.join(
+    tempfile.gettempdir(), f"cp-ratelimit-{hashlib.md5(DB_PATH.encode('utf-8')).hexdigest()[:12]}.db"
+)
+# Per-rule overrides, e.g. "login=30/minute,apply=60/minute:20" (":20" sets the burst).
+RATE_LIMIT_RULES = os.environ.get("RATE_LIMIT_RULES", "").strip()
+
+
+def _trusted_proxies(value: str) -> int:
+    value = value.strip().lower()
+    if value in ("true", "yes", "on"):
+        return 1
+    return int(value) if value.isdigit() else 0
+
+
+# Number of reverse proxies in front of the app that append to X-Forwarded-For (0: use the socket address).
+# The client is the address the outermost trusted proxy saw, N entries from the right; anything left of it
+# was written by the client and is ignored.
+RATE_LIMIT_TRUST_PROXY = _trusted_proxies(os.environ.get("RATE_LIMIT_TRUST_PROXY", "0"))
+
+KEY_TYPES = {"ip", "user"}
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Idle buckets older than this have refilled completely and can be dropped.
+_PRUNE_AFTER = 86400
+_PRUNE_EVERY = 1000
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    rate: float  # tokens per second
+    burst: float
+    key: str
+
+
+def parse_limit(text: str) -> Tuple[float, float]:
+    """Parse "10/minute" into (10/60 tokens per second, burst 10); "10/minute:20" sets the burst to 20."""
+    spec, _, burst = text.strip().partition(":")
+    count, _, period = spec.partition("/")
+    seconds = _PERIODS.get(period.strip().lower().rstrip("s") or "second")
+    if seconds is None:
+        raise ValueError(f"未知的限流周期：{text}")
+    count_value = float(count)
+    if count_value <= 0:
+        raise ValueError(f"限流次数必须大于 0：{text}")
+    return count_value / seconds, float(burst) if burst else count_value
+
+
+def _rule_overrides() -> Dict[str, str]:
+    overrides = {}
+    for part in filter(None, (p.strip() for p in RATE_LIMIT_RULES.split(","))):
+        name, _, limit = part.partition("=")
+        overrides[name.strip()] = limit.strip()
+    return overrides
+
+
+# ===== Stores =====
+
+
+class MemoryStore:
+    def __init__(self):
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = burst if bucket is None else min(burst, bucket[0] + max(0.0, now - bucket[1]) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = [tokens, now]
+            self._checks += 1
+            if self._checks % _PRUNE_EVERY == 0:
+                cutoff = now - _PRUNE_AFTER
+                for stale in [k for k, v in self._buckets.items() if v[1] < cutoff]:
+                    del self._buckets[stale]
+        return allowed, tokens
+
+
+class SQLiteStore:
+    # One upsert per check: every SET expression sees the old row, so refill + take is atomic.
+    _UPSERT_SQL = """
+        INSERT INTO rate_bucket (bucket_key, tokens, updated, allowed) VALUES (:key, :burst - 1, :now, 1)
+        ON CONFLICT(bucket_key) DO UPDATE SET
+            tokens = MIN(:burst, tokens + MAX(0, :now - updated) * :rate)
+                     - (MIN(:burst, tokens + MAX(0, :now - updated) * :rate) >= 1),
+            allowed = MIN(:burst, tokens + MAX(0, :now - updated) * :rate) >= 1,
+            updated = :now
+    """
+    _SELECT_SQL = "SELECT allowed, tokens FROM rate_bucket WHERE bucket_key = :key"
+    # RETURNING needs SQLite 3.35; older libraries read the row back in the same write transaction.
+    supports_returning = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._checks = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            # A plain connection on its own file: limiter traffic stays out of the app's SQL metrics and locks.
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_bucket (
+                    bucket_key TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    allowed INTEGER NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> Tuple[bool, float]:
+        conn = self._connection()
+        params = {"key": key, "rate": rate, "burst": burst, "now": now}
+        if self.supports_returning:
+            row = conn.execute(self._UPSERT_SQL + " RETURNING allowed, tokens", params).fetchone()
+        else:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(self._UPSERT_SQL, params)
+                row = conn.execute(self._SELECT_SQL, params).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self._checks += 1
+        if self._checks % _PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM rate_bucket WHERE updated < ?", (now - _PRUNE_AFTER,))
+        return bool(row[0]), float(row[1])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteStore(RATE_LIMIT_DB) if RATE_LIMIT_STORE == "sqlite" else MemoryStore()
+    return _store
+
+
+@register_after_fork
+def _reset_store_after_fork() -> None:
+    # Each worker opens its own limiter connection (or memory buckets) on first use.
+    global _store, _store_lock
+    _store, _store_lock = None, threading.Lock()
+
+
+# ===== Decorator =====
+
+
+def client_ip() -> str:
+    # Same rule as werkzeug's ProxyFix(x_for=N): with fewer hops than trusted proxies, the header is not trusted.
+    if RATE_LIMIT_TRUST_PROXY:
+        hops = [hop.strip() for hop in request.headers.get("X-Forwarded-For", "").split(",") if hop.strip()]
+        if len(hops) >= RATE_LIMIT_TRUST_PROXY:
+            return hops[-RATE_LIMIT_TRUST_PROXY]
+    return request.remote_addr or "unknown"
+
+
+def _bucket_key(rule: Rule) -> str:
+    user = getattr(request, "current_user", None)
+    if rule.key == "user" and user:
+        return f"{rule.name}:user:{user['user_id']}"
+    return f"{rule.name}:ip:{client_ip()}"
+
+
+def check_rate_limit(rule: Rule) -> Tuple[bool, float, float]:
+    """Take one token for the current request. Returns (allowed, remaining, retry_after_seconds)."""
+    try:
+        allowed, tokens = _get_store().take(_bucket_key(rule), rule.rate, rule.burst, time.time())
+    except sqlite3.Error as exc:
+        # Fail open: a limiter problem must not take the endpoint down with it.
+        logging.warning("rate limit store unavailable: %s", exc)
+        return True, rule.burst, 0.0
+    retry_after = 0.0 if allowed else (1 - tokens) / rule.rate
+    return allowed, max(0.0, tokens), retry_after
+
+
+def rate_limit(name: str, limit: str, key: str = "ip", burst: Optional[float] = None):
+    """Limit a route with a token bucket. Place below @login_required so key="user" can see the user.
+
+    `limit` is "<count>/<second|minute|hour|day>"; RATE_LIMIT_RULES can override it per name.
+    """
+    if key not in KEY_TYPES:
+        raise ValueError(f"key 仅支持：{'/'.join(sorted(KEY_TYPES))}")
+    override = _rule_overrides().get(name)
+    rate, default_burst = parse_limit(override or limit)
+    rule = Rule(name=name, rate=rate, burst=default_burst if override or burst is None else float(burst), key=key)
+
+    def decorator(fn: Callable):
+        if not RATE_LIMIT_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            allowed, remaining, retry_after = check_rate_limit(rule)
+            if not allowed:
+                RATE_LIMITED.inc(rule=rule.name)
+                seconds = max(1, math.ceil(retry_after))
+                resp = make_response(fail(f"请求过于频繁，请 {seconds} 秒后重试", 429))
+                resp.headers["Retry-After"] = str(seconds)
+                resp.headers["X-RateLimit-Limit"] = str(int(rule.burst))
+                resp.headers["X-RateLimit-Remaining"] = "0"
+                return resp
+            resp = make_response(fn(*args, **kwargs))
+            resp.headers["X-RateLimit-Limit"] = str(int(rule.burst))
+            resp.headers["X-RateLimit-Remaining"] = str(int(remaining))
+            return resp
+
+        wrapper.rate_limit_rule = rule
+        return wrapper
+
+    return decorator
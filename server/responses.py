@@ -0,0 +1,161 @@
+import gzip
+import os
+import sqlite3
+from typing import Optional, Tuple
+
+from flask import Response, has_request_context, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# "auto": orjson when it is installed, else the stdlib encoder; "stdlib": always the stdlib encoder.
+JSON_ENCODER = os.environ.get("JSON_ENCODER", "auto").strip().lower() or "auto"
+# JSON bodies at least this large are sent gzip/br-compressed when the client accepts it; 0 disables.
+RESPONSE_COMPRESS_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESS_MIN_BYTES", "2048").strip() or "2048")
+RESPONSE_GZIP_LEVEL = int(os.environ.get("RESPONSE_GZIP_LEVEL", "5").strip() or "5")
+RESPONSE_BROTLI_QUALITY = int(os.environ.get("RESPONSE_BROTLI_QUALITY", "4").strip() or "4")
+
+_USE_ORJSON = orjson is not None and JSON_ENCODER != "stdlib"
+
+
+# ===== Envelope =====
+# Every endpoint answers {"success": bool, "message"?: str, ...payload}; failures carry the HTTP status.
+
+
+def ok(message: Optional[str] = None, status: int = 200, **payload) -> Tuple[Response, int]:
+    body = {"success": True}
+    if message is not None:
+        body["message"] = message
+    body.update(payload)
+    return jsonify(body), status
+
+
+def fail(message: str, status: int = 400, **payload) -> Tuple[Response, int]:
+    return jsonify({"success": False, "message": message, **payload}), status
+
+
+# ===== Serialization =====
+
+
+def _default(o):
+    # Lets helpers hand rows from the cursor straight to jsonify().
+    if isinstance(o, sqlite3.Row):
+        return dict(o)
+    return DefaultJSONProvider.default(o)
+
+
+def requested_fields() -> Optional[Tuple[str, ...]]:
+    """Columns asked for with ?fields=a,b on a GET, or None for full rows."""
+    if not has_request_context() or request.method != "GET":
+        return None
+    raw = request.args.get("fields")
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    return fields or None
+
+
+def _project_row(row, fields: Tuple[str, ...]):
+    if isinstance(row, sqlite3.Row):
+        row = dict(row)
+    if isinstance(row, dict):
+        return {f: row[f] for f in fields if f in row}
+    return row
+
+
+def _project_rows(value, fields: Tuple[str, ...]):
+    if not isinstance(value, list):
+        return value
+    return [_project_row(row, fields) for row in value]
+
+
+def project_fields(obj, fields: Tuple[str, ...]):
+    # Only the row lists are trimmed (top level or one level down, e.g. data.users); envelope keys stay.
+    if not isinstance(obj, dict):
+        return obj
+    out = {}
+    for key, value in obj.items():
+        if isinstance(value, dict):
+            value = {k: _project_rows(v, fields) for k, v in value.items()}
+        out[key] = _project_rows(value, fields)
+    return out
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson when available and applies ?fields= projection.
+
+    Response bodies match the default provider's (compact separators, sorted keys, raw UTF-8),
+    except that orjson writes float exponents as 1e20 rather than 1e+20.
+    """
+
+    default = staticmethod(_default)
+
+    def _orjson(self, obj) -> bytes:
+        # datetimes go through _default so they come out as HTTP dates, like Flask's encoder.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        if _USE_ORJSON and not kwargs and not self.ensure_ascii:
+            return self._orjson(obj).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def dump_bytes(self, obj) -> bytes:
+        if _USE_ORJSON and not self.ensure_ascii:
+            return self._orjson(obj)
+        return super().dumps(obj).encode("utf-8")
+
+    def response(self, *args, **kwargs) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        fields = requested_fields()
+        if fields:
+            obj = project_fields(obj, fields)
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Pretty-printed debug output stays on the stdlib path.
+            return super().response(obj)
+        # Encoded straight to bytes: no intermediate str for the response body.
+        return self._app.response_class(self.dump_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+# ===== Compression =====
+
+
+def compress_response(response: Response) -> Response:
+    if (
+        RESPONSE_COMPRESS_MIN_BYTES <= 0
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < RESPONSE_COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add("Accept-Encoding")
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        response.set_data(brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY))
+        response.headers["Content-Encoding"] = "br"
+    elif accepted["gzip"]:
+        response.set_data(gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def init_responses(app) -> None:
+    provider = FastJSONProvider(app)
+    provider.ensure_ascii = app.json.ensure_ascii
+    app.json = provider
+    app.after_request(compress_response)
@@ -0,0 +1,133 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+try:
+    from .db import DRAFT_ROLE_STATUS, get_project, list_roles_by_project, role_add_many
+except ImportError:
+    from db import DRAFT_ROLE_STATUS, get_project, list_roles_by_project, role_add_many
+
+
+BATCH_MAX_PROJECTS = 50
+BATCH_MAX_WORKERS = 8
+DEFAULT_BATCH_WORKERS = int(os.environ.get("AI_BATCH_WORKERS", "4").strip() or "4")
+DEFAULT_PROVIDER_RATE = float(os.environ.get("AI_BATCH_RATE_PER_SEC", "2").strip() or "2")
+
+
+class ProviderRateLimiter:
+    # 让所有工作线程的模型调用之间至少间隔 1/rate 秒
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _rate_limited(call_provider: Callable, limiter: ProviderRateLimiter) -> Callable:
+    def wrapper(contract_payload: dict) -> dict:
+        # 本地兜底不占用模型调用名额，离线运行不限速
+        if os.environ.get("DEEPSEEK_API_KEY", "").strip():
+            limiter.acquire()
+        return call_provider(contract_payload)
+
+    return wrapper
+
+
+def _suggest_one(
+    project_id: int,
+    suggest: Callable,
+    call_provider: Callable,
+    publisher_id: Optional[int],
+    persist: bool,
+    payload: dict,
+    normalize_name: Callable,
+) -> dict:
+    proj = get_project(project_id)
+    if proj["code"] != 200:
+        return {"project_id": project_id, "ok": False, "message": proj["msg"]}
+    project = proj["data"] or {}
+    if publisher_id is not None and project.get("publisher_id") != publisher_id:
+        return {"project_id": project_id, "ok": False, "message": "项目不存在或无权限"}
+
+    existing_names = {
+        normalize_name(row.get("role_name", "")) for row in list_roles_by_project(project_id, include_drafts=True)
+    }
+    started = time.perf_counter()
+    result = suggest(project, payload, existing_names, call_provider=call_provider)
+    item = {
+        "project_id": project_id,
+        "ok": True,
+        "provider": result["provider"],
+        "fallback_used": result["fallback_used"],
+        "role_count": len(result["roles"]),
+        "suggest_ms": round((time.perf_counter() - started) * 1000, 1),
+        "roles": result["roles"],
+    }
+    if persist and result["roles"]:
+        res = role_add_many(project_id, result["roles"], role_status=DRAFT_ROLE_STATUS)
+        if res["code"] != 200:
+            return {"project_id": project_id, "ok": False, "message": res["msg"]}
+        item["role_ids"] = [row["role_id"] for row in res["data"]["roles"]]
+    return item
+
+
+def run_role_suggest_batch(
+    project_ids: Iterable[int],
+    suggest: Callable,
+    call_provider: Callable,
+    normalize_name: Callable,
+    publisher_id: Optional[int] = None,
+    persist: bool = True,
+    payload: Optional[dict] = None,
+    max_workers: int = DEFAULT_BATCH_WORKERS,
+    rate_per_sec: float = DEFAULT_PROVIDER_RATE,
+) -> dict:
+    ids = list(dict.fromkeys(int(pid) for pid in project_ids))
+    workers = max(1, min(BATCH_MAX_WORKERS, int(max_workers or 1), len(ids) or 1))
+    provider = _rate_limited(call_provider, ProviderRateLimiter(rate_per_sec))
+
+    def task(project_id: int) -> dict:
+        try:
+            return _suggest_one(project_id, suggest, provider, publisher_id, persist, payload or {}, normalize_name)
+        except Exception as exc:
+            logging.warning("ai-suggest batch project_id=%s failed: %s", project_id, exc)
+            return {"project_id": project_id, "ok": False, "message": str(exc)}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-suggest") as pool:
+        outcomes = list(pool.map(task, ids))
+    elapsed = time.perf_counter() - started
+
+    results = [o for o in outcomes if o["ok"]]
+    failures = [{"project_id": o["project_id"], "message": o["message"]} for o in outcomes if not o["ok"]]
+    logging.info(
+        "ai-suggest batch projects=%s ok=%s failed=%s workers=%s elapsed=%.2fs",
+        len(ids),
+        len(results),
+        len(failures),
+        workers,
+        elapsed,
+    )
+    return {
+        "total": len(ids),
+        "succeeded": len(results),
+        "failed": len(failures),
+        "workers": workers,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "projects_per_sec": round(len(ids) / elapsed, 2) if elapsed > 0 else None,
+        "fallback_count": sum(1 for r in results if r["fallback_used"]),
+        "results": results,
+        "failures": failures,
+    }
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import List, Optional
+
+try:
+    from .instrumentation import QUERY_LISTENERS
+    from .lifecycle import register_after_fork
+except ImportError:
+    from instrumentation import QUERY_LISTENERS
+    from lifecycle import register_after_fork
+
+
+# Opt-in: timing every statement means wrapping every connection (server/instrumentation.py).
+SLOW_QUERY_ENABLED = os.environ.get("SLOW_QUERY_ENABLED", "").strip().lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100").strip() or "100")
+SLOW_QUERY_BUFFER = int(os.environ.get("SLOW_QUERY_BUFFER", "200").strip() or "200")
+SLOW_QUERY_LOG_FILE = os.environ.get("SLOW_QUERY_LOG_FILE", "").strip()
+# Shared with server/metrics.py: each worker keeps its buffer in slow-queries-{pid}.json there, so any
+# worker can list (and clear) the entries of all of them. Unset, the buffer is per process.
+SLOW_QUERY_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "").strip()
+
+slow_query_logger = logging.getLogger("server.slow_query")
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"IN\s*\((?:\s*\?\s*,)+\s*\?\s*\)", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+_entries: deque = deque(maxlen=max(1, SLOW_QUERY_BUFFER))
+_lock = threading.Lock()
+# Whether this process has written its file; if it is gone since, another worker cleared the log.
+_written = False
+_DB_MODULE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db.py")
+
+
+def normalize_sql(sql: str) -> str:
+    text = _STRING_LITERAL.sub("?", sql)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    # Collapse variable-length IN lists so the same query groups under one shape.
+    return _IN_LIST.sub("IN (?...)", text)
+
+
+def _value_shape(value) -> str:
+    if isinstance(value, str):
+        return f"str({len(value)})"
+    if isinstance(value, bytes):
+        return f"bytes({len(value)})"
+    return type(value).__name__
+
+
+def param_shape(params, many: bool):
+    if many:
+        rows = list(params or [])
+        first = param_shape(rows[0], False) if rows else []
+        return {"rows": len(rows), "first": first}
+    if isinstance(params, dict):
+        return {k: _value_shape(v) for k, v in params.items()}
+    return [_value_shape(v) for v in (params or ())]
+
+
+def _calling_db_function() -> Optional[str]:
+    # The outermost db.py frame is the public helper; inner ones are shared internals like _log_change.
+    name = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        if os.path.abspath(frame.f_code.co_filename) == _DB_MODULE_FILE:
+            name = frame.f_code.co_name
+        frame = frame.f_back
+    return name
+
+
+def _explain(conn, sql: str, params, many: bool) -> List[str]:
+    if not isinstance(conn, sqlite3.Connection) or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return []
+    if many:
+        params = next(iter(params or []), ())
+    # A plain sqlite3.Cursor bypasses the instrumented cursor, so EXPLAIN is not itself recorded.
+    cur = sqlite3.Cursor(conn)
+    try:
+        cur.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+        return [str(row[-1]) for row in cur.fetchall()]
+    except sqlite3.Error as exc:
+        return [f"explain failed: {exc}"]
+    finally:
+        cur.close()
+
+
+def _record_slow_query(event) -> None:
+    duration_ms = event.elapsed * 1000
+    if duration_ms < SLOW_QUERY_MS or event.sql in ("COMMIT", "ROLLBACK"):
+        return
+    entry = {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "duration_ms": round(duration_ms, 2),
+        "sql": normalize_sql(event.sql),
+        "params": param_shape(event.params, event.many),
+        "rows": event.rows,
+        "function": _calling_db_function(),
+        "plan": _explain(event.conn, event.sql, event.params, event.many),
+        "pid": os.getpid(),
+    }
+    with _lock:
+        if SLOW_QUERY_DIR and _written and not os.path.exists(_path(os.getpid())):
+            _entries.clear()
+        _entries.append(entry)
+        _write_entries()
+    slow_query_logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+def _path(name) -> str:
+    return os.path.join(SLOW_QUERY_DIR, f"slow-queries-{name}.json")
+
+
+def _write_entries() -> None:
+    # Caller holds _lock. Slow queries are rare, so the whole buffer is rewritten on each one.
+    global _written
+    if not SLOW_QUERY_DIR:
+        return
+    path = _path(os.getpid())
+    try:
+        os.makedirs(SLOW_QUERY_DIR, exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(list(_entries), f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+        _written = True
+    except OSError as exc:
+        logging.warning("slow query buffer write failed: %s", exc)
+
+
+def _files() -> List[str]:
+    try:
+        names = os.listdir(SLOW_QUERY_DIR)
+    except OSError:
+        return []
+    return [
+        os.path.join(SLOW_QUERY_DIR, name)
+        for name in names
+        if name.startswith("slow-queries-") and (name.endswith(".json") or name.endswith(".tmp"))
+    ]
+
+
+def _read(path: str) -> List[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def list_slow_queries(limit: int = 50) -> List[dict]:
+    if not SLOW_QUERY_DIR:
+        with _lock:
+            items = list(_entries)
+        return list(reversed(items))[: max(1, limit)]
+    items = [entry for path in _files() if path.endswith(".json") for entry in _read(path)]
+    items.sort(key=lambda entry: entry["time"], reverse=True)
+    return items[: max(1, limit)]
+
+
+def clear_slow_queries() -> int:
+    """Empty the buffer: every worker's when they share SLOW_QUERY_DIR (also run by the gunicorn master at startup)."""
+    with _lock:
+        count = len(_entries)
+        _entries.clear()
+    if SLOW_QUERY_DIR:
+        count = 0
+        for path in _files():
+            if path.endswith(".json"):
+                count += len(_read(path))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return count
+
+
+def mark_process_dead(pid: int) -> None:
+    """Fold an exited worker's entries into slow-queries-archive.json (gunicorn child_exit), keeping the newest."""
+    if not SLOW_QUERY_DIR or not os.path.exists(_path(pid)):
+        return
+    archive = _read(_path("archive")) + _read(_path(pid))
+    archive.sort(key=lambda entry: entry["time"])
+    try:
+        with open(f"{_path('archive')}.tmp", "w", encoding="utf-8") as f:
+            json.dump(archive[-max(1, SLOW_QUERY_BUFFER):], f, ensure_ascii=False)
+        os.replace(f"{_path('archive')}.tmp", _path("archive"))
+        os.remove(_path(pid))
+    except OSError as exc:
+        logging.warning("slow query archive write failed: %s", exc)
+
+
+@register_after_fork
+def _reset_after_fork() -> None:
+    # Slow queries from the master's startup stay in the master's file, not in every worker's buffer.
+    global _lock, _written
+    _lock = threading.Lock()
+    _written = False
+    _entries.clear()
+
+
+def init_slow_query_log() -> None:
+    if not SLOW_QUERY_ENABLED or _record_slow_query in QUERY_LISTENERS:
+        return
+    QUERY_LISTENERS.append(_record_slow_query)
+    if SLOW_QUERY_LOG_FILE:
+        handler = RotatingFileHandler(SLOW_QUERY_LOG_FILE, maxBytes=5 * 1024 * 1024, backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(process)d %(message)s"))
+        slow_query_logger.addHandler(handler)
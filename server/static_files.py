@@ -0,0 +1,57 @@
+import mimetypes
+import os
+import re
+from typing import Optional
+
+from flask import Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+FRONTEND_DIR = os.path.join(BASE_DIR, "frontend")
+# Output of scripts/build_frontend.py; used whenever it has been built (its manifest.json exists).
+FRONTEND_DIST_DIR = os.environ.get("FRONTEND_DIST_DIR", "").strip() or os.path.join(FRONTEND_DIR, "dist")
+
+# Fingerprinted names change with their content, so they can be cached for good.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+_FINGERPRINTED = re.compile(r"\.[0-9a-f]{10}\.[A-Za-z0-9]+$")
+# Precompressed siblings written by the build, in order of preference.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _dist_enabled() -> bool:
+    return os.path.isfile(os.path.join(FRONTEND_DIST_DIR, "manifest.json"))
+
+
+def _resolve(filename: str) -> Optional[str]:
+    roots = (FRONTEND_DIST_DIR, FRONTEND_DIR) if _dist_enabled() else (FRONTEND_DIR,)
+    for root in roots:
+        path = safe_join(root, filename)
+        if path is not None and os.path.isfile(path):
+            return path
+    return None
+
+
+def send_frontend_file(filename: str) -> Response:
+    """Serve a frontend file, preferring the built copy and its precompressed .br/.gz sibling.
+
+    Fingerprinted assets get a one-year immutable Cache-Control; pages are revalidated on every visit.
+    Files the build does not produce (e.g. uploads) come from frontend/ as before.
+    """
+    path = _resolve(filename)
+    if path is None:
+        abort(404)
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    original, encoding = path, None
+    for name, suffix in _ENCODINGS:
+        if request.accept_encodings[name] and os.path.isfile(original + suffix):
+            encoding, path = name, original + suffix
+            break
+
+    response = send_file(path, mimetype=mimetype, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if encoding or any(os.path.isfile(original + suffix) for _, suffix in _ENCODINGS):
+        response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE if _FINGERPRINTED.search(filename) else "no-cache"
+    return response
@@ -0,0 +1,85 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from flask import request
+
+try:
+    from .db import changes_since, latest_change_seq, prune_change_log, require_read_seq
+    from .responses import ok
+except ImportError:
+    from db import changes_since, latest_change_seq, prune_change_log, require_read_seq
+    from responses import ok
+
+
+# Clients further behind than this get the full list again instead of a delta.
+CHANGE_LOG_RETENTION_HOURS = float(os.environ.get("CHANGE_LOG_RETENTION_HOURS", "168").strip() or "168")
+_PRUNE_EVERY = 3600
+_last_prune = 0.0
+
+
+def parse_since(value: Optional[str]) -> Optional[int]:
+    # Anything unparseable is treated as "no cursor": the full list is always a correct answer.
+    try:
+        since = int((value or "").strip())
+    except ValueError:
+        return None
+    return since if since >= 0 else None
+
+
+def _maybe_prune() -> None:
+    global _last_prune
+    if time.time() - _last_prune < _PRUNE_EVERY:
+        return
+    _last_prune = time.time()
+    cutoff = (datetime.now() - timedelta(hours=CHANGE_LOG_RETENTION_HOURS)).strftime("%Y-%m-%d %H:%M:%S")
+    prune_change_log(cutoff)
+
+
+class ListSync:
+    """Answer a list endpoint in full or, with ?since=<seq>, as changed rows plus tombstones.
+
+    Create it before loading the rows: the log position is read first, so a write that commits
+    while the list is loading is sent again with the next delta instead of being skipped.
+    """
+
+    def __init__(
+        self,
+        entity: str,
+        id_field: str,
+        scope: Optional[Dict[str, int]] = None,
+        related: Optional[Dict[str, str]] = None,
+        related_scope: Optional[Dict[str, int]] = None,
+    ):
+        self.entity = entity
+        self.id_field = id_field
+        self.scope = scope or {}
+        # Other entities shown inside each row (e.g. a role name), mapped to the row column holding their id.
+        self.related = related or {}
+        self.related_scope = related_scope or {}
+        self.since = parse_since(request.args.get("since"))
+        self.seq = latest_change_seq()
+        # The rows must be at least as new as the seq handed back, even if the snapshot is swapped meanwhile.
+        require_read_seq(self.seq)
+
+    def respond(self, key: str, rows: List[dict]):
+        changes = None
+        if self.since is not None:
+            scopes = {self.entity: self.scope, **{entity: self.related_scope for entity in self.related}}
+            changes = changes_since(self.since, self.seq, scopes)
+        _maybe_prune()
+        if changes is None:
+            return ok(**{key: rows}, seq=self.seq, full=True)
+
+        changed = changes[self.entity]
+        delta = [
+            row
+            for row in rows
+            if row[self.id_field] in changed
+            or any(row.get(column) in changes[entity] for entity, column in self.related.items())
+        ]
+        present = {row[self.id_field] for row in rows}
+        # Deleted rows and rows that no longer match this list's filters both leave the client's copy.
+        deleted = sorted(row_id for row_id in changed if row_id not in present)
+        return ok(**{key: delta}, deleted=deleted, seq=self.seq, full=False)
@@ -1,84 +1,124 @@
-from flask import Blueprint, jsonify, request
+import os
+import threading
+from typing import Dict, FrozenSet, Optional, Tuple
 
-from .auth import login_required
-from .db import get_db_connection
+from flask import Blueprint, request
+
+try:
+    from .auth import login_required
+    from .db import changed_project_ids, changed_user_ids, get_project_team, latest_change_seq
+    from .lifecycle import register_after_fork
+    from .metrics import record_cache_lookup
+    from .responses import fail, ok
+except ImportError:
+    from auth import login_required
+    from db import changed_project_ids, changed_user_ids, get_project_team, latest_change_seq
+    from lifecycle import register_after_fork
+    from metrics import record_cache_lookup
+    from responses import fail, ok
 
 
 team_bp = Blueprint("team", __name__)
 
+# Cached teams beyond this are dropped wholesale rather than tracked for recency.
+TEAM_CACHE_MAX = int(os.environ.get("TEAM_CACHE_MAX", "2048").strip() or "2048")
+
+TeamEntry = Tuple[dict, FrozenSet[int]]
+
+
+class TeamCache:
+    """Per-project team views (see get_project_team) with the member ids used for visibility checks.
+
+    Follows change_log like the tag index: before each lookup, teams of projects whose project, role
+    or application rows changed since the last one (review_application, apply/cancel, role edits)
+    are dropped, as are teams containing a user whose profile changed. Everything is dropped when
+    the log cannot answer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq: Optional[int] = None
+        self._teams: Dict[int, TeamEntry] = {}
+
+    def reset_after_fork(self) -> None:
+        # Teams loaded in the master stay valid: the next lookup catches up from change_log.
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> int:
+        """Catch up with change_log; returns the seq the cache is now valid at.
+
+        The log queries run outside the lock; their result is applied only if no other thread has
+        already moved the cache to seq or beyond (compare-and-set on _seq).
+        """
+        seq = latest_change_seq()
+        with self._lock:
+            base, size = self._seq, len(self._teams)
+        if base is not None and seq <= base:
+            return base
+        projects = users = None
+        if base is not None and size <= TEAM_CACHE_MAX:
+            projects = changed_project_ids(base, seq)
+            users = changed_user_ids(base, seq, ("user",)) if projects is not None else None
+        with self._lock:
+            if self._seq is not None and self._seq >= seq:
+                return self._seq
+            # Another thread may have advanced to a seq between base and seq; (base, seq] still covers the rest.
+            if projects is None or users is None:
+                self._teams = {}
+            else:
+                for project_id in projects:
+                    self._teams.pop(project_id, None)
+                if users:
+                    changed = set(users)
+                    for project_id in [pid for pid, (_, members) in self._teams.items() if members & changed]:
+                        del self._teams[project_id]
+            self._seq = seq
+        return seq
+
+    def get(self, project_id: int) -> Optional[TeamEntry]:
+        # Only dict access happens under the lock: a slow project's query never blocks other projects.
+        seq = self._refresh()
+        with self._lock:
+            entry = self._teams.get(project_id)
+        record_cache_lookup("team", entry is not None)
+        if entry is not None:
+            return entry
+        team = get_project_team(project_id)
+        if team is None:
+            return None
+        members = frozenset(m["user_id"] for role in team["roles"] for m in role["members"])
+        entry = (team, members)
+        with self._lock:
+            # If the cache moved past `seq` meanwhile, a change to this team may already have been
+            # applied (and dropped nothing) before this read was cached, so it is only returned.
+            if self._seq == seq:
+                self._teams[project_id] = entry
+        return entry
+
+
+_TEAMS = TeamCache()
+register_after_fork(_TEAMS.reset_after_fork)
+
+
+def warm_team(project_id: int) -> bool:
+    """Load one project's team into the cache ahead of its first request (see server/warmup.py)."""
+    return _TEAMS.get(project_id) is not None
+
 
 @team_bp.route("/api/projects/<int:project_id>/team", methods=["GET"])
 @login_required
-def get_project_team(project_id: int):
+def get_project_team_view(project_id: int):
     """
-    计划接口：GET /api/projects/{project_id}/team
-    可见性：项目所属企业、或项目团队内学生
+    GET /api/projects/{project_id}/team：按角色分组的已录取成员与名额统计
+    可见性：项目所属企业、项目内已录取学生、管理员
     """
     user = request.current_user
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT id, company_id, name, status FROM projects WHERE id = ?", (project_id,))
-    project = cursor.fetchone()
-    if not project:
-        conn.close()
-        return jsonify({"success": False, "message": "项目不存在"}), 404
-
-    allowed = False
-    if user["role"] == "company" and project["company_id"] == user["id"]:
-        allowed = True
-    if user["role"] == "student":
-        cursor.execute(
-            """
-            SELECT 1
-            FROM team_members tm
-            JOIN teams t ON tm.team_id = t.id
-            WHERE t.project_id = ? AND tm.user_id = ?
-            """,
-            (project_id, user["id"]),
-        )
-        allowed = bool(cursor.fetchone())
-
-    if not allowed:
-        conn.close()
-        return jsonify({"success": False, "message": "无权限查看团队信息"}), 403
-
-    cursor.execute("SELECT id, name, status, created_at FROM teams WHERE project_id = ?", (project_id,))
-    team = cursor.fetchone()
-    if not team:
-        # 尚未形成团队（无人被录取）
-        conn.close()
-        return jsonify(
-            {
-                "success": True,
-                "project": {"id": project["id"], "title": project["name"]},
-                "team": None,
-                "members": [],
-            }
-        )
-
-    cursor.execute(
-        """
-        SELECT tm.id, tm.user_id, u.username AS user_name,
-               tm.project_role_id, pr.role_name AS role_name,
-               tm.joined_at
-        FROM team_members tm
-        JOIN users u ON tm.user_id = u.id
-        JOIN project_roles pr ON tm.project_role_id = pr.id
-        WHERE tm.team_id = ?
-        ORDER BY pr.role_name, tm.joined_at
-        """,
-        (team["id"],),
-    )
-    members = [dict(r) for r in cursor.fetchall()]
-    conn.close()
-
-    return jsonify(
-        {
-            "success": True,
-            "project": {"id": project["id"], "title": project["name"]},
-            "team": dict(team),
-            "members": members,
-        }
-    )
-
+    entry = _TEAMS.get(project_id)
+    if entry is None:
+        return fail("项目不存在", 404)
+    team, members = entry
+    if not (
+        user["user_type"] == "管理员" or team["project"]["publisher_id"] == user["user_id"] or user["user_id"] in members
+    ):
+        return fail("无权限查看团队信息", 403)
+    return ok(**team)
@@ -0,0 +1,61 @@
+import os
+import uuid
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+try:
+    from .metrics import UPLOAD_BYTES
+except ImportError:
+    from metrics import UPLOAD_BYTES
+
+
+FEEDBACK_UPLOAD_DIR = os.environ.get("FEEDBACK_UPLOAD_DIR", "").strip() or os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "frontend", "uploads", "feedbacks")
+)
+MAX_FEEDBACK_FILE_SIZE = 20 * 1024 * 1024
+ALLOWED_FEEDBACK_EXTENSIONS = {
+    ".pdf",
+    ".doc",
+    ".docx",
+    ".ppt",
+    ".pptx",
+    ".xls",
+    ".xlsx",
+    ".zip",
+    ".rar",
+    ".7z",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".txt",
+    ".md",
+}
+
+
+def allowed_feedback_file(filename: str) -> bool:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext in ALLOWED_FEEDBACK_EXTENSIONS
+
+
+def save_feedback_file(file_storage) -> str:
+    filename = secure_filename(file_storage.filename or "")
+    if not filename:
+        raise ValueError("uploaded file is empty")
+    if not allowed_feedback_file(filename):
+        raise ValueError("unsupported file type")
+
+    os.makedirs(FEEDBACK_UPLOAD_DIR, exist_ok=True)
+    file_storage.stream.seek(0, os.SEEK_END)
+    size = file_storage.stream.tell()
+    file_storage.stream.seek(0)
+    if size > MAX_FEEDBACK_FILE_SIZE:
+        raise ValueError("file is too large, max 20MB")
+
+    ext = os.path.splitext(filename)[1].lower()
+    saved_name = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:10]}{ext}"
+    save_path = os.path.join(FEEDBACK_UPLOAD_DIR, saved_name)
+    file_storage.save(save_path)
+    UPLOAD_BYTES.inc(size, kind="feedback")
+    return f"/uploads/feedbacks/{saved_name}"
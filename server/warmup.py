@@ -0,0 +1,121 @@
+import logging
+import os
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .db import (
+        get_project,
+        get_user,
+        get_user_by_token,
+        list_hot_project_ids,
+        list_public_projects,
+        list_recent_tokens,
+        list_roles_by_project,
+        list_warmup_indexes,
+        touch_index,
+    )
+    from .metrics import CACHE_WARMUP_CUT, CACHE_WARMUP_ITEMS, CACHE_WARMUP_SECONDS
+except ImportError:
+    from db import (
+        get_project,
+        get_user,
+        get_user_by_token,
+        list_hot_project_ids,
+        list_public_projects,
+        list_recent_tokens,
+        list_roles_by_project,
+        list_warmup_indexes,
+        touch_index,
+    )
+    from metrics import CACHE_WARMUP_CUT, CACHE_WARMUP_ITEMS, CACHE_WARMUP_SECONDS
+
+# Cache warm-up: after a deploy or a worker recycle, replay the reads the first requests will make so
+# their pages and the in-process caches are loaded before traffic arrives. Runs once in the gunicorn
+# master before the fork under --preload (workers share the result), otherwise once per worker.
+CACHE_WARMUP = os.environ.get("CACHE_WARMUP", "1").strip().lower() in ("1", "true", "yes", "on")
+# Wall-clock budget for the whole warm-up; steps run in priority order and stop when it is spent.
+CACHE_WARMUP_BUDGET_MS = float(os.environ.get("CACHE_WARMUP_BUDGET_MS", "1000").strip() or "1000")
+CACHE_WARMUP_PROJECTS = int(os.environ.get("CACHE_WARMUP_PROJECTS", "50").strip() or "50")
+CACHE_WARMUP_TOKENS = int(os.environ.get("CACHE_WARMUP_TOKENS", "200").strip() or "200")
+
+logger = logging.getLogger("server.warmup")
+
+
+def _project_detail(project_id: int) -> None:
+    # The reads behind GET /api/public/projects/<id>.
+    project = get_project(project_id)
+    if project["code"] == 200:
+        get_user(project["data"]["publisher_id"])
+        list_roles_by_project(project_id)
+
+
+def _tag_index(kind: str) -> None:
+    try:
+        from .matching import refresh_index
+    except ImportError:
+        from matching import refresh_index
+    refresh_index(kind)
+
+
+def _team(project_id: int) -> None:
+    try:
+        from .team import warm_team
+    except ImportError:
+        from team import warm_team
+    warm_team(project_id)
+
+
+def _steps(hot: Callable[[], List[int]]) -> List[Tuple[str, Callable[[], Iterable], Callable[[object], None]]]:
+    # (name, items, load one item), most valuable first: the step the budget cuts is the cheapest to lose.
+    return [
+        ("project_list", lambda: [None], lambda _: list_public_projects()),
+        ("project_detail", hot, _project_detail),
+        ("tokens", lambda: list_recent_tokens(CACHE_WARMUP_TOKENS), get_user_by_token),
+        ("indexes", list_warmup_indexes, touch_index),
+        ("tag_index", lambda: ["role", "user"], _tag_index),
+        ("team", hot, _team),
+    ]
+
+
+def warm_caches(budget_ms: Optional[float] = None) -> Dict:
+    """Run the warm-up steps until done or out of budget; returns what each step loaded.
+
+    Best effort: a step that fails is logged and counted, and the next one still runs.
+    """
+    budget_ms = CACHE_WARMUP_BUDGET_MS if budget_ms is None else budget_ms
+    started = time.perf_counter()
+    deadline = started + budget_ms / 1000
+    hot_ids: List[int] = []
+
+    def hot() -> List[int]:
+        if not hot_ids:
+            hot_ids.extend(list_hot_project_ids(CACHE_WARMUP_PROJECTS))
+        return hot_ids
+
+    report: Dict[str, object] = {}
+    for name, items, load in _steps(hot):
+        step_started = time.perf_counter()
+        loaded, cut = 0, None
+        if step_started >= deadline:
+            cut = "budget"
+        else:
+            try:
+                for item in items():
+                    if time.perf_counter() >= deadline:
+                        cut = "budget"
+                        break
+                    load(item)
+                    loaded += 1
+            except Exception:
+                logger.exception("cache warm-up step %s failed", name)
+                cut = "error"
+        seconds = time.perf_counter() - step_started
+        CACHE_WARMUP_ITEMS.inc(loaded, step=name)
+        CACHE_WARMUP_SECONDS.set(seconds, step=name)
+        if cut:
+            CACHE_WARMUP_CUT.inc(step=name, reason=cut)
+        report[name] = {"items": loaded, "ms": round(seconds * 1000, 2), "complete": cut is None}
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    report["budget_ms"] = budget_ms
+    return report
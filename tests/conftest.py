@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Set before any server module is imported: they read their configuration at import time.
+WORKDIR = tempfile.mkdtemp(prefix="cp-tests-")
+os.environ.update(
+    {
+        "MULTI_ROLE_DB_PATH": os.path.join(WORKDIR, "test.db"),
+        "FEEDBACK_UPLOAD_DIR": os.path.join(WORKDIR, "uploads"),
+        "RATE_LIMIT_ENABLED": "0",
+        "CACHE_WARMUP": "0",
+        "EVENT_POLL_INTERVAL": "0.2",
+        "EVENT_HEARTBEAT_SECONDS": "0.5",
+        "EVENT_STREAM_MAX_SECONDS": "5",
+        # AI suggestions use the local stub.
+        "DEEPSEEK_API_KEY": "",
+    }
+)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from server import create_app
+
+    return create_app()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def student(app):
+    """(user_id, token) of the demo student1 account."""
+    from server import db
+
+    conn = db.get_db_connection()
+    user_id = conn.execute("SELECT user_id FROM user WHERE username = 'student1'").fetchone()["user_id"]
+    conn.close()
+    token = f"test-{os.urandom(8).hex()}"
+    db.save_token(token, user_id)
+    return user_id, token
+
+
+@pytest.fixture()
+def enterprise(app):
+    """(user_id, token) of the first enterprise account."""
+    from server import db
+
+    conn = db.get_db_connection()
+    user_id = conn.execute("SELECT user_id FROM user WHERE user_type = '企业' ORDER BY user_id LIMIT 1").fetchone()[0]
+    conn.close()
+    token = f"test-{os.urandom(8).hex()}"
+    db.save_token(token, user_id)
+    return user_id, token
@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks import api_load
+
+
+def _recorder(samples, errors=None, statuses=None):
+    recorder = api_load.Recorder()
+    recorder.samples = samples
+    recorder.errors = errors or {}
+    recorder.statuses = statuses or {}
+    return recorder
+
+
+def test_summarize_reports_rate_and_percentiles_per_endpoint():
+    fast = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    result = api_load.summarize(
+        _recorder({"GET /a": fast, "GET /b": [0.5]}, errors={"GET /b": 1}, statuses={"GET /a": {"200": 100}}),
+        elapsed=2.0,
+    )
+
+    a = result["endpoints"]["GET /a"]
+    assert a["count"] == 100 and a["rps"] == 50.0
+    assert (a["p50_ms"], a["p95_ms"], a["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert a["status"] == {"200": 100}
+    assert result["endpoints"]["GET /b"]["errors"] == 1
+    assert result["total"]["count"] == 101 and result["total"]["errors"] == 1
+    assert result["total"]["p99_ms"] == 100.0
+
+
+def test_compare_counts_p95_regressions_beyond_tolerance():
+    baseline = {"endpoints": {"GET /a": {"p95_ms": 10.0, "rps": 100}, "GET /b": {"p95_ms": 10.0, "rps": 100}}}
+    current = {
+        "endpoints": {
+            "GET /a": {"p95_ms": 11.5, "rps": 90},  # +15%: within 20%
+            "GET /b": {"p95_ms": 13.0, "rps": 80},  # +30%: regression
+            "GET /new": {"p95_ms": 99.0, "rps": 1},  # not in the baseline
+        }
+    }
+    assert api_load.compare(current, baseline, tolerance=0.2) == 1
+    assert api_load.compare(current, baseline, tolerance=0.5) == 0
+
+
+def test_parse_mix_overrides_defaults_and_rejects_unknown_scenarios():
+    mix = api_load._parse_mix("admin=0,browse=80")
+    assert mix["admin"] == 0 and mix["browse"] == 80 and mix["student"] == api_load.DEFAULT_MIX["student"]
+    with pytest.raises(SystemExit):
+        api_load._parse_mix("nope=1")
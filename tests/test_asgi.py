@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from server.asgi import WsgiBridge
+
+
+def _call(bridge, method, path, body_chunks=(b"",), headers=(), query=b"", root_path=""):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": root_path + path,
+        "root_path": root_path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1} for i, chunk in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(bridge(scope, receive, send))
+    status = sent[0]["status"]
+    body = b"".join(m.get("body", b"") for m in sent[1:])
+    return status, dict(sent[0]["headers"]), body
+
+
+def test_bridge_serves_flask_views_with_a_chunked_body(app):
+    bridge = WsgiBridge(app, threads=2)
+    payload = json.dumps({"username": "student1", "password": "123456"}).encode()
+    status, headers, body = _call(
+        bridge,
+        "POST",
+        "/api/auth/login",
+        body_chunks=(payload[:10], payload[10:]),
+        headers=[("content-type", "application/json")],
+    )
+    assert status == 200, body
+    assert headers[b"content-type"].startswith(b"application/json")
+    assert json.loads(body)["token"]
+
+
+def test_bridge_strips_root_path_and_keeps_the_query_string(app):
+    bridge = WsgiBridge(app, threads=2)
+    status, _, body = _call(bridge, "GET", "/api/projects", query=b"page=1&page_size=1", root_path="/prefix")
+    assert status == 200
+    assert json.loads(body)["success"] is True
+
+
+def test_bridge_rejects_oversized_bodies_before_running_the_view(app):
+    calls = []
+
+    def wsgi_app(environ, start_response):
+        calls.append(environ)
+        start_response("200 OK", [])
+        return [b""]
+
+    bridge = WsgiBridge(wsgi_app, threads=1, max_body=8)
+    status, _, body = _call(bridge, "POST", "/upload", body_chunks=(b"12345", b"67890"))
+    assert status == 413 and not calls
+
+
+def test_native_routes_take_get_only(app):
+    bridge = WsgiBridge(app, threads=2)
+    hits = []
+
+    async def native(scope, receive, send, executor):
+        hits.append(scope["path"])
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    bridge.native_routes["/native"] = native
+    assert _call(bridge, "GET", "/native")[0] == 204
+    assert _call(bridge, "POST", "/native")[0] in (404, 405)
+    assert hits == ["/native"]
@@ -0,0 +1,98 @@
+import math
+import sqlite3
+
+from server import backends, db
+
+
+class _RawCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+        self.lastrowid = None
+        self.description = None
+
+    def execute(self, sql, params=None):
+        self.log.append((sql, params))
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self):
+        self.log = []
+        self.raw = self
+
+    def cursor(self):
+        return _RawCursor(self.log)
+
+
+def _mysql_cursor():
+    conn = _Conn()
+    return backends.MySQLCursor(conn), conn.log
+
+
+def test_mysql_ddl_and_upserts():
+    dialect = backends.MySQLDialect()
+    ddl = dialect.ddl("CREATE TABLE IF NOT EXISTS t (id INTEGER PRIMARY KEY AUTOINCREMENT, at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    assert "AUTO_INCREMENT" in ddl and "DATETIME DEFAULT CURRENT_TIMESTAMP" in ddl
+    assert ddl.endswith("ENGINE=InnoDB DEFAULT CHARSET=utf8mb4")
+    assert dialect.insert("t", ("a",), conflict=("a",)) == "INSERT IGNORE INTO t (a) VALUES (?)"
+    assert dialect.insert("t", ("a", "b"), ("a",), {"b": dialect.excluded("b")}).endswith("ON DUPLICATE KEY UPDATE b = VALUES(b)")
+    assert dialect.sequence_sql("change_log") == "SELECT MAX(seq) FROM change_log"
+
+
+def test_mysql_sequence_appends_hold_a_lock_row_until_commit():
+    dialect = backends.MySQLDialect()
+    cur, log = _mysql_cursor()
+    dialect.init_sequence_locks(cur, ("change_log", "event_log"))
+    assert log[0][0].startswith("CREATE TABLE IF NOT EXISTS seq_lock")
+    assert log[1:] == [
+        ("INSERT IGNORE INTO seq_lock (name) VALUES (%s)", ("change_log",)),
+        ("INSERT IGNORE INTO seq_lock (name) VALUES (%s)", ("event_log",)),
+    ]
+    log.clear()
+    dialect.lock_sequence(cur, "change_log")
+    assert log == [("SELECT name FROM seq_lock WHERE name = %s FOR UPDATE", ("change_log",))]
+
+
+def test_sqlite_needs_no_sequence_lock():
+    conn = sqlite3.connect(":memory:")
+    dialect = backends.SQLiteDialect()
+    dialect.init_sequence_locks(conn.cursor(), ("change_log",))
+    dialect.lock_sequence(conn.cursor(), "change_log")
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0
+
+
+def test_logaddexp_matches_python_in_both_dialects():
+    assert backends.MySQLDialect().logaddexp("a", "?").startswith("GREATEST(a, ?)")
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("ln", 1, math.log)
+    conn.create_function("exp", 1, math.exp)
+    expr = backends.SQLiteDialect().logaddexp("a", "?")
+    value = conn.execute(f"SELECT {expr} FROM (SELECT 2.0 AS a)", (3.0, 3.0)).fetchone()[0]
+    assert math.isclose(value, math.log(math.exp(2.0) + math.exp(3.0)))
+
+
+def test_log_appends_take_the_sequence_lock(app, monkeypatch):
+    locked = []
+    monkeypatch.setattr(db.DIALECT, "lock_sequence", lambda cur, table: locked.append(table), raising=False)
+    publisher = db.get_db_connection().execute("SELECT user_id FROM user WHERE user_type = '企业' LIMIT 1").fetchone()[0]
+    result = db.project_add("lock test", publisher, "测试公司")
+    assert result["code"] == 200
+    db.project_del(result["data"]["project_id"])
+    assert locked and set(locked) == {"change_log"}
+
+
+def test_tombstones_take_the_sequence_lock(app, monkeypatch):
+    locked = []
+    monkeypatch.setattr(db.DIALECT, "lock_sequence", lambda cur, table: locked.append(table), raising=False)
+    conn = db.get_db_connection()
+    try:
+        db._log_deletes(
+            conn.cursor(), "role", "SELECT role_id AS id, project_id, role_id, NULL AS user_id FROM role WHERE 0"
+        )
+        conn.rollback()
+    finally:
+        conn.close()
+    assert locked == ["change_log"]
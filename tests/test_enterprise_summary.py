@@ -0,0 +1,53 @@
+from server import db, instrumentation
+
+
+def _count_queries(fn, *args):
+    statements = []
+    listener = statements.append
+    instrumentation.QUERY_LISTENERS.append(listener)
+    try:
+        result = fn(*args)
+    finally:
+        instrumentation.QUERY_LISTENERS.remove(listener)
+    # Connection setup (PRAGMA foreign_keys) is reported too; only the SELECTs are the summary's.
+    return result, sum(1 for event in statements if event.sql.lstrip().upper().startswith("SELECT"))
+
+
+def _add_project(enterprise_id: int, name: str, roles: int) -> int:
+    project_id = db.project_add(name, enterprise_id, "测试公司")["data"]["project_id"]
+    for i in range(roles):
+        db.role_add(project_id, f"岗位{i}", "任务", limit_num=3)
+    return project_id
+
+
+def test_summary_query_count_does_not_grow_with_projects(client, enterprise):
+    enterprise_id, token = enterprise
+    _, before = _count_queries(db.get_enterprise_summary, enterprise_id)
+    for i in range(5):
+        _add_project(enterprise_id, f"summary queries {i}", roles=3)
+    projects, after = _count_queries(db.get_enterprise_summary, enterprise_id)
+    assert before == after == 4
+    assert len(projects) >= 5
+
+
+def test_summary_groups_roles_applications_and_latest_feedback(client, enterprise):
+    enterprise_id, token = enterprise
+    project_id = _add_project(enterprise_id, "summary contents", roles=2)
+    first_role, second_role = [r["role_id"] for r in db.list_roles_by_project(project_id)]
+    conn = db.get_db_connection()
+    student_ids = [r[0] for r in conn.execute("SELECT user_id FROM user WHERE username IN ('student1', 'student2') ORDER BY username")]
+    conn.close()
+    rejected = db.apply_for_role(first_role, student_ids[0], "想参加")["data"]["application_id"]
+    db.apply_for_role(first_role, student_ids[1], "想参加")
+    db.review_application(rejected, enterprise_id, "rejected")
+    db.add_role_feedback(second_role, student_ids[0], "第一次反馈")
+    db.add_role_feedback(first_role, student_ids[1], "最新反馈")
+
+    resp = client.get("/api/enterprise/summary", headers={"Authorization": f"Bearer {token}"}).get_json()
+    project = next(p for p in resp["projects"] if p["project_id"] == project_id)
+    roles = {r["role_id"]: r["applications"] for r in project["roles"]}
+    assert roles[first_role] == {"pending": 1, "accepted": 0, "rejected": 1, "cancelled": 0}
+    assert roles[second_role] == {"pending": 0, "accepted": 0, "rejected": 0, "cancelled": 0}
+    assert project["applications"]["pending"] == 1 and project["applications"]["rejected"] == 1
+    assert project["latest_feedback"]["content"] == "最新反馈"
+    assert project["latest_feedback"]["role_name"] == "岗位0"
@@ -0,0 +1,92 @@
+import json
+
+from server import db, events
+
+THREADED = {"wsgi.multithread": True}
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _commit_event(user_id: int, note: str, publish: bool) -> int:
+    # publish=False is another worker: its commit reaches this process only through event_log.
+    conn = db.get_db_connection()
+    cur = conn.cursor()
+    event = db._record_event(cur, "test.event", {"note": note}, user_id, None)
+    conn.commit()
+    cur.close()
+    conn.close()
+    if publish:
+        db._publish_events([event])
+    return event["seq"]
+
+
+def _next_events(chunks, count: int):
+    seqs = []
+    for chunk in chunks:
+        if chunk.startswith(b"id: "):
+            seqs.append(json.loads(chunk.split(b"data: ", 1)[1])["seq"])
+            if len(seqs) == count:
+                break
+    return seqs
+
+
+def test_stream_delivers_interleaved_commits_from_two_workers(client, student):
+    user_id, token = student
+    resp = client.get("/api/events/stream", headers=_bearer(token), environ_overrides=THREADED, buffered=False)
+    chunks = iter(resp.response)
+    assert b"connected" in next(chunks)
+
+    other = _commit_event(user_id, "other worker", publish=False)
+    local = _commit_event(user_id, "this worker", publish=True)
+    assert local > other
+    assert _next_events(chunks, 2) == [other, local]
+    resp.close()
+
+
+def test_stream_resumes_after_last_event_id(client, student):
+    user_id, token = student
+    first = _commit_event(user_id, "first", publish=False)
+    second = _commit_event(user_id, "second", publish=True)
+    headers = {**_bearer(token), "Last-Event-ID": str(first - 1)}
+    resp = client.get("/api/events/stream", headers=headers, environ_overrides=THREADED, buffered=False)
+    assert _next_events(iter(resp.response), 2) == [first, second]
+    resp.close()
+
+
+def test_stream_ticket_is_single_use_and_token_is_not_accepted_in_url(client, student):
+    _, token = student
+    ticket = client.post("/api/events/ticket", headers=_bearer(token)).get_json()["ticket"]
+    resp = client.get(f"/api/events/stream?ticket={ticket}", environ_overrides=THREADED, buffered=False)
+    assert resp.status_code == 200
+    assert b"connected" in next(iter(resp.response))
+    resp.close()
+
+    assert client.get(f"/api/events/stream?ticket={ticket}", environ_overrides=THREADED).status_code == 401
+    assert client.get(f"/api/events/stream?token={token}", environ_overrides=THREADED).status_code == 401
+    assert client.post("/api/events/ticket").status_code == 401
+
+
+def test_stream_refused_on_single_threaded_workers(client, student):
+    _, token = student
+    resp = client.get("/api/events/stream", headers=_bearer(token))
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"]
+
+
+def test_streams_are_capped_per_worker(client, student, monkeypatch):
+    _, token = student
+    monkeypatch.setattr(events, "STREAM_SLOTS", events.StreamSlots(limit=1))
+    first = client.get("/api/events/stream", headers=_bearer(token), environ_overrides=THREADED, buffered=False)
+    assert first.status_code == 200
+
+    second = client.get("/api/events/stream", headers=_bearer(token), environ_overrides=THREADED)
+    assert second.status_code == 503
+    assert second.get_json()["success"] is False
+
+    first.close()
+    assert events.STREAM_SLOTS.active == 0
+    third = client.get("/api/events/stream", headers=_bearer(token), environ_overrides=THREADED, buffered=False)
+    assert third.status_code == 200
+    third.close()
@@ -0,0 +1,51 @@
+import json
+import logging
+import sqlite3
+
+from flask import Flask, Response, jsonify
+
+from server import db, instrumentation, responses
+
+
+def test_connections_are_plain_without_listeners(app):
+    assert not instrumentation.QUERY_LISTENERS
+    conn = db.get_db_connection()
+    try:
+        assert type(conn) is sqlite3.Connection
+    finally:
+        conn.close()
+
+
+def test_request_timing_does_not_consume_streamed_bodies(monkeypatch):
+    monkeypatch.setattr(instrumentation, "REQUEST_TIMING_ENABLED", True)
+    app = Flask(__name__)
+    instrumentation.init_request_timing(app)
+    consumed = []
+
+    def body():
+        for _ in range(100):
+            consumed.append(1)
+            yield "chunk"
+
+    app.add_url_rule("/stream", "stream", lambda: Response(body()))
+    resp = app.test_client().get("/stream", buffered=False)
+    assert "Server-Timing" in resp.headers
+    # The test client may pull the first chunk; the rest is left for the client to read.
+    assert len(consumed) <= 1
+    assert resp.get_data() == b"chunk" * 100
+
+
+def test_request_timing_logs_compressed_size(monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "REQUEST_TIMING_ENABLED", True)
+    monkeypatch.setattr(responses, "RESPONSE_COMPRESS_MIN_BYTES", 100)
+    app = Flask(__name__)
+    responses.init_responses(app)
+    instrumentation.init_request_timing(app)
+    app.add_url_rule("/big", "big", lambda: jsonify(items=["x" * 40] * 200))
+
+    with caplog.at_level(logging.INFO, logger=instrumentation.timing_logger.name):
+        resp = app.test_client().get("/big", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["response_bytes"] == len(resp.get_data()) < 8000
+    assert entry["content_encoding"] == "gzip"
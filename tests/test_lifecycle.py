@@ -0,0 +1,66 @@
+import gc
+import os
+
+import pytest
+
+from server import db, lifecycle, matching
+
+
+def test_hooks_run_once_each_in_registration_order(monkeypatch):
+    monkeypatch.setattr(lifecycle, "AFTER_FORK", [])
+    calls = []
+
+    @lifecycle.register_after_fork
+    def first():
+        calls.append("first")
+
+    def second():
+        calls.append("second")
+
+    lifecycle.register_after_fork(second)
+    lifecycle.register_after_fork(first)
+    lifecycle.run_after_fork()
+    assert calls == ["first", "second"]
+
+
+def test_failing_hook_stops_the_worker(monkeypatch):
+    def broken():
+        raise RuntimeError("reset failed")
+
+    monkeypatch.setattr(lifecycle, "AFTER_FORK", [broken])
+    with pytest.raises(RuntimeError):
+        lifecycle.run_after_fork()
+
+
+def test_collector_is_off_in_the_master_and_back_on_in_workers(monkeypatch):
+    monkeypatch.setattr(lifecycle, "AFTER_FORK", [])
+    try:
+        lifecycle.begin_master()
+        assert not gc.isenabled()
+        lifecycle.run_after_fork()
+        assert gc.isenabled()
+    finally:
+        gc.enable()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_locks_held_at_fork_are_usable_in_the_child(app):
+    # A lock taken by a parent thread at fork time stays locked forever in the child unless reset.
+    locks = [lambda: db._SNAPSHOT._lock, lambda: matching._INDEXES["role"].lock]
+    held = [get() for get in locks]
+    for lock in held:
+        lock.acquire()
+    try:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                lifecycle.run_after_fork()
+                code = 0 if all(get().acquire(timeout=2) for get in locks) else 2
+            finally:
+                os._exit(code)
+    finally:
+        for lock in held:
+            lock.release()
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
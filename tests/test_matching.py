@@ -0,0 +1,55 @@
+import random
+
+from server import db, matching
+
+
+def _brute_force(index, weights, exclude, limit):
+    tags = sorted(weights, key=lambda t: (-weights[t], t))[: matching.RECOMMEND_MAX_QUERY_TAGS]
+    scored = []
+    for entity_id in index.eligible - set(exclude):
+        matched = [t for t in tags if t in index.tags_of[entity_id]]
+        if matched:
+            scored.append((-sum(weights[t] for t in matched), -entity_id))
+    return [(-neg_id, -neg_score) for neg_score, neg_id in sorted(scored)[:limit]]
+
+
+def test_rank_matches_a_brute_force_scan():
+    rnd = random.Random(42)
+    index = matching.TagIndex("role")
+    index._apply({i: (rnd.sample(range(1, 30), rnd.randint(1, 5)), rnd.random() < 0.8) for i in range(1, 400)}, ())
+    for _ in range(20):
+        weights = {t: rnd.uniform(0.1, 5) for t in rnd.sample(range(1, 30), rnd.randint(1, 12))}
+        exclude = rnd.sample(range(1, 400), 30)
+        got = [(entity_id, round(score, 9)) for entity_id, score, _ in index.rank(weights, exclude, 25)]
+        want = [(entity_id, round(score, 9)) for entity_id, score in _brute_force(index, weights, exclude, 25)]
+        assert got == want
+
+
+def test_rank_breaks_ties_newest_first_and_skips_ineligible():
+    index = matching.TagIndex("role")
+    index._apply({1: ([7], True), 2: ([7, 8], True), 3: ([7], True), 4: ([7], False)}, ())
+    ranked = index.rank({7: 1.0, 8: 0.5}, exclude=[], limit=10)
+    assert [(entity_id, matched) for entity_id, _, matched in ranked] == [(2, (7, 8)), (3, (7,)), (1, (7,))]
+
+
+def test_recommendations_follow_skill_edits(client, student, enterprise):
+    student_id, token = student
+    project_id = db.project_add("matching test", enterprise[0], "测试公司")["data"]["project_id"]
+    role_id = db.role_add(project_id, "量子工程师", "研究", skill_require="量子计算")["data"]["role_id"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def recommended():
+        roles = client.get("/api/student/recommended-roles?limit=100", headers=headers).get_json()["roles"]
+        return {r["role_id"]: r["matched_tags"] for r in roles}
+
+    conn = db.get_db_connection()
+    original = conn.execute("SELECT skill_tags FROM user WHERE user_id = ?", (student_id,)).fetchone()[0]
+    conn.close()
+    assert role_id not in recommended()
+    db.user_update(student_id, skill_tags="量子计算,Python")
+    try:
+        assert recommended()[role_id] == ["量子计算"]
+        db.role_del(role_id)
+        assert role_id not in recommended()
+    finally:
+        db.user_update(student_id, skill_tags=original)
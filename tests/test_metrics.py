@@ -0,0 +1,36 @@
+import json
+import os
+
+from server import metrics
+
+
+def test_metrics_content_type_has_one_charset(client):
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _write(directory, pid, snapshot):
+    with open(os.path.join(directory, f"metrics-{pid}.json"), "w", encoding="utf-8") as f:
+        json.dump({"pid": pid, "metrics": snapshot}, f)
+
+
+def test_exited_worker_is_archived_and_removed(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    counter = {"kind": "counter", "samples": [[["GET"], 3.0]]}
+    gauge = {"kind": "gauge", "samples": [[[], 7.0]]}
+    _write(tmp_path, 101, {"hits": counter, "busy": gauge})
+    _write(tmp_path, 102, {"hits": counter, "busy": gauge})
+
+    metrics.mark_process_dead(101)
+    metrics.mark_process_dead(102)
+
+    assert sorted(os.listdir(tmp_path)) == ["metrics-archive.json"]
+    with open(tmp_path / "metrics-archive.json", encoding="utf-8") as f:
+        archive = json.load(f)
+    assert archive["pid"] is None
+    assert archive["metrics"]["hits"]["samples"] == [[["GET"], 6.0]]
+
+    (tmp_path / "metrics-999.json.tmp").write_text("{}")
+    metrics.clear_multiproc_dir()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,54 @@
+import pytest
+import werkzeug.security
+from werkzeug.security import generate_password_hash
+
+from server import db, passwords
+
+
+@pytest.mark.parametrize("method", ["scrypt", "scrypt:16384:8:1", "pbkdf2", "pbkdf2:sha512", "pbkdf2:sha256:1000"])
+def test_method_prefix_matches_werkzeug(method):
+    assert passwords._method_prefix(method) == generate_password_hash("", method).split("$", 1)[0]
+
+
+def test_needs_rehash_does_not_hash(monkeypatch):
+    def fail(*args):
+        raise AssertionError("hashed on the request thread")
+
+    monkeypatch.setattr(passwords, "generate_password_hash", fail)
+    current = f"{passwords._METHOD_PREFIX}$salt$hash"
+    assert not passwords.needs_rehash(current)
+    assert passwords.needs_rehash("pbkdf2:sha256:1$salt$hash")
+
+
+def _admin_hash():
+    conn = db.get_db_connection()
+    try:
+        return conn.execute("SELECT password_hash FROM user WHERE username = 'Tea0104'").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_ensure_admin_user_skips_hashing_when_current(app, monkeypatch):
+    db.ensure_admin_user()
+    stored = _admin_hash()
+    assert not passwords.needs_rehash(stored)
+
+    def fail(*args):
+        raise AssertionError("hashed on boot")
+
+    # Both generate_password_hash and check_password_hash go through this.
+    monkeypatch.setattr(werkzeug.security, "_hash_internal", fail)
+    db.ensure_admin_user()
+    assert _admin_hash() == stored
+
+
+def test_ensure_admin_user_rehashes_outdated_method(app):
+    conn = db.get_db_connection()
+    conn.execute(
+        "UPDATE user SET password_hash = ? WHERE username = 'Tea0104'",
+        (generate_password_hash("jhyy10nd", "pbkdf2:sha256:1000"),),
+    )
+    conn.commit()
+    conn.close()
+    db.ensure_admin_user()
+    assert not passwords.needs_rehash(_admin_hash())
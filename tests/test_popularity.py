@@ -0,0 +1,26 @@
+from server import metrics, popularity
+
+
+def _dropped():
+    return dict((tuple(k), v) for k, v in metrics.PROJECT_VIEWS_DROPPED.snapshot()["samples"]).get(("flush_failed",), 0.0)
+
+
+def _failing(views):
+    raise RuntimeError("unable to open database file")
+
+
+def test_failed_flush_keeps_views_until_the_final_one(monkeypatch):
+    monkeypatch.setattr(popularity, "add_project_views", _failing)
+    buffer = popularity.ViewBuffer(interval=3600)
+    buffer.record(1)
+    buffer.record(1)
+    buffer.record(2)
+    before = _dropped()
+
+    assert buffer.flush() == 0
+    assert buffer._pending_views == 3
+    assert _dropped() == before
+
+    assert buffer.flush(final=True) == 0
+    assert buffer._pending_views == 0
+    assert _dropped() == before + 3
@@ -0,0 +1,80 @@
+from server import db
+
+
+def _summary(project_id: int):
+    conn = db.get_db_connection()
+    try:
+        row = conn.execute("SELECT * FROM project WHERE project_id = ?", (project_id,)).fetchone()
+        return {column: row[column] for column in db.PROJECT_SUMMARY_COLUMNS}
+    finally:
+        conn.close()
+
+
+def _expected(project_id: int):
+    """The summary recomputed from scratch, the way the counters are defined."""
+    conn = db.get_db_connection()
+    try:
+        roles = conn.execute(
+            "SELECT * FROM role WHERE project_id = ? AND role_status != ?", (project_id, db.DRAFT_ROLE_STATUS)
+        ).fetchall()
+        pending = conn.execute(
+            "SELECT COUNT(*) FROM role_application WHERE project_id = ? AND status = 'pending'", (project_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "role_count": len(roles),
+        "total_slots": sum(r["limit_num"] for r in roles),
+        "filled_slots": sum(r["join_num"] for r in roles),
+        "open_role_count": sum(1 for r in roles if r["role_status"] == "招募中" and r["join_num"] < r["limit_num"]),
+        "pending_applications": pending,
+    }
+
+
+def _student_ids():
+    conn = db.get_db_connection()
+    try:
+        return [r[0] for r in conn.execute("SELECT user_id FROM user WHERE username IN ('student1', 'student2') ORDER BY username")]
+    finally:
+        conn.close()
+
+
+def test_summary_follows_role_and_application_writes(enterprise):
+    enterprise_id = enterprise[0]
+    project_id = db.project_add("summary test", enterprise_id, "测试公司")["data"]["project_id"]
+    first, second = _student_ids()
+
+    def check(**expected):
+        summary = _summary(project_id)
+        assert summary == _expected(project_id)
+        assert {k: summary[k] for k in expected} == expected
+
+    check(role_count=0, total_slots=0, open_role_count=0)
+    role_id = db.role_add(project_id, "后端", "写接口", limit_num=2)["data"]["role_id"]
+    check(role_count=1, total_slots=2, open_role_count=1)
+    db.role_add_many(project_id, [{"role_name": "前端", "task_desc": "写页面", "limit_num": 3}])
+    db.role_add(project_id, "草稿岗位", "未发布", limit_num=9, role_status=db.DRAFT_ROLE_STATUS)
+    check(role_count=2, total_slots=5, open_role_count=2)
+
+    applied = db.apply_for_role(role_id, first, "想参加")["data"]["application_id"]
+    cancelled = db.apply_for_role(role_id, second, "想参加")["data"]["application_id"]
+    check(pending_applications=2)
+    db.cancel_application(cancelled, second)
+    check(pending_applications=1)
+    db.review_application(applied, enterprise_id, "accepted")
+    check(pending_applications=0, filled_slots=1)
+
+    db.role_update(role_id, limit_num=1)
+    check(total_slots=4, open_role_count=1)
+    db.role_update(role_id, role_status="已完成")
+    check(open_role_count=1)
+    db.role_del(role_id)
+    check(role_count=1, total_slots=3, filled_slots=0, open_role_count=1)
+
+
+def test_summary_changes_reach_project_list_deltas(client, enterprise):
+    project_id = db.project_add("summary delta test", enterprise[0], "测试公司")["data"]["project_id"]
+    seq = client.get("/api/projects").get_json()["seq"]
+    db.role_add(project_id, "后端", "写接口", limit_num=4)
+    delta = client.get(f"/api/projects?since={seq}").get_json()
+    assert [(p["project_id"], p["role_count"], p["total_slots"]) for p in delta["projects"]] == [(project_id, 1, 4)]
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from server import db, ranking
+
+
+def _random_columns(rnd, n, tags, keywords):
+    return (
+        [[rnd.random() < 0.4 for _ in range(n)] for _ in range(tags)],
+        [rnd.randint(0, 3) for _ in range(n)],
+        [rnd.randint(3, 8) for _ in range(n)],
+        [rnd.randint(0, 400) for _ in range(n)],
+        [[rnd.random() < 0.3 for _ in range(n)] for _ in range(keywords)],
+    )
+
+
+@pytest.mark.parametrize("tags,keywords", [(0, 0), (1, 1), (5, 3)])
+def test_numpy_and_python_scorers_agree(tags, keywords):
+    if not ranking.load_numpy():
+        pytest.skip("NumPy is not installed")
+    rnd = random.Random(tags * 10 + keywords)
+    columns = _random_columns(rnd, 300, tags, keywords)
+    weights = [rnd.uniform(0.5, 4) for _ in range(tags)]
+    np_points, np_scores = ranking._score_numpy(columns, weights)
+    py_points, py_scores = ranking._score_python(columns, weights)
+    # Both round to 2 places; float order of operations may flip a last digit.
+    assert np_scores == pytest.approx(py_scores, abs=0.011)
+    assert [p for row in np_points for p in row] == pytest.approx([p for row in py_points for p in row], abs=0.011)
+
+
+def test_python_scorer_feature_points():
+    # One applicant with the heavier of two tags, 1 of 1 applications accepted, 100 chars, 1 of 2 keywords.
+    columns = ([[True], [False]], [1], [1], [100], [[True], [False]])
+    points, scores = ranking._score_python(columns, [3.0, 1.0])
+    assert points == [[37.5, 13.33, 7.5, 7.5]]
+    assert scores == [65.83]
+
+
+def test_rank_applications_orders_by_score_on_both_paths(app, enterprise, monkeypatch):
+    project_id = db.project_add("ranking test", enterprise[0], "测试公司")["data"]["project_id"]
+    role_id = db.role_add(project_id, "后端", "写接口", skill_require="Python,Flask", limit_num=5)["data"]["role_id"]
+    conn = db.get_db_connection()
+    students = {row[0]: row[1] for row in conn.execute("SELECT username, user_id FROM user WHERE username IN ('student1', 'student2')")}
+    conn.close()
+    db.apply_for_role(role_id, students["student2"], "想学习")
+    db.apply_for_role(role_id, students["student1"], "熟悉 Python 和 Flask，做过多个后端项目")
+
+    results = {}
+    for mode in ("python", "auto"):
+        monkeypatch.setattr(ranking, "APPLICANT_SCORING", mode)
+        rows = db.list_role_applications(role_id, enterprise[0])["data"]
+        results[mode] = [(r["student_id"], r["score"], r["score_detail"]["matched_tags"]) for r in ranking.rank_applications(role_id, rows)]
+
+    assert results["python"] == results["auto"]
+    ranked = results["python"]
+    assert ranked[0][0] == students["student1"] and ranked[0][1] > ranked[1][1]
+    assert len(ranked[0][2]) == 2
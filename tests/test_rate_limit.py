@@ -0,0 +1,42 @@
+import pytest
+from flask import Flask
+
+from server import rate_limit
+
+
+@pytest.mark.parametrize(
+    "trusted, forwarded, expected",
+    [
+        (0, "1.1.1.1", "10.0.0.1"),
+        # Nginx's $proxy_add_x_forwarded_for appends the peer it saw to whatever the client sent.
+        (1, "6.6.6.6, 203.0.113.7", "203.0.113.7"),
+        (1, "203.0.113.7", "203.0.113.7"),
+        (2, "6.6.6.6, 203.0.113.7, 10.0.0.9", "203.0.113.7"),
+        # Fewer hops than trusted proxies: the header cannot be trusted.
+        (2, "203.0.113.7", "10.0.0.1"),
+    ],
+)
+def test_client_ip_counts_trusted_hops_from_the_right(monkeypatch, trusted, forwarded, expected):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUST_PROXY", trusted)
+    app = Flask(__name__)
+    with app.test_request_context(headers={"X-Forwarded-For": forwarded}, environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert rate_limit.client_ip() == expected
+
+
+def test_trusted_proxies_parsing():
+    assert [rate_limit._trusted_proxies(v) for v in ("0", "1", "2", "true", "off", "", "x")] == [0, 1, 2, 1, 0, 0, 0]
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_sqlite_store_refills_and_takes_atomically(tmp_path, monkeypatch, returning):
+    # returning=False is the path for SQLite older than 3.35 (no RETURNING).
+    monkeypatch.setattr(rate_limit.SQLiteStore, "supports_returning", returning)
+    store = rate_limit.SQLiteStore(str(tmp_path / "limits.db"))
+    # Burst 2, one token per 10 s.
+    assert store.take("k", 0.1, 2, 100.0) == (True, 1.0)
+    assert store.take("k", 0.1, 2, 100.0) == (True, 0.0)
+    allowed, tokens = store.take("k", 0.1, 2, 105.0)
+    assert not allowed and tokens == pytest.approx(0.5)
+    allowed, tokens = store.take("k", 0.1, 2, 110.0)
+    assert allowed and tokens == pytest.approx(0.0)
+    assert store.take("other", 0.1, 2, 110.0) == (True, 1.0)
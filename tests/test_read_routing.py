@@ -0,0 +1,62 @@
+import os
+import sqlite3
+
+import pytest
+
+from server import db
+
+
+@pytest.fixture()
+def snapshot_mode(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_READ_MODE", "snapshot")
+    monkeypatch.setattr(db, "DB_SNAPSHOT_PATH", str(tmp_path / "snapshot.db"))
+    monkeypatch.setattr(db, "_SNAPSHOT", db._Snapshot())
+    db._SNAPSHOT.refresh(force=True)
+    return db._SNAPSHOT.path()
+
+
+def _file(conn) -> str:
+    try:
+        return os.path.realpath(conn.execute("PRAGMA database_list").fetchone()[2])
+    finally:
+        conn.close()
+
+
+def test_fresh_snapshot_serves_reads(snapshot_mode):
+    assert _file(db.get_read_connection()) == os.path.realpath(snapshot_mode)
+
+
+def test_read_behind_the_session_floor_falls_back_to_the_primary(snapshot_mode, enterprise):
+    user_id, token = enterprise
+    project_id = db.project_add("read routing test", user_id, "测试公司")["data"]["project_id"]
+    db.record_session_write(token)
+    route = db.begin_read_route(token=token)
+    try:
+        conn = db.get_read_connection()
+        assert conn.execute("SELECT 1 FROM project WHERE project_id = ?", (project_id,)).fetchone()
+        assert _file(conn) == os.path.realpath(db.DB_PATH)
+    finally:
+        db.end_read_route(route)
+
+    # Another session has no floor and keeps reading the snapshot.
+    assert _file(db.get_read_connection()) == os.path.realpath(snapshot_mode)
+
+
+def test_stale_snapshot_falls_back_to_a_read_only_primary(snapshot_mode, monkeypatch):
+    monkeypatch.setattr(db._SNAPSHOT, "refresh_async", lambda: None)
+    os.utime(snapshot_mode, (0, 0))
+    conn = db.get_read_connection()
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("DELETE FROM project")
+    assert _file(conn) == os.path.realpath(db.DB_PATH)
+
+
+def test_write_requests_pin_reads_to_the_primary(snapshot_mode):
+    route = db.begin_read_route(primary=True)
+    try:
+        conn = db.get_read_connection()
+        # A read-only connection would refuse this statement even though it changes nothing.
+        conn.execute("UPDATE project SET project_name = project_name WHERE 0")
+        assert _file(conn) == os.path.realpath(db.DB_PATH)
+    finally:
+        db.end_read_route(route)
@@ -0,0 +1,34 @@
+import gzip
+import json
+
+from server import responses
+
+
+def test_fields_projection_trims_rows_but_keeps_the_envelope(client):
+    body = client.get("/api/projects?fields=project_id,project_name").get_json()
+    assert body["success"] is True and "seq" in body and body["full"] is True
+    assert body["projects"]
+    assert all(set(row) == {"project_id", "project_name"} for row in body["projects"])
+
+
+def test_failures_use_the_envelope(client):
+    resp = client.post("/api/auth/login", json={"username": "nobody", "password": "x"})
+    assert resp.status_code == 401
+    assert resp.get_json() == {"success": False, "message": "账号或密码错误"}
+    resp = client.get("/api/auth/profile")
+    assert resp.status_code == 401 and resp.get_json()["success"] is False
+
+
+def test_orjson_and_stdlib_bodies_match(app):
+    obj = {"b": [1, 2.5, None, True], "a": "中文", "c": {"z": 1, "y": "x"}}
+    with app.app_context():
+        fast = app.json.dump_bytes(obj)
+        plain = json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    assert fast == plain
+
+
+def test_large_json_bodies_are_compressed(client, monkeypatch):
+    monkeypatch.setattr(responses, "RESPONSE_COMPRESS_MIN_BYTES", 16)
+    resp = client.get("/api/projects", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.get_data()))["success"] is True
@@ -0,0 +1,58 @@
+from server import db
+
+
+def _summary(project_id):
+    conn = db.get_db_connection()
+    try:
+        row = conn.execute("SELECT role_count, total_slots FROM project WHERE project_id = ?", (project_id,)).fetchone()
+        return row["role_count"], row["total_slots"]
+    finally:
+        conn.close()
+
+
+def test_batch_saves_drafts_the_public_cannot_see(client, enterprise):
+    user_id, token = enterprise
+    auth = {"Authorization": f"Bearer {token}"}
+    project_id = db.project_add("batch draft test", user_id, "测试公司")["data"]["project_id"]
+    try:
+        resp = client.post(
+            "/api/projects/roles/ai-suggest/batch",
+            json={"project_ids": [project_id, 999999], "max_roles": 2, "max_workers": 2},
+            headers=auth,
+        )
+        assert resp.status_code == 200
+        report = resp.get_json()["data"]
+        # One project failing does not fail the batch.
+        assert (report["succeeded"], report["failed"]) == (1, 1)
+        assert [f["project_id"] for f in report["failures"]] == [999999]
+        draft_ids = report["results"][0]["role_ids"]
+        assert draft_ids
+
+        own = client.get(f"/api/enterprise/projects/{project_id}/roles", headers=auth).get_json()
+        assert {r["role_status"] for r in own["roles"]} == {"草稿"}
+        assert client.get(f"/api/projects/{project_id}").get_json()["roles"] == []
+        assert _summary(project_id) == (0, 0)
+
+        resp = client.put(f"/api/enterprise/roles/{draft_ids[0]}", json={"role_status": "招募中"}, headers=auth)
+        assert resp.status_code == 200
+        public = client.get(f"/api/projects/{project_id}").get_json()["roles"]
+        assert [r["role_id"] for r in public] == [draft_ids[0]]
+        assert _summary(project_id)[0] == 1
+    finally:
+        db.project_del(project_id)
+
+
+def test_batch_rejects_non_boolean_persist(client, enterprise):
+    user_id, token = enterprise
+    project_id = db.project_add("batch persist test", user_id, "测试公司")["data"]["project_id"]
+    try:
+        for body in ({"persist": "false"}, {"max_roles": "3"}):
+            resp = client.post(
+                "/api/projects/roles/ai-suggest/batch",
+                json={"project_ids": [project_id], **body},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert resp.status_code == 400
+        assert db.list_roles_by_project(project_id, include_drafts=True) == []
+    finally:
+        db.project_del(project_id)
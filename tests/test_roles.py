@@ -0,0 +1,44 @@
+import os
+
+from server import db
+
+
+def _enterprise():
+    conn = db.get_db_connection()
+    try:
+        return conn.execute("SELECT user_id FROM user WHERE user_type = '企业' ORDER BY user_id LIMIT 1").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_role_add_many_reports_the_bad_item():
+    project_id = db.project_add("role batch test", _enterprise(), "测试公司")["data"]["project_id"]
+    try:
+        res = db.role_add_many(
+            project_id,
+            [
+                {"role_name": "后端", "task_desc": "接口"},
+                {"role_name": "前端", "task_desc": "页面", "limit_num": "两人"},
+            ],
+        )
+        assert res["code"] == 400
+        assert res["msg"].startswith("第 2 个角色")
+        assert db.list_roles_by_project(project_id) == []
+    finally:
+        db.project_del(project_id)
+
+
+def test_bulk_save_rejects_non_string_on_conflict(client):
+    user_id = _enterprise()
+    project_id = db.project_add("bulk save test", user_id, "测试公司")["data"]["project_id"]
+    token = f"test-{os.urandom(8).hex()}"
+    db.save_token(token, user_id)
+    try:
+        resp = client.post(
+            f"/api/enterprise/projects/{project_id}/roles/bulk",
+            json={"roles": [{"role_name": "后端", "task_desc": "接口"}], "on_conflict": ["skip"]},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert resp.status_code == 400
+    finally:
+        db.project_del(project_id)
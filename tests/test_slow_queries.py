@@ -0,0 +1,38 @@
+import json
+import os
+from types import SimpleNamespace
+
+from server import slow_queries
+
+
+def test_calling_function_is_the_outermost_db_frame():
+    code = compile(
+        "def role_add(): return _log_change()\ndef _log_change(): return calling()\n",
+        slow_queries._DB_MODULE_FILE,
+        "exec",
+    )
+    scope = {"calling": slow_queries._calling_db_function}
+    exec(code, scope)
+    assert scope["role_add"]() == "role_add"
+
+
+def _event(sql):
+    return SimpleNamespace(elapsed=1.0, sql=sql, params=(), many=False, rows=1, conn=None)
+
+
+def test_buffer_is_shared_through_the_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_DIR", str(tmp_path))
+    other = {"time": "2000-01-01 00:00:00", "sql": "SELECT ?", "pid": 1}
+    (tmp_path / "slow-queries-1.json").write_text(json.dumps([other]), encoding="utf-8")
+
+    slow_queries._record_slow_query(_event("SELECT 2"))
+    assert [e["sql"] for e in slow_queries.list_slow_queries()] == ["SELECT ?", "SELECT ?"]
+    assert slow_queries.list_slow_queries()[0]["pid"] == os.getpid()
+
+    slow_queries.mark_process_dead(1)
+    assert set(os.listdir(tmp_path)) == {"slow-queries-archive.json", f"slow-queries-{os.getpid()}.json"}
+    assert len(slow_queries.list_slow_queries()) == 2
+
+    assert slow_queries.clear_slow_queries() == 2
+    assert os.listdir(tmp_path) == []
+    assert slow_queries.list_slow_queries() == []
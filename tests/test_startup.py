@@ -0,0 +1,39 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+LAZY = ["numpy", "server.ai_client", "server.uploads", "urllib.request"]
+
+_SCRIPT = """
+import json, sys
+from server import create_app
+from server.app_factory import preload_lazy_modules
+lazy = %r
+app = create_app()
+before = [m for m in lazy if m in sys.modules]
+preload_lazy_modules()
+after = [m for m in lazy if m in sys.modules]
+print(json.dumps({"before": before, "after": after, "phases": sorted(app.extensions["startup_phases"])}))
+"""
+
+
+def test_rare_subsystems_load_on_first_use_or_preload(tmp_path):
+    # A fresh interpreter: the test process has already imported everything.
+    env = {
+        **os.environ,
+        "MULTI_ROLE_DB_PATH": str(tmp_path / "startup.db"),
+        "FEEDBACK_UPLOAD_DIR": str(tmp_path / "uploads"),
+        "CACHE_WARMUP": "0",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT % LAZY], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    assert result["before"] == []
+    expected = [m for m in LAZY if m != "urllib.request" and (m != "numpy" or importlib.util.find_spec("numpy"))]
+    assert set(expected) <= set(result["after"])
+    assert {"flask", "page_routes", "total"} <= set(result["phases"])
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from scripts import build_frontend
+from server import static_files
+
+
+@pytest.fixture()
+def built(tmp_path, monkeypatch):
+    src, out = tmp_path / "frontend", tmp_path / "frontend" / "dist"
+    (src / "styles").mkdir(parents=True)
+    (src / "assets").mkdir()
+    (src / "assets" / "bg.jpg").write_bytes(b"\xff\xd8 not really a jpeg")
+    (src / "styles" / "theme.css").write_text("body { background: url(../assets/bg.jpg); }\n" * 100)
+    (src / "page.html").write_text('<link rel="stylesheet" href="./styles/theme.css">\n<p>hi</p>\n' * 50)
+    (src / "extra.txt").write_text("not built")
+    result = build_frontend.build(src, out)
+    (src / "uploads").mkdir()
+    (src / "uploads" / "note.txt").write_text("uploaded later")
+    monkeypatch.setattr(static_files, "FRONTEND_DIR", str(src))
+    monkeypatch.setattr(static_files, "FRONTEND_DIST_DIR", str(out))
+    return result, out
+
+
+def test_build_fingerprints_assets_and_rewrites_references(built):
+    result, out = built
+    manifest = result["manifest"]
+    css = manifest["styles/theme.css"]
+    assert static_files._FINGERPRINTED.search(css)
+    assert json.loads((out / "manifest.json").read_text()) == manifest
+    # The page keeps its name and points at the hashed stylesheet, which points at the hashed image.
+    assert f"./{css}" in (out / "page.html").read_text()
+    assert f"url(../{manifest['assets/bg.jpg']})" in (out / css).read_text()
+    assert (out / "page.html.gz").is_file()
+
+
+def test_fingerprinted_assets_are_immutable_and_pages_revalidate(client, built):
+    result, _ = built
+    css = result["manifest"]["styles/theme.css"]
+    asset = client.get(f"/{css}", headers={"Accept-Encoding": "gzip"})
+    assert asset.status_code == 200
+    assert asset.headers["Cache-Control"] == static_files.IMMUTABLE_CACHE
+    assert asset.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in asset.headers["Vary"]
+
+    page = client.get("/page.html")
+    assert page.headers["Cache-Control"] == "no-cache"
+    assert "Content-Encoding" not in page.headers
+    assert css.encode() in page.get_data()
+
+
+def test_files_outside_the_build_come_from_the_source_tree(client, built):
+    assert client.get("/uploads/note.txt").get_data() == b"uploaded later"
+    assert client.get("/missing.css").status_code == 404
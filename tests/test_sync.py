@@ -0,0 +1,70 @@
+from server import db
+
+
+def _publisher() -> int:
+    conn = db.get_db_connection()
+    try:
+        return conn.execute("SELECT user_id FROM user WHERE user_type = '企业' ORDER BY user_id LIMIT 1").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_project_list_delta_sync(client):
+    full = client.get("/api/projects").get_json()
+    assert full["full"] is True
+    seq = full["seq"]
+
+    created = db.project_add("delta sync test", _publisher(), "测试公司")["data"]["project_id"]
+    delta = client.get(f"/api/projects?since={seq}").get_json()
+    assert delta["full"] is False
+    assert [p["project_id"] for p in delta["projects"]] == [created]
+    assert delta["seq"] > seq
+
+    db.project_del(created)
+    after_delete = client.get(f"/api/projects?since={delta['seq']}").get_json()
+    assert after_delete["projects"] == []
+    assert after_delete["deleted"] == [created]
+
+
+def test_unknown_cursor_gets_the_full_list(client):
+    resp = client.get("/api/projects?since=999999999").get_json()
+    assert resp["full"] is True
+
+
+def test_role_list_delta_carries_updates_and_tombstones(client, enterprise):
+    user_id, token = enterprise
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = db.project_add("delta roles test", user_id, "测试公司")["data"]["project_id"]
+    kept = db.role_add(project_id, "后端", "写接口")["data"]["role_id"]
+    dropped = db.role_add(project_id, "前端", "写页面")["data"]["role_id"]
+    url = f"/api/enterprise/projects/{project_id}/roles"
+    seq = client.get(url, headers=headers).get_json()["seq"]
+
+    db.role_update(kept, task_desc="写接口和文档")
+    db.role_del(dropped)
+    delta = client.get(f"{url}?since={seq}", headers=headers).get_json()
+    assert delta["full"] is False
+    assert [r["role_id"] for r in delta["roles"]] == [kept]
+    assert delta["roles"][0]["task_desc"] == "写接口和文档"
+    assert delta["deleted"] == [dropped]
+
+
+def test_cascading_delete_reaches_the_student_application_list(client, student, enterprise):
+    student_id, token = student
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = db.project_add("delta cascade test", enterprise[0], "测试公司")["data"]["project_id"]
+    role_id = db.role_add(project_id, "测试", "测试岗位")["data"]["role_id"]
+    application_id = db.apply_for_role(role_id, student_id, "想参加")["data"]["application_id"]
+    seq = client.get("/api/student/applications", headers=headers).get_json()["seq"]
+
+    # Rows embed the project name, so a rename resends the application.
+    db.project_update(project_id, project_name="delta cascade renamed")
+    delta = client.get(f"/api/student/applications?since={seq}", headers=headers).get_json()
+    assert [(a["application_id"], a["project_name"]) for a in delta["applications"]] == [
+        (application_id, "delta cascade renamed")
+    ]
+
+    db.project_del(project_id)
+    after = client.get(f"/api/student/applications?since={delta['seq']}", headers=headers).get_json()
+    assert after["applications"] == []
+    assert after["deleted"] == [application_id]
@@ -0,0 +1,50 @@
+import threading
+
+from server import db, team
+
+
+def test_team_view_lists_accepted_members(client, enterprise, student):
+    enterprise_id, enterprise_token = enterprise
+    student_id, student_token = student
+    project_id = db.project_add("team view test", enterprise_id, "测试公司")["data"]["project_id"]
+    try:
+        role_id = db.role_add(project_id, "后端", "接口", limit_num=2)["data"]["role_id"]
+        db.role_add(project_id, "草稿岗位", "未发布", role_status="草稿")
+        application_id = db.apply_for_role(role_id, student_id, "想参加")["data"]["application_id"]
+
+        url = f"/api/projects/{project_id}/team"
+        assert client.get(url, headers={"Authorization": f"Bearer {student_token}"}).status_code == 403
+
+        assert db.review_application(application_id, enterprise_id, "accepted")["code"] == 200
+        body = client.get(url, headers={"Authorization": f"Bearer {student_token}"}).get_json()
+        assert [r["role_name"] for r in body["roles"]] == ["后端"]
+        role = body["roles"][0]
+        assert (role["filled"], role["available"]) == (1, 1)
+        assert [m["user_id"] for m in role["members"]] == [student_id]
+        assert body["project"]["stats"]["total_members"] == 1
+    finally:
+        db.project_del(project_id)
+
+
+def test_slow_team_query_does_not_block_other_projects(app, monkeypatch):
+    cache = team.TeamCache()
+    release = threading.Event()
+    real = team.get_project_team
+
+    def slow_for_first(project_id):
+        if project_id == -1:
+            release.wait(5)
+            return None
+        return real(project_id)
+
+    monkeypatch.setattr(team, "get_project_team", slow_for_first)
+    slow = threading.Thread(target=cache.get, args=(-1,))
+    slow.start()
+    try:
+        project_id = db.list_hot_project_ids(1)[0]
+        done = threading.Event()
+        threading.Thread(target=lambda: (cache.get(project_id), done.set())).start()
+        assert done.wait(2), "lookup of another project waited for the slow one"
+    finally:
+        release.set()
+        slow.join()
@@ -0,0 +1,19 @@
+from server import warmup
+
+
+def test_budget_cuts_the_remaining_steps(app):
+    report = warmup.warm_caches(budget_ms=0)
+    steps = [name for name in report if name not in ("total_ms", "budget_ms")]
+    assert steps == ["project_list", "project_detail", "tokens", "indexes", "tag_index", "team"]
+    assert all(report[name] == {"items": 0, "ms": report[name]["ms"], "complete": False} for name in steps)
+
+
+def test_failed_step_does_not_stop_the_rest(app, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(warmup, "list_public_projects", broken)
+    report = warmup.warm_caches(budget_ms=60000)
+    assert report["project_list"]["complete"] is False
+    assert report["project_detail"]["complete"] is True and report["project_detail"]["items"] > 0
+    assert report["team"]["complete"] is True